@@ -0,0 +1,140 @@
+"""
+Times every stage of the pipeline on synthetic leagues of 1x, 5x and 20x the size of the real one, offline.
+
+For each scale a throwaway tree (a copy of scripts/, data/ pointing at synthetic CSVs through file:// URLs,
+and the docs/data files the build reads) is built with synthetic_gamelogs.py, then
+`generate_web_data.py --force --full --profile` runs in it. 1x is 12 seasons of 30 teams and 16 sessions.
+
+The per-stage timings are stored in benchmarks/results/pipeline.json. With --check, the run is compared
+against the stored baseline instead, and the script exits with an error if any stage got slower than
+the tolerance allows.
+
+Usage: python benchmarks/pipeline_benchmark.py [--scales 1 5 20] [--workers N] [--check] [--tolerance 0.25] [--keep]
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+repo_dir = os.path.join(script_dir, '..')
+sys.path.insert(0, os.path.join(repo_dir, 'scripts'))
+
+from synthetic_gamelogs import generate_league
+
+SEASONS_PER_SCALE = 12
+RESULTS_PATH = os.path.join(script_dir, 'results', 'pipeline.json')
+# Stages faster than this are too noisy to flag as regressions
+MIN_REGRESSION_SECONDS = 1.0
+
+def build_tree(tree_dir, num_seasons, seed):
+    """Lays out a repository tree whose gamelogs and player types are a synthetic league."""
+    shutil.copytree(os.path.join(repo_dir, 'scripts'), os.path.join(tree_dir, 'scripts'), ignore=shutil.ignore_patterns('__pycache__'))
+    data_dir = os.path.join(tree_dir, 'data')
+    output_dir = os.path.join(tree_dir, 'docs', 'data')
+    os.makedirs(output_dir)
+
+    paths = generate_league(os.path.join(data_dir, 'synthetic'), num_seasons=num_seasons, seed=seed)
+    with open(os.path.join(data_dir, 'gamelogs.txt'), 'w') as f:
+        for season, path in paths['gamelogs'].items():
+            f.write(f"{season}\t16\t{Path(path).resolve().as_uri()}\n")
+    with open(os.path.join(data_dir, 'player_types.txt'), 'w') as f:
+        for season, path in paths['player_types'].items():
+            f.write(f"{season}\t{Path(path).resolve().as_uri()}\n")
+
+    shutil.copy(paths['team_history'], os.path.join(output_dir, 'team_history.json'))
+    shutil.copy(os.path.join(repo_dir, 'docs', 'data', 'glossary.json'), os.path.join(output_dir, 'glossary.json'))
+    with open(os.path.join(output_dir, 'player_id_map.json'), 'w') as f:
+        json.dump({}, f)
+    return paths['plays']
+
+def run_scale(scale, workers, seed, keep):
+    tree_dir = tempfile.mkdtemp(prefix=f'mlr_benchmark_{scale}x_')
+    try:
+        num_seasons = SEASONS_PER_SCALE * scale
+        print(f"Generating {num_seasons} synthetic seasons ({scale}x)...")
+        plays = build_tree(tree_dir, num_seasons, seed)
+
+        print(f"Running the pipeline on {plays} plays...")
+        command = [sys.executable, os.path.join(tree_dir, 'scripts', 'generate_web_data.py'), '--force', '--full', '--profile', '--workers', str(workers)]
+        start = time.perf_counter()
+        subprocess.run(command, cwd=tree_dir, check=True, stdout=subprocess.DEVNULL)
+        total_seconds = time.perf_counter() - start
+
+        with open(os.path.join(tree_dir, 'docs', 'data', 'build_profile.json')) as f:
+            profile = json.load(f)
+        print(f"  {scale}x: {total_seconds:.1f}s")
+        return {
+            'seasons': num_seasons,
+            'plays': plays,
+            'total_seconds': round(total_seconds, 3),
+            'stages': {stage['name']: {
+                'wall_seconds': stage['wall_seconds'],
+                'cpu_seconds': stage['cpu_seconds'],
+                'peak_rss_mb': stage['peak_rss_mb'],
+            } for stage in profile['stages']},
+        }
+    finally:
+        if keep:
+            print(f"  Kept the benchmark tree at {tree_dir}")
+        else:
+            shutil.rmtree(tree_dir, ignore_errors=True)
+
+def find_regressions(baseline, results, tolerance):
+    """Stages (and totals) that are more than `tolerance` slower than the baseline."""
+    regressions = []
+    for scale, result in results.items():
+        if scale not in baseline:
+            print(f"  No baseline for {scale}; skipping the comparison.")
+            continue
+        base = baseline[scale]
+        timings = [('total', base['total_seconds'], result['total_seconds'])]
+        timings += [(name, base['stages'][name]['wall_seconds'], stage['wall_seconds'])
+                    for name, stage in result['stages'].items() if name in base['stages']]
+        for name, before, after in timings:
+            if after > before * (1 + tolerance) and after - before >= MIN_REGRESSION_SECONDS:
+                regressions.append(f"{scale} {name}: {before:.2f}s -> {after:.2f}s")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Times every pipeline stage on synthetic leagues of several sizes.")
+    parser.add_argument('--scales', type=int, nargs='*', default=[1, 5, 20], help="Data sizes to run, as multiples of the real league (default: 1 5 20).")
+    parser.add_argument('--workers', type=int, default=1, help="--workers for the pipeline (default: 1, so timings don't depend on the machine's cores).")
+    parser.add_argument('--seed', type=int, default=0, help="Seed for the synthetic leagues (default: 0).")
+    parser.add_argument('--check', action='store_true', help="Compare against the stored baseline instead of replacing it; exits with an error on a regression.")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="With --check, how much slower a stage may get before it counts as a regression (default: 0.25).")
+    parser.add_argument('--keep', action='store_true', help="Keep the generated trees instead of deleting them.")
+    args = parser.parse_args()
+
+    results = {f'{scale}x': run_scale(scale, args.workers, args.seed, args.keep) for scale in args.scales}
+
+    baseline = {}
+    if os.path.exists(RESULTS_PATH):
+        with open(RESULTS_PATH) as f:
+            baseline = json.load(f)
+
+    if args.check:
+        regressions = find_regressions(baseline.get('scales', {}), results, args.tolerance)
+        if regressions:
+            print("Regressions against the baseline:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print("No regressions against the baseline.")
+        return
+
+    # Scales that weren't run keep their previous baseline
+    scales = baseline.get('scales', {})
+    scales.update(results)
+    os.makedirs(os.path.dirname(RESULTS_PATH), exist_ok=True)
+    with open(RESULTS_PATH, 'w') as f:
+        json.dump({'workers': args.workers, 'seed': args.seed, 'scales': scales}, f, indent=2)
+    print(f"Stored the baseline in {RESULTS_PATH}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Benchmarks the batched RE24 stage against the row-by-row implementation it replaced.
+
+Runs both on the cached raw gamelogs (data/cache/raw_gamelogs) with the cached run expectancy matrices,
+checks that they agree, and records the timings in benchmarks/results/re24.json.
+
+Usage: python benchmarks/re24_benchmark.py [--seasons S10 S11 ...]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import pandas as pd
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(script_dir, '..', 'scripts'))
+
+from data_loader import read_raw_gamelog
+from game_processing import Game, add_play_states
+from generate_web_data import calculate_re24
+
+def load_inputs(seasons=None):
+    cache_dir = os.path.join(script_dir, '..', 'data', 'cache')
+    gamelogs = []
+    run_expectancy_by_season = {}
+    season_num = 1
+    while os.path.exists(os.path.join(cache_dir, 'raw_gamelogs', f'raw_gamelog_S{season_num}.csv')):
+        season = f'S{season_num}'
+        season_num += 1
+        if seasons and season not in seasons:
+            continue
+        gamelogs.append(read_raw_gamelog(os.path.join(cache_dir, 'raw_gamelogs', f'raw_gamelog_{season}.csv')).assign(Season=season))
+        re_path = os.path.join(cache_dir, f're_matrix_{season}.csv')
+        re_df = pd.read_csv(re_path) if os.path.exists(re_path) else pd.DataFrame(columns=['OBC', 'Outs', 'RunExpectancy'])
+        run_expectancy_by_season[season] = {(int(row['OBC']), int(row['Outs'])): row['RunExpectancy'] for _, row in re_df.iterrows()}
+    return pd.concat(gamelogs, ignore_index=True), run_expectancy_by_season
+
+def reference_re24(combined_df, run_expectancy_by_season):
+    """The row-by-row RE24 stage as it was before it was batched."""
+    sorted_seasons = sorted(combined_df['Season'].unique(), key=lambda s: int(s.replace('S', '')))
+    re24_values = []
+    for season in sorted_seasons:
+        season_df = combined_df[combined_df['Season'] == season].copy()
+        re_matrix = run_expectancy_by_season.get(season, {})
+        if not re_matrix:
+            re24_values.append(pd.Series(0, index=season_df.index))
+            continue
+
+        game_simulator = Game(pd.DataFrame(), season)
+
+        season_df['OBC'] = pd.to_numeric(season_df['OBC'], errors='coerce').fillna(0).astype(int)
+        season_df['Outs'] = pd.to_numeric(season_df['Outs'], errors='coerce').fillna(0).astype(int)
+        re_before = season_df.apply(lambda row: re_matrix.get((row['OBC'], row['Outs']), 0), axis=1)
+
+        inning_groups = season_df.groupby('Inning ID')
+        obc_after_raw = inning_groups['OBC'].shift(-1)
+        obc_after_raw_for_sim = inning_groups['OBC'].shift(-1).fillna(0).astype(int)
+
+        runners_map = {0:[False,False,False], 1:[True,False,False], 2:[False,True,False], 3:[False,False,True], 4:[True,True,False], 5:[True,False,True], 6:[False,True,True], 7:[True,True,True]}
+
+        def get_re24_components(row):
+            runners_before = runners_map.get(row['OBC'], [False, False, False])
+            result = row['Exact Result'] if pd.notna(row['Exact Result']) else row['Old Result']
+            diff_val = pd.to_numeric(row.get('Diff'), errors='coerce')
+            diff = int(diff_val if pd.notna(diff_val) else 0)
+            pa_type_val = pd.to_numeric(row.get('PA Type'), errors='coerce')
+            pa_type = int(pa_type_val if pd.notna(pa_type_val) else 0)
+
+            new_runners, runs_on_play, outs_for_play = game_simulator._simulate_play(
+                row['obc_after_for_sim'], runners_before, row['Outs'], result, row['Old Result'],
+                diff, int(row['Season'].replace('S','')), pa_type
+            )
+
+            outs_after = row['Outs'] + outs_for_play
+            if outs_after >= 3 or pd.isna(row['obc_after_raw']):
+                re_after = 0
+            else:
+                obc_after = game_simulator._runners_to_obc(tuple(new_runners))
+                re_after = re_matrix.get((obc_after, outs_after), 0)
+            return pd.Series([re_after, runs_on_play])
+
+        temp_df = season_df.copy()
+        temp_df['obc_after_raw'] = obc_after_raw
+        temp_df['obc_after_for_sim'] = obc_after_raw_for_sim
+
+        re24_components = temp_df.apply(get_re24_components, axis=1)
+        re24_components.columns = ['re_after', 'runs_on_play']
+        re24_components.index = season_df.index
+        re24_values.append(re24_components['re_after'] - re_before + re24_components['runs_on_play'])
+
+    return pd.concat(re24_values)
+
+def batched_re24(combined_df, run_expectancy_by_season):
+    """The batched RE24 stage, including the play-state simulation it reads from."""
+    return calculate_re24(add_play_states(combined_df), run_expectancy_by_season)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks the batched RE24 stage against the row-by-row one.")
+    parser.add_argument('--seasons', nargs='*', help="Only use these seasons (e.g. S10 S11). Defaults to every cached season.")
+    args = parser.parse_args()
+
+    combined_df, run_expectancy_by_season = load_inputs(args.seasons)
+    print(f"Benchmarking RE24 on {len(combined_df)} plays...")
+
+    start = time.perf_counter()
+    reference = reference_re24(combined_df, run_expectancy_by_season)
+    reference_seconds = time.perf_counter() - start
+    print(f"  Row-by-row: {reference_seconds:.2f}s")
+
+    start = time.perf_counter()
+    batched = batched_re24(combined_df, run_expectancy_by_season)
+    batched_seconds = time.perf_counter() - start
+    print(f"  Batched:    {batched_seconds:.2f}s")
+
+    # The play states are shared with other stages in the pipeline, so also time RE24 on its own
+    play_states_df = add_play_states(combined_df)
+    start = time.perf_counter()
+    calculate_re24(play_states_df, run_expectancy_by_season)
+    re24_only_seconds = time.perf_counter() - start
+    print(f"  Batched, RE24 only: {re24_only_seconds:.3f}s")
+
+    max_difference = float((reference.sort_index() - batched.sort_index()).abs().max())
+    speedup = reference_seconds / batched_seconds
+    print(f"  Speedup: {speedup:.1f}x (largest RE24 difference: {max_difference:.2e})")
+
+    results = {
+        'plays': len(combined_df),
+        'seasons': sorted(combined_df['Season'].unique().tolist(), key=lambda s: int(s.replace('S', ''))),
+        'reference_seconds': round(reference_seconds, 3),
+        'batched_seconds': round(batched_seconds, 3),
+        'batched_re24_only_seconds': round(re24_only_seconds, 3),
+        'speedup': round(speedup, 1),
+        'max_re24_difference': max_difference,
+    }
+    results_dir = os.path.join(script_dir, 'results')
+    if not os.path.exists(results_dir):
+        os.makedirs(results_dir)
+    with open(os.path.join(results_dir, 're24.json'), 'w') as f:
+        json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
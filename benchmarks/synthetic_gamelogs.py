@@ -0,0 +1,375 @@
+"""
+Generates a synthetic league (gamelogs, player types and team history) in the raw CSV schema, so the
+pipeline can be run and benchmarked offline at any data size.
+
+Games are played by the rulebook: every play's base/out state is the one simulate_play leaves behind, so
+the pipeline replays them exactly. The league has pitching changes (including mid-inning, with inherited
+runners), steals, intentional and automatic walks, infield-in plays, mid-season trades and player turnover
+between seasons. Results follow a fixed range chart, so the mix of results is close to a real season's.
+
+Usage: python benchmarks/synthetic_gamelogs.py OUTPUT_DIR [--seasons 12] [--teams 30] [--sessions 16] [--seed 0]
+"""
+import argparse
+import csv
+import json
+import os
+import random
+import sys
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(script_dir, '..', 'scripts'))
+
+from game_processing import RUNNERS_TO_OBC, CAUGHT_STEALING_BASES, simulate_play, _advance_runners
+
+RAW_GAMELOG_COLUMNS = [
+    'Hitter', 'Hitter ID', 'Swing', 'Pitcher', 'Pitcher ID', 'Pitch', 'Old Result', 'Diff', 'Inning', 'Outs', 'OBC',
+    'Home Score', 'Away Score', 'Batter WPA', 'Pitcher WPA', 'RBI', 'Run', 'Inning ID', 'Game ID', 'Session',
+    'Batter Team', 'Pitcher Team', 'Exact Result', 'Result at Neutral', 'Result All Neutral',
+    'Pitcher Responsible for Runner on 3rd Who Scored', 'Pitcher Responsible for Runner on 2nd Who Scored',
+    'Pitcher Responsible for Runner on 1st Who Scored', 'Pitcher Responsible for Batter Who Scored', 'PA Type'
+]
+PLAYER_TYPE_COLUMNS = [
+    'Player ID', 'Name', 'Team', 'Batting Type', 'Pitching Type', 'Pitching Bonus', 'Handedness',
+    'Primary Position', 'Secondary Position', 'Teritary Position', 'Reddit Username', 'Discord Username',
+    'Format #', 'Status', 'POS Value', 'MiLR Status', 'MiLR Team'
+]
+# The responsible pitcher column for a runner who scored from each base (-1 is the batter).
+RESPONSIBLE_PITCHER_COLUMNS = {
+    2: 'Pitcher Responsible for Runner on 3rd Who Scored',
+    1: 'Pitcher Responsible for Runner on 2nd Who Scored',
+    0: 'Pitcher Responsible for Runner on 1st Who Scored',
+    -1: 'Pitcher Responsible for Batter Who Scored',
+}
+
+TEAMS = [
+    'ARI', 'ATL', 'BAL', 'BOS', 'CHC', 'CWS', 'CIN', 'CLE', 'COL', 'DET', 'HOU', 'KCR', 'ANA', 'LAD', 'MIA',
+    'MIL', 'MIN', 'NYM', 'NYY', 'OAK', 'PHI', 'PIT', 'SDP', 'SFG', 'SEA', 'STL', 'TBR', 'TEX', 'TOR', 'WSH'
+]
+BATTING_TYPES = ['1B', 'BC', 'BN', 'BP', 'EN', 'HK', 'MH', 'S', 'SF', 'SM', 'TT', 'WC', 'XB']
+PITCHING_TYPES = ['1B', 'BB', 'BF', 'BS', 'EG', 'EN', 'FP', 'NH', 'NT', 'SF', 'TD']
+PITCHING_BONUSES = ['B', 'H', 'S']
+FIELD_POSITIONS = ['C', '1B', '2B', '3B', 'SS', 'LF', 'CF', 'RF', 'DH']
+
+# Range chart: a swing's result is the first one whose upper diff bound it doesn't exceed.
+RESULT_CHART = [(24, 'HR'), (32, '3B'), (65, '2B'), (122, '1B'), (165, 'BB'), (250, 'FO'), (335, 'K'), (380, 'PO'), (435, 'RGO'), (500, 'LGO')]
+BATTER_POSITIVE_RESULTS = {'HR', '3B', '2B', '1B', 'BB', 'IBB', 'AUTO BB', 'STEAL 2B', 'STEAL 3B'}
+
+LINEUP_SIZE = 9
+STARTERS = 5
+RELIEVERS = 5
+REGULATION_INNINGS = 6
+MAX_INNINGS = 30
+# Share of each roster replaced by new players between seasons.
+TURNOVER = 0.15
+TRADES_PER_SEASON = 4
+
+def get_result(diff):
+    for max_diff, result in RESULT_CHART:
+        if diff <= max_diff:
+            return result
+    return RESULT_CHART[-1][1]
+
+def get_diff(swing, pitch):
+    diff = abs(swing - pitch)
+    return min(diff, 1000 - diff)
+
+class League:
+    """Teams, rosters and player types, carried from season to season."""
+    def __init__(self, rng, teams):
+        self.rng = rng
+        self.teams = teams
+        self.next_player_id = 1
+        self.players = {}
+        self.rosters = {}
+        for team in teams:
+            self.rosters[team] = {
+                'lineup': [self.new_player(FIELD_POSITIONS[i]) for i in range(LINEUP_SIZE)],
+                'starters': [self.new_player('P') for _ in range(STARTERS)],
+                'relievers': [self.new_player('P') for _ in range(RELIEVERS)],
+            }
+
+    def new_player(self, position):
+        player_id = self.next_player_id
+        self.next_player_id += 1
+        self.players[player_id] = {
+            'Name': f'Player {player_id}',
+            'Batting Type': 'P' if position == 'P' else self.rng.choice(BATTING_TYPES),
+            'Pitching Type': self.rng.choice(PITCHING_TYPES),
+            'Pitching Bonus': self.rng.choice(PITCHING_BONUSES),
+            'Handedness': self.rng.choice(['Left', 'Right']),
+            'Primary Position': position,
+        }
+        return player_id
+
+    def start_season(self):
+        """Retires part of every roster and replaces them with new players."""
+        for roster in self.rosters.values():
+            for role, players in roster.items():
+                for i, player_id in enumerate(players):
+                    if self.rng.random() < TURNOVER:
+                        players[i] = self.new_player(self.players[player_id]['Primary Position'])
+
+    def trade(self):
+        """Swaps two players of the same role between two teams."""
+        team_a, team_b = self.rng.sample(self.teams, 2)
+        role = self.rng.choice(['lineup', 'starters', 'relievers'])
+        i = self.rng.randrange(len(self.rosters[team_a][role]))
+        j = self.rng.randrange(len(self.rosters[team_b][role]))
+        players_a, players_b = self.rosters[team_a][role], self.rosters[team_b][role]
+        players_a[i], players_b[j] = players_b[j], players_a[i]
+
+    def get_player_types(self):
+        """One row per rostered player, with the team they finished the season with."""
+        rows = []
+        for team in self.teams:
+            for players in self.rosters[team].values():
+                for player_id in players:
+                    row = {col: '' for col in PLAYER_TYPE_COLUMNS}
+                    row.update(self.players[player_id])
+                    row.update({'Player ID': player_id, 'Team': team, 'Status': 1})
+                    rows.append(row)
+        return rows
+
+class GameSimulator:
+    """Plays one game by the rulebook and returns its gamelog rows."""
+    def __init__(self, rng, league, season_num):
+        self.rng = rng
+        self.league = league
+        self.season_num = season_num
+
+    def play_game(self, game_id, session, home, away, starters, first_inning_id):
+        self.rows = []
+        self.scores = {home: 0, away: 0}
+        self.batting_order = {home: 0, away: 0}
+        self.pitchers = {home: starters[home], away: starters[away]}
+        self.pitcher_outs = {home: 0, away: 0}
+        self.pitcher_limits = {home: self.rng.randint(12, 18), away: self.rng.randint(12, 18)}
+        self.used_pitchers = {home: {starters[home]}, away: {starters[away]}}
+        self.game = {'Game ID': game_id, 'Session': session}
+
+        inning_id = first_inning_id
+        inning = 1
+        while inning <= MAX_INNINGS:
+            self.play_half_inning(f'T{inning}', inning_id, away, home)
+            inning_id += 1
+            if inning >= REGULATION_INNINGS and self.scores[home] > self.scores[away]:
+                break
+            walk_off = self.play_half_inning(f'B{inning}', inning_id, home, away)
+            inning_id += 1
+            if walk_off or (inning >= REGULATION_INNINGS and self.scores[home] != self.scores[away]):
+                break
+            inning += 1
+        return self.rows, inning_id
+
+    def change_pitcher(self, team):
+        roster = self.league.rosters[team]
+        available = [player_id for player_id in roster['relievers'] if player_id not in self.used_pitchers[team]]
+        if not available:
+            return
+        self.pitchers[team] = available[0]
+        self.used_pitchers[team].add(available[0])
+        self.pitcher_outs[team] = 0
+        self.pitcher_limits[team] = self.rng.randint(3, 6)
+
+    def play_half_inning(self, inning, inning_id, batting_team, pitching_team):
+        """Returns True if the home team walked off."""
+        if self.pitcher_outs[pitching_team] >= self.pitcher_limits[pitching_team]:
+            self.change_pitcher(pitching_team)
+        home = inning.startswith('B')
+        extra_inning = int(inning[1:]) > REGULATION_INNINGS
+        outs = 0
+        runs_this_inning = 0
+        # (gamelog row, responsible pitcher) of the runner on each base
+        slots = [None, None, None]
+        while outs < 3:
+            if runs_this_inning >= 4 and self.pitchers[pitching_team] not in self.league.rosters[pitching_team]['relievers']:
+                self.change_pitcher(pitching_team)
+            pitcher_id = self.pitchers[pitching_team]
+            runners = [slot is not None for slot in slots]
+            obc = RUNNERS_TO_OBC[tuple(runners)]
+            result, pa_type, swing, pitch, runner_row = self.choose_play(slots, outs)
+
+            diff = get_diff(swing, pitch) if swing is not None else None
+            new_runners, runs, outs_made = self.resolve(runners, outs, result, diff, pa_type)
+            old_result = self.get_old_result(result, runners, new_runners, runs, outs_made)
+
+            if runner_row is not None:
+                hitter_id = self.rows[runner_row]['Hitter ID']
+                batter = None
+            else:
+                lineup = self.league.rosters[batting_team]['lineup']
+                hitter_id = lineup[self.batting_order[batting_team] % LINEUP_SIZE]
+                self.batting_order[batting_team] += 1
+                batter = (len(self.rows), pitcher_id)
+
+            row = {col: '' for col in RAW_GAMELOG_COLUMNS}
+            row.update(self.game)
+            row.update({
+                'Hitter': self.league.players[hitter_id]['Name'], 'Hitter ID': hitter_id,
+                'Pitcher': self.league.players[pitcher_id]['Name'], 'Pitcher ID': pitcher_id,
+                'Swing': swing if swing is not None else '', 'Pitch': pitch if pitch is not None else '',
+                'Diff': diff if diff is not None else '',
+                'Old Result': old_result, 'Exact Result': result,
+                'Result at Neutral': self.get_neutral_result(result, diff, 40),
+                'Result All Neutral': self.get_neutral_result(result, diff, 120),
+                'Inning': inning, 'Outs': outs, 'OBC': obc, 'Inning ID': inning_id,
+                'Home Score': self.scores[pitching_team if not home else batting_team],
+                'Away Score': self.scores[batting_team if not home else pitching_team],
+                'Batter Team': batting_team, 'Pitcher Team': pitching_team,
+                'RBI': 0 if old_result in ('DP', 'TP', 'SB', 'CS') else runs, 'Run': 0, 'PA Type': pa_type,
+            })
+            wpa = self.rng.uniform(0.2, 6.0) * (1 if result in BATTER_POSITIVE_RESULTS else -1) * (2 if extra_inning else 1)
+            row['Batter WPA'] = f'{wpa:.2f}%'
+            row['Pitcher WPA'] = f'{-wpa:.2f}%'
+
+            caught_base = CAUGHT_STEALING_BASES.get(result.upper())
+            bases = {slot: base for base, slot in enumerate(slots) if slot is not None}
+            slots, scored = _advance_runners(slots, batter, runs, new_runners, outs + outs_made, caught_base)
+            for slot in scored:
+                if slot[0] is None:
+                    # A runner the rulebook couldn't place (see _advance_runners)
+                    continue
+                base = bases.get(slot, -1)
+                row[RESPONSIBLE_PITCHER_COLUMNS[base]] = slot[1]
+                if slot[0] == len(self.rows):
+                    row['Run'] = 1
+                else:
+                    self.rows[slot[0]]['Run'] = 1
+            self.rows.append(row)
+
+            outs += outs_made
+            self.pitcher_outs[pitching_team] += outs_made
+            self.scores[batting_team] += runs
+            runs_this_inning += runs
+            if home and int(inning[1:]) >= REGULATION_INNINGS and self.scores[batting_team] > self.scores[pitching_team]:
+                return True
+        return False
+
+    def choose_play(self, slots, outs):
+        """Returns (result, PA type, swing, pitch, gamelog row of the runner for steals)."""
+        rng = self.rng
+        runners = [slot is not None for slot in slots]
+        roll = rng.random()
+        if runners == [True, False, False] and outs < 2 and roll < 0.2 and slots[0][0] is not None:
+            swing, pitch = rng.randint(1, 1000), rng.randint(1, 1000)
+            result = 'STEAL 2B' if get_diff(swing, pitch) <= 300 else 'CS 2B'
+            return result, 4, swing, pitch, slots[0][0]
+        if runners == [False, True, False] and outs < 2 and roll < 0.03 and slots[1][0] is not None:
+            swing, pitch = rng.randint(1, 1000), rng.randint(1, 1000)
+            result = 'STEAL 3B' if get_diff(swing, pitch) <= 200 else 'CS 3B'
+            return result, 4, swing, pitch, slots[1][0]
+        if roll < 0.0025:
+            return 'IBB', 8, None, None, None
+        if roll < 0.004:
+            return 'AUTO K', 9, None, None, None
+        if roll < 0.005:
+            return 'AUTO BB', 10, None, None, None
+
+        swing, pitch = rng.randint(1, 1000), rng.randint(1, 1000)
+        pa_type = 1
+        if self.season_num >= 7 and runners[2] and outs < 2 and rng.random() < 0.2:
+            pa_type = 2
+        return get_result(get_diff(swing, pitch)), pa_type, swing, pitch, None
+
+    def resolve(self, runners, outs, result, diff, pa_type):
+        """The rulebook outcome of a play, read the way the pipeline will read it back."""
+        new_runners, runs, outs_made = simulate_play(-1, runners, outs, result, '', diff or 0, self.season_num, pa_type)
+        if result in ('RGO', 'LGO'):
+            # Before S7 the next OBC decides between "infield in" and "infield back"; make sure it agrees.
+            obc_after = RUNNERS_TO_OBC[tuple(bool(r) for r in new_runners)]
+            new_runners, runs, outs_made = simulate_play(obc_after, runners, outs, result, '', diff or 0, self.season_num, pa_type)
+        return [bool(r) for r in new_runners], runs, outs_made
+
+    def get_old_result(self, result, runners, new_runners, runs, outs_made):
+        if result in ('RGO', 'LGO') and outs_made >= 2:
+            return 'TP' if outs_made >= 3 else 'DP'
+        if result == 'FO' and runs > 0:
+            return 'Sac'
+        if result.startswith('STEAL'):
+            return 'SB'
+        if result.startswith('CS'):
+            return 'CS'
+        return result
+
+    def get_neutral_result(self, result, diff, spread):
+        """The result the same swing would have had against a different range chart."""
+        if diff is None or result not in {chart_result for _, chart_result in RESULT_CHART}:
+            return result
+        return get_result(max(0, min(500, diff + self.rng.randint(-spread, spread))))
+
+def generate_season(rng, league, season_num, num_sessions):
+    """Returns (gamelog rows, player type rows) for one season."""
+    league.start_season()
+    simulator = GameSimulator(rng, league, season_num)
+    teams = list(league.teams)
+    games_started = {team: 0 for team in teams}
+    trade_sessions = sorted(rng.randint(2, max(2, num_sessions - 1)) for _ in range(TRADES_PER_SEASON))
+
+    rows = []
+    game_id = 1
+    inning_id = 1
+    for session in range(1, num_sessions + 1):
+        while trade_sessions and trade_sessions[0] == session:
+            trade_sessions.pop(0)
+            league.trade()
+        rng.shuffle(teams)
+        for i in range(0, len(teams) - 1, 2):
+            away, home = teams[i], teams[i + 1]
+            starters = {team: league.rosters[team]['starters'][games_started[team] % STARTERS] for team in (home, away)}
+            for team in (home, away):
+                games_started[team] += 1
+            game_rows, inning_id = simulator.play_game(game_id, session, home, away, starters, inning_id)
+            rows.extend(game_rows)
+            game_id += 1
+    return rows, league.get_player_types()
+
+def write_csv(path, columns, rows):
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=columns)
+        writer.writeheader()
+        writer.writerows(rows)
+
+def generate_league(output_dir, num_seasons=12, num_teams=30, num_sessions=16, seed=0):
+    """
+    Writes raw_gamelog_S<n>.csv and raw_player_types_S<n>.csv for seasons S1..S<num_seasons>, and a
+    team_history.json for the teams, to output_dir. Returns {'gamelogs': {season: path}, 'player_types':
+    {season: path}, 'team_history': path, 'plays': number of plays}.
+    """
+    if num_teams > len(TEAMS) or num_teams % 2:
+        raise ValueError(f"num_teams must be even and at most {len(TEAMS)}")
+    os.makedirs(output_dir, exist_ok=True)
+    rng = random.Random(seed)
+    league = League(rng, TEAMS[:num_teams])
+
+    paths = {'gamelogs': {}, 'player_types': {}, 'plays': 0}
+    for season_num in range(1, num_seasons + 1):
+        season = f'S{season_num}'
+        rows, player_types = generate_season(rng, league, season_num, num_sessions)
+        paths['gamelogs'][season] = os.path.join(output_dir, f'raw_gamelog_{season}.csv')
+        paths['player_types'][season] = os.path.join(output_dir, f'raw_player_types_{season}.csv')
+        write_csv(paths['gamelogs'][season], RAW_GAMELOG_COLUMNS, rows)
+        write_csv(paths['player_types'][season], PLAYER_TYPE_COLUMNS, player_types)
+        paths['plays'] += len(rows)
+        print(f"  {season}: {len(rows)} plays")
+
+    team_history = {team: [{'name': team, 'abbr': team, 'start': 1, 'end': 9999, 'logo': ''}] for team in league.teams}
+    paths['team_history'] = os.path.join(output_dir, 'team_history.json')
+    with open(paths['team_history'], 'w') as f:
+        json.dump(team_history, f, indent=2)
+    return paths
+
+def main():
+    parser = argparse.ArgumentParser(description="Generates a synthetic league in the raw gamelog and player type CSV schema.")
+    parser.add_argument('output_dir', help="Directory to write the CSVs and team_history.json to.")
+    parser.add_argument('--seasons', type=int, default=12, help="Number of seasons (default: 12).")
+    parser.add_argument('--teams', type=int, default=30, help="Number of teams, even (default: 30).")
+    parser.add_argument('--sessions', type=int, default=16, help="Regular season sessions per season (default: 16).")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed (default: 0).")
+    args = parser.parse_args()
+
+    print(f"Generating {args.seasons} synthetic seasons...")
+    paths = generate_league(args.output_dir, args.seasons, args.teams, args.sessions, args.seed)
+    print(f"Wrote {paths['plays']} plays to {args.output_dir}")
+
+if __name__ == "__main__":
+    main()
@@ -2,9 +2,15 @@ document.addEventListener('DOMContentLoaded', () => {
     const API = {
         hitting: './data/hitting_stats.json',
         pitching: './data/pitching_stats.json',
+        hittingIndex: './data/hitting_index.json',
+        pitchingIndex: './data/pitching_index.json',
+        hittingTotals: './data/hitting_totals.json',
+        pitchingTotals: './data/pitching_totals.json',
+        playerStats: (playerId) => `./data/players/${playerId}.json`,
         players: './data/player_id_map.json',
         seasons: './data/season_games_map.json',
-        scouting: './data/scouting_reports.json',
+        scoutingManifest: './data/scouting_manifest.json',
+        scoutingReport: (playerId) => `./data/scouting/${playerId}.json`,
         glossary: './data/glossary.json',
         divisions: './data/divisions.json', // Added
         teamHistory: './data/team_history.json',
@@ -13,7 +19,8 @@ document.addEventListener('DOMContentLoaded', () => {
         gamelogErrors: './data/gamelog-errors.json',
         typeDefinitions: './data/type_definitions.json',
         playerInfo: './data/player_info.json',
-        currentSeasonInfo: './data/current_season_info.json'
+        currentSeasonInfo: './data/current_season_info.json',
+        manifest: './data/manifest.json'
     };
 
     const state = {
@@ -24,6 +31,7 @@ document.addEventListener('DOMContentLoaded', () => {
         players: {},
         seasons: {},
         scoutingReports: {},
+        scoutingPitchers: new Set(),
         glossaryData: {},
         divisions: {}, // Added,
         teamHistory: {},
@@ -34,7 +42,11 @@ document.addEventListener('DOMContentLoaded', () => {
         playerMap: new Map(),
         currentPlayerId: null,
         lastTeamStatsUrl: '#/team-stats',
-        seasonsWithStats: []
+        seasonsWithStats: [],
+        statsSharded: false,
+        statsTotals: null,
+        manifest: {},
+        playerStats: new Map()
     };
 
     const elements = {
@@ -113,11 +125,14 @@ document.addEventListener('DOMContentLoaded', () => {
     };
 
     const parseCompactData = (response) => {
-        const { columns, data } = response;
+        // Text columns of the player stats are stored as indexes into their column's dictionary
+        const { columns, data, dictionaries = {} } = response;
+        const lookups = columns.map(col => dictionaries[col]);
         return data.map(row => {
             const obj = {};
             columns.forEach((col, i) => {
-                obj[col] = row[i];
+                const lookup = lookups[i];
+                obj[col] = lookup && row[i] !== null ? lookup[row[i]] : row[i];
             });
             return obj;
         });
@@ -212,23 +227,40 @@ document.addEventListener('DOMContentLoaded', () => {
 
 
 
+    // The build's manifest maps each dataset to a copy named after its content, which can be cached for good
+    const dataUrl = (url) => {
+        const fileName = url.replace('./data/', '');
+        return state.manifest[fileName] ? `./data/${state.manifest[fileName]}` : url;
+    };
+
     const loadData = async () => {
         try {
-            const [hitting, pitching, players, seasons, scouting, glossary, divisions, teamHistory, teamHitting, teamPitching, gamelogErrors, typeDefinitions, playerInfo, currentSeasonInfo] = await Promise.all([
-                fetch(API.hitting).then(res => res.json()),
-                fetch(API.pitching).then(res => res.json()),
-                fetch(API.players).then(res => res.json()),
-                fetch(API.seasons).then(res => res.json()),
-                fetch(API.scouting).then(res => res.json()),
-                fetch(API.glossary).then(res => res.json()),
-                fetch(API.divisions).then(res => res.json()), // Added
-                fetch(API.teamHistory).then(res => res.json()),
-                fetch(API.teamHitting).then(res => res.json()),
-                fetch(API.teamPitching).then(res => res.json()),
-                fetch(API.gamelogErrors).then(res => res.json()),
-                fetch(API.typeDefinitions).then(res => res.json()),
-                fetch(API.playerInfo).then(res => res.json()),
-                fetch(API.currentSeasonInfo).then(res => res.json())
+            state.manifest = await fetch(API.manifest, { cache: 'no-cache' })
+                .then(res => res.ok ? res.json() : {})
+                .catch(() => ({}));
+
+            const [hittingIndex, pitchingIndex, players, seasons, scoutingManifest, glossary, divisions, teamHistory, teamHitting, teamPitching, gamelogErrors, typeDefinitions, playerInfo, currentSeasonInfo] = await Promise.all([
+                fetch(dataUrl(API.hittingIndex)).then(res => res.ok ? res.json() : null),
+                fetch(dataUrl(API.pitchingIndex)).then(res => res.ok ? res.json() : null),
+                fetch(dataUrl(API.players)).then(res => res.json()),
+                fetch(dataUrl(API.seasons)).then(res => res.json()),
+                fetch(dataUrl(API.scoutingManifest)).then(res => res.json()),
+                fetch(dataUrl(API.glossary)).then(res => res.json()),
+                fetch(dataUrl(API.divisions)).then(res => res.json()), // Added
+                fetch(dataUrl(API.teamHistory)).then(res => res.json()),
+                fetch(dataUrl(API.teamHitting)).then(res => res.json()),
+                fetch(dataUrl(API.teamPitching)).then(res => res.json()),
+                fetch(dataUrl(API.gamelogErrors)).then(res => res.json()),
+                fetch(dataUrl(API.typeDefinitions)).then(res => res.json()),
+                fetch(dataUrl(API.playerInfo)).then(res => res.json()),
+                fetch(dataUrl(API.currentSeasonInfo)).then(res => res.json())
+            ]);
+
+            // Sharded builds publish the stats indexes plus one file per player; other builds publish the full stats
+            state.statsSharded = Boolean(hittingIndex && pitchingIndex);
+            const [hitting, pitching] = state.statsSharded ? [hittingIndex, pitchingIndex] : await Promise.all([
+                fetch(dataUrl(API.hitting)).then(res => res.json()),
+                fetch(dataUrl(API.pitching)).then(res => res.json())
             ]);
 
             state.hittingStats = parseCompactData(hitting);
@@ -237,7 +269,7 @@ document.addEventListener('DOMContentLoaded', () => {
             state.teamPitchingStats = parseCompactData(teamPitching);
             state.players = players;
             state.seasons = seasons;
-            state.scoutingReports = scouting;
+            state.scoutingPitchers = new Set(scoutingManifest);
             state.glossaryData = glossary;
             state.divisions = divisions; // Added
             state.teamHistory = teamHistory;
@@ -287,7 +319,7 @@ document.addEventListener('DOMContentLoaded', () => {
         }
     };
 
-    const getFeaturedEntities = () => {
+    const getFeaturedEntities = async () => {
         const today = new Date();
         const seed = today.getFullYear() * 10000 + (today.getMonth() + 1) * 100 + today.getDate();
         const random = seededRandom(seed);
@@ -302,11 +334,13 @@ document.addEventListener('DOMContentLoaded', () => {
         }
         let featuredPlayerId1 = playerIds[randomIndex1];
         let featuredPlayerId2 = playerIds[randomIndex2];
+        const [featuredStats1, featuredStats2] = await Promise.all([
+            loadPlayerStats(parseInt(featuredPlayerId1)),
+            loadPlayerStats(parseInt(featuredPlayerId2))
+        ]);
 
         // --- Process Player 1 ---
-        const playerHittingStats1 = state.hittingStats.filter(s => s['Hitter ID'] === parseInt(featuredPlayerId1));
-        const playerPitchingStats1 = state.pitchingStats.filter(s => s['Pitcher ID'] === parseInt(featuredPlayerId1));
-        const allPlayerStats1 = [...playerHittingStats1, ...playerPitchingStats1];
+        const allPlayerStats1 = [...featuredStats1.hittingStats, ...featuredStats1.pitchingStats];
 
         let firstSeason1 = Infinity;
         let lastSeason1 = -Infinity;
@@ -337,9 +371,7 @@ document.addEventListener('DOMContentLoaded', () => {
         const featuredPlayerMostRecentSeason1 = mostRecentSeasonForPlayer1;
 
         // --- Process Player 2 ---
-        const playerHittingStats2 = state.hittingStats.filter(s => s['Hitter ID'] === parseInt(featuredPlayerId2));
-        const playerPitchingStats2 = state.pitchingStats.filter(s => s['Pitcher ID'] === parseInt(featuredPlayerId2));
-        const allPlayerStats2 = [...playerHittingStats2, ...playerPitchingStats2];
+        const allPlayerStats2 = [...featuredStats2.hittingStats, ...featuredStats2.pitchingStats];
 
         let firstSeason2 = Infinity;
         let lastSeason2 = -Infinity;
@@ -475,12 +507,13 @@ document.addEventListener('DOMContentLoaded', () => {
         }
     };
 
-    const renderHome = () => {
+    const renderHome = async () => {
+        // The featured players' rows come from their player files in sharded builds
         const { 
             featuredPlayerId1, featuredPlayerSeasonRange1, featuredPlayerMostRecentTeamKey1, featuredPlayerMostRecentSeason1,
             featuredPlayerId2, featuredPlayerSeasonRange2, featuredPlayerMostRecentTeamKey2, featuredPlayerMostRecentSeason2,
             featuredTeamKey, featuredTeamSeason 
-        } = getFeaturedEntities();
+        } = await getFeaturedEntities();
 
         const featuredPlayer1 = state.players[featuredPlayerId1];
         const featuredPlayer2 = state.players[featuredPlayerId2];
@@ -789,7 +822,25 @@ document.addEventListener('DOMContentLoaded', () => {
         }
     };
 
-    const handleLeaderboardView = () => {
+    // Sharded builds keep the Franchise and Type totals out of the indexes; only the filtered all-time leaderboards read them
+    const loadStatsTotals = () => {
+        if (!state.statsSharded) return Promise.resolve();
+        if (!state.statsTotals) {
+            state.statsTotals = Promise.all([
+                fetch(dataUrl(API.hittingTotals)).then(res => res.json()),
+                fetch(dataUrl(API.pitchingTotals)).then(res => res.json())
+            ]).then(([hittingTotals, pitchingTotals]) => {
+                state.hittingStats = state.hittingStats.concat(parseCompactData(hittingTotals));
+                state.pitchingStats = state.pitchingStats.concat(parseCompactData(pitchingTotals));
+            }).catch(error => {
+                state.statsTotals = null;
+                throw error;
+            });
+        }
+        return state.statsTotals;
+    };
+
+    const handleLeaderboardView = async () => {
         console.log('handleLeaderboardView called');
         const stat = elements.leaderboardStatSelect.value;
         if (!stat) return;
@@ -797,6 +848,9 @@ document.addEventListener('DOMContentLoaded', () => {
 
         const type = elements.leaderboardTypeSelect.value;
         const selectedTeam = elements.leaderboardTeamFilter.value;
+        if (selectedTeam || elements.leaderboardTypeFilter.value) {
+            await loadStatsTotals();
+        }
         const isHitting = type === 'batting';
         const reverseSort = elements.reverseSort.checked;
         const sortModifier = reverseSort ? -1 : 1;
@@ -1338,8 +1392,19 @@ document.addEventListener('DOMContentLoaded', () => {
         elements.leaderboardsContentDisplay.appendChild(gridContainer);
     };
 
-    const displayScoutingReport = (playerId) => {
-        const report = state.scoutingReports[playerId];
+    const loadScoutingReport = async (playerId) => {
+        if (!state.scoutingPitchers.has(playerId)) return null;
+        if (!(playerId in state.scoutingReports)) {
+            const res = await fetch(API.scoutingReport(playerId));
+            state.scoutingReports[playerId] = res.ok ? await res.json() : null;
+        }
+        return state.scoutingReports[playerId];
+    };
+
+    const displayScoutingReport = async (playerId) => {
+        const report = await loadScoutingReport(playerId);
+        // The page may have moved on while the report was loading
+        if (state.currentPlayerId !== playerId || window.location.hash !== '#/scouting') return;
         if (!report) {
             elements.statsContentDisplay.innerHTML += `<p>No scouting report available.</p>`;
             return;
@@ -1691,21 +1756,39 @@ document.addEventListener('DOMContentLoaded', () => {
 
 
 
-    const displayPlayerPage = (playerId) => {
+    const loadPlayerStats = async (playerId) => {
+        if (!state.statsSharded) {
+            return {
+                hittingStats: state.hittingStats.filter(s => s['Hitter ID'] === playerId),
+                pitchingStats: state.pitchingStats.filter(s => s['Pitcher ID'] === playerId)
+            };
+        }
+        if (!state.playerStats.has(playerId)) {
+            const res = await fetch(API.playerStats(playerId));
+            const shard = res.ok ? await res.json() : {};
+            state.playerStats.set(playerId, {
+                hittingStats: shard.hitting ? parseCompactData(shard.hitting) : [],
+                pitchingStats: shard.pitching ? parseCompactData(shard.pitching) : []
+            });
+        }
+        return state.playerStats.get(playerId);
+    };
+
+    const displayPlayerPage = async (playerId) => {
         state.currentPlayerId = playerId;
         elements.statsContentDisplay.innerHTML = '';
         const player = state.players[playerId];
         if (!player) return;
 
+        const { hittingStats, pitchingStats } = await loadPlayerStats(playerId);
+        if (state.currentPlayerId !== playerId) return; // Another player was opened while this one loaded
+
         const path = window.location.hash || '#/stats';
         const isScouting = path === '#/scouting';
         const isStats = path === '#/stats';
 
         const playerName = player.currentName;
 
-        const hittingStats = state.hittingStats.filter(s => s['Hitter ID'] === playerId);
-        const pitchingStats = state.pitchingStats.filter(s => s['Pitcher ID'] === playerId);
-
         // Filter out 'Type' rows from player stat tables
         const filteredHittingStats = hittingStats.filter(s => s.Season !== 'Type');
         const filteredPitchingStats = pitchingStats.filter(s => s.Season !== 'Type');
@@ -1,9 +1,25 @@
+import hashlib
 import re
 import pandas as pd
 import sys
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from io import BytesIO
+
+# --- Download Settings ---
+DOWNLOAD_WORKERS = 8
+DOWNLOAD_TIMEOUT = 30 # seconds per request
+DOWNLOAD_RETRIES = 3
+DOWNLOAD_BACKOFF = 1.0 # seconds, doubled after every failed attempt
 
 def get_export_url(url):
     """Converts a Google Sheet URL to a CSV export URL, correctly handling the gid."""
+    # URLs that are not Google Sheets (e.g. a local server hosting CSV files) are used as-is.
+    if 'docs.google.com/spreadsheets' not in url:
+        return url
+
     # The gid is often at the end of the URL after #gid=
     match_gid = re.search(r'#gid=(\d+)', url)
     if not match_gid:
@@ -29,6 +45,162 @@ def get_export_url(url):
 import numpy as np
 import os
 import json
+from game_processing import RESULT_COLUMNS, RESULT_DTYPE
+
+# --- Download Helper Functions ---
+def _is_retryable(error):
+    """Client errors (404, 403, ...) won't fix themselves; everything else is worth another try."""
+    if isinstance(error, urllib.error.HTTPError):
+        return error.code >= 500 or error.code == 429
+    return True
+
+def _fetch_export(export_url, timeout=DOWNLOAD_TIMEOUT, retries=DOWNLOAD_RETRIES, backoff=DOWNLOAD_BACKOFF, validators=None):
+    """
+    Downloads a single CSV export, retrying with exponential backoff.
+
+    If `validators` holds an 'etag' and/or 'last_modified' from a previous download, a conditional
+    request is sent. Returns (content, validators), where content is None if the server answered
+    304 Not Modified.
+    """
+    headers = {}
+    if validators:
+        if validators.get('etag'):
+            headers['If-None-Match'] = validators['etag']
+        if validators.get('last_modified'):
+            headers['If-Modified-Since'] = validators['last_modified']
+    request = urllib.request.Request(export_url, headers=headers)
+
+    attempt = 0
+    while True:
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                content = response.read()
+                return content, {'etag': response.headers.get('ETag'), 'last_modified': response.headers.get('Last-Modified')}
+        except urllib.error.HTTPError as e:
+            if e.code == 304:
+                return None, dict(validators)
+            if attempt >= retries or not _is_retryable(e):
+                raise
+            error = e
+        except (urllib.error.URLError, TimeoutError, ConnectionError) as e:
+            if attempt >= retries:
+                raise
+            error = e
+        delay = backoff * (2 ** attempt)
+        print(f"Warning: Download of {export_url} failed ({error}). Retrying in {delay:.1f}s...")
+        time.sleep(delay)
+        attempt += 1
+
+def fetch_exports(export_urls, max_workers=DOWNLOAD_WORKERS, timeout=DOWNLOAD_TIMEOUT, retries=DOWNLOAD_RETRIES, backoff=DOWNLOAD_BACKOFF, validators=None):
+    """
+    Downloads several CSV exports concurrently.
+
+    Args:
+        export_urls (dict): Maps a key (e.g. a season name) to the URL to download.
+        validators (dict, optional): Maps a key to the 'etag'/'last_modified' of its cached copy,
+            turning that download into a conditional request.
+
+    Returns:
+        tuple: ({key: (bytes or None, validators)} for successful downloads, {key: Exception} for
+        failed ones). The bytes are None when the server reported the cached copy is still current.
+    """
+    contents, errors = {}, {}
+    if not export_urls:
+        return contents, errors
+    validators = validators or {}
+
+    workers = max(1, min(max_workers, len(export_urls)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(_fetch_export, url, timeout, retries, backoff, validators.get(key)): key
+            for key, url in export_urls.items()
+        }
+        for future in as_completed(futures):
+            key = futures[future]
+            try:
+                contents[key] = future.result()
+            except Exception as e:
+                errors[key] = e
+    return contents, errors
+
+# --- Download Metadata Helper Functions ---
+def _content_digest(content):
+    return hashlib.sha256(content).hexdigest()
+
+def _download_meta_path(raw_cache_path):
+    """The ETag, Last-Modified and digest of a raw download are kept next to its cached copy."""
+    return os.path.splitext(raw_cache_path)[0] + '.meta.json'
+
+def _read_download_meta(raw_cache_path):
+    meta_path = _download_meta_path(raw_cache_path)
+    if not os.path.exists(meta_path):
+        return {}
+    try:
+        with open(meta_path, 'r') as f:
+            return json.load(f)
+    except (json.JSONDecodeError, IOError):
+        return {}
+
+def _write_download_meta(raw_cache_path, validators, digest):
+    meta = {'etag': validators.get('etag'), 'last_modified': validators.get('last_modified'), 'sha256': digest}
+    try:
+        with open(_download_meta_path(raw_cache_path), 'w') as f:
+            json.dump(meta, f)
+    except IOError:
+        print(f"Warning: Could not write download metadata for {raw_cache_path}.")
+
+def _cached_digest(raw_cache_path):
+    """Returns the digest of a cached raw file, preferring the one recorded at download time."""
+    digest = _read_download_meta(raw_cache_path).get('sha256')
+    if digest is None and os.path.exists(raw_cache_path):
+        with open(raw_cache_path, 'rb') as f:
+            digest = _content_digest(f.read())
+    return digest
+
+def _conditional_validators(raw_cache_path):
+    """Validators for a conditional re-download, or None if there is no cached copy to fall back on."""
+    if not os.path.exists(raw_cache_path):
+        return None
+    meta = _read_download_meta(raw_cache_path)
+    if not meta.get('etag') and not meta.get('last_modified'):
+        return None
+    return meta
+
+def _store_download(raw_cache_path, content, validators):
+    """
+    Writes a fresh download to the raw cache unless it is byte-identical to the cached copy.
+
+    Returns True if the cached data changed.
+    """
+    if content is None: # 304 Not Modified
+        return False
+    digest = _content_digest(content)
+    changed = digest != _cached_digest(raw_cache_path)
+    if changed:
+        with open(raw_cache_path, 'wb') as f:
+            f.write(content)
+    _write_download_meta(raw_cache_path, validators, digest)
+    return changed
+
+def get_input_fingerprint():
+    """
+    Returns a single digest over every cached raw gamelog and player type file, and the static player types.
+
+    The fingerprint only changes when the input bytes change. Together with the digest of the scripts
+    (see get_build_fingerprint in generate_web_data.py) it is compared against the last completed build
+    to skip rebuilding when nothing new has been played.
+    """
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    data_dir = os.path.join(script_dir, '..', 'data')
+    digests = {}
+    for sub_dir in ['cache/raw_gamelogs', 'cache/raw_player_types', 'static_player_types']:
+        dir_path = os.path.join(data_dir, *sub_dir.split('/'))
+        if not os.path.isdir(dir_path):
+            continue
+        for file_name in sorted(os.listdir(dir_path)):
+            if file_name.endswith('.csv'):
+                digests[f'{sub_dir}/{file_name}'] = _cached_digest(os.path.join(dir_path, file_name))
+    return _content_digest(json.dumps(digests, sort_keys=True).encode('utf-8'))
 
 # --- Caching Helper Functions ---
 def _read_cache_manifest(cache_dir):
@@ -44,14 +216,211 @@ def _read_cache_manifest(cache_dir):
 
 def _write_cache_manifest(cache_dir, most_recent_season):
     manifest_path = os.path.join(cache_dir, 'cache_info.json')
+    manifest = {}
+    if os.path.exists(manifest_path):
+        try:
+            with open(manifest_path, 'r') as f:
+                manifest = json.load(f)
+        except (json.JSONDecodeError, IOError):
+            manifest = {}
+    manifest['last_run_most_recent'] = most_recent_season
     try:
         with open(manifest_path, 'w') as f:
-            json.dump({'last_run_most_recent': most_recent_season}, f)
+            json.dump(manifest, f)
     except IOError:
         print("Warning: Could not write to cache manifest file.")
 
-def load_all_seasons():
-    """Loads all seasons' data, adding a 'GameType' column and caching raw downloads."""
+# --- Columnar Cache Helper Functions ---
+# Every raw gamelog column has a fixed type, no matter how the sheet export happened to be inferred.
+# Integer columns fall back to float64 when a sheet leaves cells blank, just as read_csv would.
+# WPA is converted from the sheets' percent units to a fraction.
+RAW_GAMELOG_SCHEMA = {
+    'Hitter': 'str', 'Hitter ID': 'float64', 'Swing': 'float64',
+    'Pitcher': 'str', 'Pitcher ID': 'float64', 'Pitch': 'float64',
+    'Old Result': 'str', 'Diff': 'float64', 'Inning': 'str',
+    'Outs': 'int64', 'OBC': 'int64', 'Home Score': 'int64', 'Away Score': 'int64',
+    'Batter WPA': 'percent', 'Pitcher WPA': 'percent',
+    'RBI': 'int64', 'Run': 'int64', 'Scores': 'int64',
+    'Inning ID': 'int64', 'Game ID': 'int64', 'Session': 'int64',
+    'Batter Team': 'str', 'Pitcher Team': 'str',
+    'Exact Result': 'str', 'Result at Neutral': 'str', 'Result At Neutral': 'str', 'Result All Neutral': 'str',
+    'Pitcher Responsible for Runner on 1st Who Scored': 'float64',
+    'Pitcher Responsible for Runner on 2nd Who Scored': 'float64',
+    'Pitcher Responsible for Runner on 3rd Who Scored': 'float64',
+    'Pitcher Responsible for Batter Who Scored': 'float64',
+    'PA Type': 'int64',
+}
+# Bump whenever RAW_GAMELOG_SCHEMA or the on-disk layout changes, so old columnar files are rebuilt.
+COLUMNAR_CACHE_VERSION = 2
+
+# The narrow types every gamelog is handed to the pipeline in (see apply_gamelog_schema). Missing values
+# stay as <NA> in the nullable integer columns and NaN in WPA; results are RESULT_DTYPE categoricals.
+GAMELOG_SCHEMA = {
+    'Hitter ID': 'Int32', 'Pitcher ID': 'Int32',
+    'Pitcher Responsible for Runner on 1st Who Scored': 'Int32',
+    'Pitcher Responsible for Runner on 2nd Who Scored': 'Int32',
+    'Pitcher Responsible for Runner on 3rd Who Scored': 'Int32',
+    'Pitcher Responsible for Batter Who Scored': 'Int32',
+    'Swing': 'Int16', 'Pitch': 'Int16', 'Diff': 'Int16',
+    'OBC': 'Int8', 'Outs': 'Int8', 'PA Type': 'Int8',
+    'RBI': 'Int8', 'Run': 'Int8',
+    'Batter WPA': 'float32', 'Pitcher WPA': 'float32',
+    **{col: RESULT_DTYPE for col in RESULT_COLUMNS},
+}
+
+class UnknownResultError(ValueError):
+    """A gamelog holds a result that isn't in RESULT_CODES, so no stat engine could count the play."""
+
+try:
+    import pyarrow # noqa: F401
+    COLUMNAR_FORMAT = 'parquet'
+except ImportError:
+    COLUMNAR_FORMAT = 'npz'
+
+def apply_raw_gamelog_schema(df):
+    """Coerces a freshly parsed raw gamelog to RAW_GAMELOG_SCHEMA. Unknown columns are left as parsed."""
+    df = df.copy()
+    for col, kind in RAW_GAMELOG_SCHEMA.items():
+        if col not in df.columns:
+            continue
+        values = df[col]
+        if kind == 'str':
+            df[col] = values.astype('str').where(values.notna())
+            continue
+        if kind == 'percent' and not pd.api.types.is_numeric_dtype(values):
+            values = values.astype('str').str.strip('%')
+        values = pd.to_numeric(values, errors='coerce').astype('float64')
+        if kind == 'percent':
+            values = values / 100
+        if kind == 'int64' and not values.isna().any():
+            values = values.astype('int64')
+        df[col] = values
+    return df
+
+def apply_gamelog_schema(df):
+    """
+    Returns a copy of df with its columns narrowed to GAMELOG_SCHEMA. Columns already of their schema
+    type are left alone, so this is cheap to re-apply after rows are added. Raises UnknownResultError for a
+    result that isn't in RESULT_CODES rather than dropping the play from every stat.
+    """
+    df = df.copy()
+    for col, dtype in GAMELOG_SCHEMA.items():
+        if col not in df.columns or df[col].dtype == dtype:
+            continue
+        values = df[col]
+        if dtype == RESULT_DTYPE:
+            unknown = values[values.notna() & ~values.isin(RESULT_DTYPE.categories)].unique()
+            if len(unknown):
+                raise UnknownResultError(
+                    f"Unknown results in '{col}': {', '.join(map(str, unknown))}. Add them to RESULT_CODES "
+                    "(and the rulebook in simulate_play) in scripts/game_processing.py."
+                )
+            df[col] = values.astype(RESULT_DTYPE)
+        else:
+            df[col] = pd.to_numeric(values, errors='coerce').astype(dtype)
+    return df
+
+def _columnar_cache_path(raw_cache_path):
+    return os.path.splitext(raw_cache_path)[0] + f'.{COLUMNAR_FORMAT}'
+
+def _columnar_info_path(raw_cache_path):
+    """The digest of the CSV a columnar file was built from is kept next to it."""
+    return os.path.splitext(raw_cache_path)[0] + '.columnar.json'
+
+def _write_npz(path, df):
+    """
+    Stores every column as a typed NumPy array. String columns are dictionary-encoded: an int32
+    code per row (-1 for missing) plus the array of distinct values.
+    """
+    arrays = {'__columns__': np.array(df.columns, dtype=str)}
+    for i, col in enumerate(df.columns):
+        values = df[col]
+        if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+            arrays[f'c{i}'] = values.to_numpy()
+        else:
+            codes, categories = pd.factorize(values.astype('str').where(values.notna()))
+            arrays[f'c{i}_codes'] = codes.astype(np.int32)
+            arrays[f'c{i}_categories'] = np.array(categories, dtype=str)
+    # Written through a file handle so NumPy doesn't append its own '.npz' to the name.
+    with open(path, 'wb') as f:
+        np.savez(f, **arrays)
+
+def _read_npz(path):
+    columns = {}
+    with np.load(path, allow_pickle=False) as data:
+        names = [str(name) for name in data['__columns__']]
+        for i, col in enumerate(names):
+            if f'c{i}' in data:
+                columns[col] = data[f'c{i}']
+                continue
+            codes = data[f'c{i}_codes']
+            categories = data[f'c{i}_categories'].astype(object)
+            values = categories.take(codes, mode='clip') if len(categories) else np.empty(len(codes), dtype=object)
+            values[codes < 0] = np.nan
+            columns[col] = pd.array(values, dtype='str')
+    return pd.DataFrame(columns, columns=names)
+
+def _write_columnar_cache(raw_cache_path, df, digest):
+    path = _columnar_cache_path(raw_cache_path)
+    try:
+        if COLUMNAR_FORMAT == 'parquet':
+            df.to_parquet(path, index=False)
+        else:
+            _write_npz(path, df)
+        with open(_columnar_info_path(raw_cache_path), 'w') as f:
+            json.dump({'sha256': digest, 'format': COLUMNAR_FORMAT, 'version': COLUMNAR_CACHE_VERSION}, f)
+    except (IOError, ValueError) as e:
+        print(f"Warning: Could not write columnar cache for {raw_cache_path}: {e}")
+
+def _read_columnar_cache(raw_cache_path, digest):
+    """Returns the typed frame for a raw CSV, or None if there is no columnar copy of these exact bytes."""
+    path = _columnar_cache_path(raw_cache_path)
+    info_path = _columnar_info_path(raw_cache_path)
+    if not os.path.exists(path) or not os.path.exists(info_path):
+        return None
+    try:
+        with open(info_path, 'r') as f:
+            info = json.load(f)
+    except (json.JSONDecodeError, IOError):
+        return None
+    if info != {'sha256': digest, 'format': COLUMNAR_FORMAT, 'version': COLUMNAR_CACHE_VERSION}:
+        return None
+    try:
+        if COLUMNAR_FORMAT == 'parquet':
+            return pd.read_parquet(path)
+        return _read_npz(path)
+    except Exception as e:
+        print(f"Warning: Could not read columnar cache {path}: {e}")
+        return None
+
+def read_raw_gamelog(raw_cache_path, content=None):
+    """
+    Loads a cached raw gamelog as a frame in GAMELOG_SCHEMA types.
+
+    The CSV stays the durable copy of each download; a columnar copy is kept beside it so later runs
+    skip CSV parsing and type inference. `content` is the CSV bytes if they are already in memory.
+    """
+    if content is None:
+        digest = _cached_digest(raw_cache_path)
+        df = _read_columnar_cache(raw_cache_path, digest)
+        if df is not None:
+            return apply_gamelog_schema(df)
+        df = pd.read_csv(raw_cache_path)
+    else:
+        digest = _content_digest(content)
+        df = _read_columnar_cache(raw_cache_path, digest)
+        if df is not None:
+            return apply_gamelog_schema(df)
+        df = pd.read_csv(BytesIO(content))
+    df = apply_raw_gamelog_schema(df)
+    _write_columnar_cache(raw_cache_path, df, digest)
+    return apply_gamelog_schema(df)
+
+def load_all_seasons(max_workers=DOWNLOAD_WORKERS):
+    """Loads all seasons' data, adding a 'GameType' column and caching raw downloads.
+
+    Seasons that are missing from the cache (or must be refreshed) are downloaded concurrently.
+    """
     season_data = {}
     
     script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -83,6 +452,11 @@ def load_all_seasons():
         print(f"New season detected. Invalidating raw data cache for {previous_most_recent}...")
         seasons_to_recalc.append(previous_most_recent)
 
+    # Pass 1: use the local cache where allowed and collect everything that must be downloaded.
+    season_entries = []
+    cached_frames = {}
+    export_urls = {}
+    validators = {}
     for log in gamelogs:
         parts = log.strip().split('\t')
         if len(parts) != 3:
@@ -91,40 +465,64 @@ def load_all_seasons():
         season, num_games_str, url = parts
         force_recalc = (season == most_recent_season) or (season in seasons_to_recalc)
         raw_cache_path = os.path.join(raw_data_cache_dir, f'raw_gamelog_{season}.csv')
+        season_entries.append((season, num_games_str, raw_cache_path))
 
-        df = None
         if os.path.exists(raw_cache_path) and not force_recalc:
             try:
-                df = pd.read_csv(raw_cache_path)
+                cached_frames[season] = read_raw_gamelog(raw_cache_path)
                 print(f"Loaded {season} data from local cache.")
+                continue
+            except UnknownResultError:
+                raise
             except Exception as e:
                 print(f"Error loading {season} from cache: {e}. Re-downloading...")
-                df = None
 
+        export_url = get_export_url(url)
+        if export_url:
+            export_urls[season] = export_url
+            # The in-progress season is refreshed every run; only fetch it if it changed.
+            season_validators = _conditional_validators(raw_cache_path)
+            if season_validators:
+                validators[season] = season_validators
+        else:
+            print(f"Could not generate export URL for {url}")
+
+    # Pass 2: download all missing seasons in parallel.
+    if export_urls:
+        print(f"Downloading data for {', '.join(export_urls)}...")
+    downloaded, download_errors = fetch_exports(export_urls, max_workers=max_workers, validators=validators)
+
+    # Pass 3: tag game types and cache new downloads, in gamelogs.txt order.
+    for season, num_games_str, raw_cache_path in season_entries:
+        df = cached_frames.get(season)
         if df is None:
-            export_url = get_export_url(url)
-            if export_url:
-                try:
-                    print(f"Downloading data for {season}...")
-                    df = pd.read_csv(export_url)
-                    df.to_csv(raw_cache_path, index=False)
-                except Exception as e:
-                    print(f"Error loading data for {season} from URL: {e}")
-                    continue
-            else:
-                print(f"Could not generate export URL for {url}")
+            if season in download_errors:
+                print(f"Error loading data for {season} from URL: {download_errors[season]}")
+                continue
+            if season not in downloaded:
                 continue
-        
-        if df is not None:
             try:
-                num_games = int(num_games_str)
-                if 'Session' in df.columns:
-                    df['GameType'] = np.where(df['Session'] <= num_games, 'Regular', 'Playoff')
-                    season_data[season] = df
+                content, season_validators = downloaded[season]
+                if _store_download(raw_cache_path, content, season_validators):
+                    df = read_raw_gamelog(raw_cache_path, content)
                 else:
-                    print(f"Warning: 'Session' column not found for {season}.")
-            except ValueError:
-                print(f"Warning: Invalid number of games for season '{season}'.")
+                    print(f"{season} data is unchanged since the last download.")
+                    df = read_raw_gamelog(raw_cache_path)
+            except UnknownResultError:
+                raise
+            except Exception as e:
+                print(f"Error loading data for {season} from URL: {e}")
+                continue
+
+        try:
+            num_games = int(num_games_str)
+            if 'Session' in df.columns:
+                df['GameType'] = np.where(df['Session'] <= num_games, 'Regular', 'Playoff')
+                season_data[season] = df
+            else:
+                print(f"Warning: 'Session' column not found for {season}.")
+        except ValueError:
+            print(f"Warning: Invalid number of games for season '{season}'.")
 
     _write_cache_manifest(cache_dir, most_recent_season)
     return season_data, most_recent_season, [most_recent_season] + seasons_to_recalc if most_recent_season else seasons_to_recalc
@@ -151,7 +549,7 @@ def load_player_id_map():
             name_to_id_map[former_name.lower()] = player_id_int
     return name_to_id_map
 
-def load_player_types(force_seasons=None):
+def load_player_types(force_seasons=None, max_workers=DOWNLOAD_WORKERS):
     """Loads all player type data from the sheets specified in player_types.txt."""
     player_type_data = {}
     
@@ -187,6 +585,24 @@ def load_player_types(force_seasons=None):
 
     force_seasons = force_seasons or []
 
+    # Download every remote sheet that is missing from the cache (or forced) in parallel up front.
+    export_urls = {}
+    validators = {}
+    for item in seasons_to_process:
+        if item['source'] != 'url':
+            continue
+        raw_cache_path = os.path.join(cache_dir, f"raw_player_types_{item['season']}.csv")
+        if item['season'] in force_seasons or not os.path.exists(raw_cache_path):
+            export_url = get_export_url(item['url'])
+            if export_url:
+                export_urls[item['season']] = export_url
+                season_validators = _conditional_validators(raw_cache_path)
+                if season_validators:
+                    validators[item['season']] = season_validators
+    if export_urls:
+        print(f"Downloading player types for {', '.join(export_urls)}...")
+    downloaded, download_errors = fetch_exports(export_urls, max_workers=max_workers, validators=validators)
+
     for item in seasons_to_process:
         season = item['season']
         force_recalc = season in force_seasons
@@ -209,9 +625,19 @@ def load_player_types(force_seasons=None):
                 export_url = get_export_url(url)
                 if export_url:
                     try:
-                        print(f"Downloading player types for {season}...")
-                        df = pd.read_csv(export_url)
-                        df.to_csv(raw_cache_path, index=False)
+                        if season in download_errors:
+                            raise download_errors[season]
+                        if season in downloaded:
+                            content, season_validators = downloaded[season]
+                        else:
+                            # The cached copy turned out to be unreadable; fetch it now.
+                            print(f"Downloading player types for {season}...")
+                            content, season_validators = _fetch_export(export_url)
+                        if _store_download(raw_cache_path, content, season_validators):
+                            df = pd.read_csv(BytesIO(content))
+                        else:
+                            print(f"{season} player types are unchanged since the last download.")
+                            df = pd.read_csv(raw_cache_path, dtype={'Player ID': str})
                     except Exception as e:
                         print(f"Error loading player types for {season} from URL: {e}")
                         continue
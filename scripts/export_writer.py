@@ -0,0 +1,89 @@
+"""
+Writes the web app's data files (docs/data) only when their content changed.
+
+Every file is serialized in memory first and compared with the digest of the file already on disk. The
+digests are kept in data/cache/export_digests.json together with each file's size and modification time;
+a file whose size or modification time no longer matches (after a checkout or a hand edit) is hashed again.
+Unchanged files are neither rewritten nor touched, so the nightly commit and the Pages deploy only see the
+files whose data actually changed.
+"""
+import hashlib
+import json
+import os
+
+class ExportWriter:
+    def __init__(self, output_dir, cache_dir):
+        self.output_dir = output_dir
+        self.digests_path = os.path.join(cache_dir, 'export_digests.json')
+        self.digests = {}
+        if os.path.exists(self.digests_path):
+            try:
+                with open(self.digests_path, 'r') as f:
+                    self.digests = json.load(f).get('files', {})
+            except (json.JSONDecodeError, IOError, AttributeError):
+                self.digests = {}
+        self.changed = []
+        self.removed = []
+        self.num_unchanged = 0
+
+    def path(self, name):
+        """Path of a file given by its name relative to docs/data (e.g. 'players/123.json')."""
+        return os.path.join(self.output_dir, *name.split('/'))
+
+    def exists(self, name):
+        return os.path.exists(self.path(name))
+
+    def _stat(self, name):
+        stat = os.stat(self.path(name))
+        return [stat.st_size, stat.st_mtime_ns]
+
+    def _disk_digest(self, name):
+        if not self.exists(name):
+            return None
+        entry = self.digests.get(name)
+        if entry and entry['stat'] == self._stat(name):
+            return entry['digest']
+        with open(self.path(name), 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+
+    def write_bytes(self, name, content):
+        """Writes content to the file unless it already holds exactly that. Returns whether it was written."""
+        digest = hashlib.sha256(content).hexdigest()
+        is_changed = self._disk_digest(name) != digest
+        if is_changed:
+            os.makedirs(os.path.dirname(self.path(name)), exist_ok=True)
+            with open(self.path(name), 'wb') as f:
+                f.write(content)
+            self.changed.append(name)
+        else:
+            self.num_unchanged += 1
+        self.digests[name] = {'digest': digest, 'stat': self._stat(name)}
+        return is_changed
+
+    def write_text(self, name, text):
+        return self.write_bytes(name, text.encode('utf-8'))
+
+    def write_json(self, name, data, **dump_kwargs):
+        return self.write_text(name, json.dumps(data, **dump_kwargs))
+
+    def remove(self, name):
+        if self.exists(name):
+            os.remove(self.path(name))
+            self.removed.append(name)
+        self.digests.pop(name, None)
+
+    def save(self):
+        """Stores the digests, and which files this run changed, for the next run (and other tools)."""
+        try:
+            with open(self.digests_path, 'w') as f:
+                json.dump({'files': self.digests, 'last_changed': self.changed, 'last_removed': self.removed}, f)
+        except IOError:
+            print("Warning: Could not write the export digests.")
+
+    def print_summary(self, max_listed=20):
+        print(f"Exported data: {len(self.changed)} files changed, {len(self.removed)} removed, {self.num_unchanged} unchanged.")
+        for label, names in [('Changed', self.changed), ('Removed', self.removed)]:
+            for name in names[:max_listed]:
+                print(f"  {label}: {name}")
+            if len(names) > max_listed:
+                print(f"  ... and {len(names) - max_listed} more {label.lower()} files.")
@@ -1,4 +1,5 @@
 # Test comment
+import numpy as np
 import pandas as pd
 import re
 
@@ -29,332 +30,578 @@ def _get_outs_from_result(result, old_result):
 
     return 0
 
-class Game:
-    def __init__(self, game_df, season_name):
-        self.df = game_df
-        self.season = int(season_name.replace('S', ''))
-        self.home_team = None
-        self.away_team = None
-        self.home_score = 0
-        self.away_score = 0
-        self.inning = 1
-        self.top_of_inning = True
-        self.outs = 0
-        self.home_pitcher = None
-        self.away_pitcher = None
-        self.lead_changes = []
-        self.pitching_log = []
-        self.runners_on_base = [False, False, False]
-        self.obc_to_runners = {
-            0: [False, False, False],
-            1: [True, False, False],
-            2: [False, True, False],
-            3: [False, False, True],
-            4: [True, True, False],
-            5: [True, False, True],
-            6: [False, True, True],
-            7: [True, True, True]
-        }
-        self.runners_to_obc = {tuple(v): k for k, v in self.obc_to_runners.items()}
-
-    def _runners_to_obc(self, runners):
-        return self.runners_to_obc.get(tuple(runners))
+OBC_TO_RUNNERS = {
+    0: [False, False, False],
+    1: [True, False, False],
+    2: [False, True, False],
+    3: [False, False, True],
+    4: [True, True, False],
+    5: [True, False, True],
+    6: [False, True, True],
+    7: [True, True, True]
+}
+RUNNERS_TO_OBC = {tuple(v): k for k, v in OBC_TO_RUNNERS.items()}
+
+def simulate_play(obc_after, runners_before_play, current_outs, result, old_result, diff, season, pa_type):
+    """
+    The rulebook: returns (new_runners, runs, outs) for a single play.
 
-    def _simulate_play(self, obc_after, runners_before_play, current_outs, result, old_result, diff, season, pa_type):
-        # Pre-S7 infield-in deduction logic
-        if season < 7 and result in ['RGO', 'LGO'] and runners_before_play[2] and current_outs < 2:
-            # This is an ambiguous groundout in an early season. We must decide if it was "infield in" (no run)
-            # or "infield back" (run scores). We do this by simulating the "infield in" outcome and comparing
-            # the resulting base state to the actual base state from the gamelog (obc_after).
-
-            # Simulate Outcome B: Infield in, run holds (using original S7+ logic)
-            gamestate_tuple_B = tuple(runners_before_play)
-            infield_in_outcomes_B = {
-                (False, False, True):  ([False, False, True], 0, 1),
-                (True, False, True):   ([False, True, True], 0, 1),
-                (False, True, True):   ([False, True, True], 0, 1),
-                (True, True, True):    ([True, True, True], 0, 1), # Force out at home
-            }
-            outcome_B = infield_in_outcomes_B.get(gamestate_tuple_B)
+    `obc_after` is the base state the gamelog records after the play; it is only used to tell apart
+    the ambiguous pre-S7 groundouts with a runner on 3rd.
+    """
+    # Pre-S7 infield-in deduction logic
+    if season < 7 and result in ['RGO', 'LGO'] and runners_before_play[2] and current_outs < 2:
+        # This is an ambiguous groundout in an early season. We must decide if it was "infield in" (no run)
+        # or "infield back" (run scores). We do this by simulating the "infield in" outcome and comparing
+        # the resulting base state to the actual base state from the gamelog (obc_after).
+
+        # Simulate Outcome B: Infield in, run holds (using original S7+ logic)
+        gamestate_tuple_B = tuple(runners_before_play)
+        infield_in_outcomes_B = {
+            (False, False, True):  ([False, False, True], 0, 1),
+            (True, False, True):   ([False, True, True], 0, 1),
+            (False, True, True):   ([False, True, True], 0, 1),
+            (True, True, True):    ([True, True, True], 0, 1), # Force out at home
+        }
+        outcome_B = infield_in_outcomes_B.get(gamestate_tuple_B)
 
-            if outcome_B:
-                new_runners_B, runs_B, outs_B = outcome_B
-                obc_B = self._runners_to_obc(new_runners_B)
+        if outcome_B:
+            new_runners_B, runs_B, outs_B = outcome_B
+            obc_B = RUNNERS_TO_OBC.get(tuple(new_runners_B))
 
-                # If the simulated "infield in" state matches the actual result, then use it.
-                if obc_B == obc_after:
-                    return new_runners_B, runs_B, outs_B
-            
-            # If we are here, the "infield in" simulation did NOT match the ground truth.
-            # Therefore, the play must have been "infield back". We now do nothing and allow the function
-            # to proceed to the default ground ball and double play logic below, which correctly models this.
+            # If the simulated "infield in" state matches the actual result, then use it.
+            if obc_B == obc_after:
+                return new_runners_B, runs_B, outs_B
+        
+        # If we are here, the "infield in" simulation did NOT match the ground truth.
+        # Therefore, the play must have been "infield back". We now do nothing and allow the function
+        # to proceed to the default ground ball and double play logic below, which correctly models this.
+
+    runs_this_play = 0
+    new_runners = list(runners_before_play)
+    outs_for_play = _get_outs_from_result(result, old_result)
+
+    # Infield-in logic for S7+
+    if season >= 7 and pa_type == 2 and result in ['RGO', 'LGO']:
+        gamestate_tuple = tuple(runners_before_play)
+        infield_in_outcomes = {
+            # gamestate: (new_runners, runs, outs)
+            (False, False, False): ([False, False, False], 0, 1), # 000 -> 000, 1 out
+            (True, False, False):  ([False, True, False], 0, 1),  # 100 -> 010, 1 out
+            (False, True, False):  ([False, False, True], 0, 1),  # 010 -> 001, 1 out
+            (False, False, True):  ([False, False, True], 0, 1),  # 001 -> 001, 1 out
+            (True, True, False):   ([False, True, True], 0, 1),   # 110 -> 011, 1 out
+            (True, False, True):   ([False, True, True], 0, 1),   # 101 -> 011, 1 out
+            (False, True, True):   ([False, True, True], 0, 1),   # 011 -> 011, 1 out
+            (True, True, True):    ([True, True, True], 0, 1),    # 111 -> 111, 1 out (out at home)
+        }
+        outcome = infield_in_outcomes.get(gamestate_tuple)
+        if outcome:
+            new_runners, runs_this_play, outs_for_play = outcome
+            return new_runners, runs_this_play, outs_for_play
 
-        runs_this_play = 0
-        new_runners = list(runners_before_play)
-        outs_for_play = _get_outs_from_result(result, old_result)
-
-        # Infield-in logic for S7+
-        if season >= 7 and pa_type == 2 and result in ['RGO', 'LGO']:
-            gamestate_tuple = tuple(runners_before_play)
-            infield_in_outcomes = {
-                # gamestate: (new_runners, runs, outs)
-                (False, False, False): ([False, False, False], 0, 1), # 000 -> 000, 1 out
-                (True, False, False):  ([False, True, False], 0, 1),  # 100 -> 010, 1 out
-                (False, True, False):  ([False, False, True], 0, 1),  # 010 -> 001, 1 out
-                (False, False, True):  ([False, False, True], 0, 1),  # 001 -> 001, 1 out
-                (True, True, False):   ([False, True, True], 0, 1),   # 110 -> 011, 1 out
-                (True, False, True):   ([False, True, True], 0, 1),   # 101 -> 011, 1 out
-                (False, True, True):   ([False, True, True], 0, 1),   # 011 -> 011, 1 out
-                (True, True, True):    ([True, True, True], 0, 1),    # 111 -> 111, 1 out (out at home)
+    # --- ERA-BASED LOGIC ---
+    # Handle LGO (high diff) first, as it's a special case
+    if result == 'LGO' and 496 <= diff <= 500:
+        gamestate_tuple = tuple(runners_before_play)
+        if season >= 9:
+            high_diff_lgo_s9_plus_outcomes = {
+                (0, (False, False, False)): ([False, False, False], 0, 1),
+                (0, (True, False, False)): ([False, False, False], 0, 2), # Runner on 1st out
+                (0, (False, True, False)): ([False, False, False], 0, 2), # Runner on 2nd out
+                (0, (False, False, True)): ([False, False, False], 0, 2), # Runner on 3rd out
+                (0, (True, True, False)): ([False, False, False], 0, 3), # Triple play: 1st, 2nd out
+                (0, (True, False, True)): ([False, False, True], 0, 2), # Runner on 1st out, 3rd safe
+                (0, (False, True, True)): ([False, False, True], 0, 2), # Runner on 2nd out, 3rd safe
+                (0, (True, True, True)): ([False, False, True], 0, 3), # Triple play: 1st, 2nd out, 3rd safe
+
+                (1, (False, False, False)): ([False, False, False], 0, 1),
+                (1, (True, False, False)): ([False, False, False], 0, 2), # Runner on 1st out
+                (1, (False, True, False)): ([False, False, False], 0, 2), # Runner on 2nd out
+                (1, (False, False, True)): ([False, False, False], 0, 2), # Runner on 3rd out
+                (1, (True, True, False)): ([False, False, False], 0, 2), # Runner on 1st out, 2nd out (total 3 outs)
+                (1, (True, False, True)): ([False, False, True], 0, 2), # Runner on 1st out, 3rd safe (total 3 outs)
+                (1, (False, True, True)): ([False, False, True], 0, 2), # Runner on 2nd out, 3rd safe (total 3 outs)
+                (1, (True, True, True)): ([False, False, True], 0, 2), # Runner on 1st out, 2nd out, 3rd safe (total 3 outs)
+
+                (2, (False, False, False)): ([False, False, False], 0, 1),
+                (2, (True, False, False)): ([False, False, False], 0, 1),
+                (2, (False, True, False)): ([False, False, False], 0, 1),
+                (2, (False, False, True)): ([False, False, False], 0, 1),
+                (2, (True, True, False)): ([False, False, False], 0, 1),
+                (2, (True, False, True)): ([False, False, False], 0, 1),
+                (2, (False, True, True)): ([False, False, False], 0, 1),
+                (2, (True, True, True)): ([False, False, False], 0, 1),
             }
-            outcome = infield_in_outcomes.get(gamestate_tuple)
+            outcome = high_diff_lgo_s9_plus_outcomes.get((current_outs, gamestate_tuple))
             if outcome:
                 new_runners, runs_this_play, outs_for_play = outcome
                 return new_runners, runs_this_play, outs_for_play
-
-        # --- ERA-BASED LOGIC ---
-        # Handle LGO (high diff) first, as it's a special case
-        if result == 'LGO' and 496 <= diff <= 500:
-            gamestate_tuple = tuple(runners_before_play)
-            if season >= 9:
-                high_diff_lgo_s9_plus_outcomes = {
-                    (0, (False, False, False)): ([False, False, False], 0, 1),
-                    (0, (True, False, False)): ([False, False, False], 0, 2), # Runner on 1st out
-                    (0, (False, True, False)): ([False, False, False], 0, 2), # Runner on 2nd out
-                    (0, (False, False, True)): ([False, False, False], 0, 2), # Runner on 3rd out
-                    (0, (True, True, False)): ([False, False, False], 0, 3), # Triple play: 1st, 2nd out
-                    (0, (True, False, True)): ([False, False, True], 0, 2), # Runner on 1st out, 3rd safe
-                    (0, (False, True, True)): ([False, False, True], 0, 2), # Runner on 2nd out, 3rd safe
-                    (0, (True, True, True)): ([False, False, True], 0, 3), # Triple play: 1st, 2nd out, 3rd safe
-
-                    (1, (False, False, False)): ([False, False, False], 0, 1),
-                    (1, (True, False, False)): ([False, False, False], 0, 2), # Runner on 1st out
-                    (1, (False, True, False)): ([False, False, False], 0, 2), # Runner on 2nd out
-                    (1, (False, False, True)): ([False, False, False], 0, 2), # Runner on 3rd out
-                    (1, (True, True, False)): ([False, False, False], 0, 2), # Runner on 1st out, 2nd out (total 3 outs)
-                    (1, (True, False, True)): ([False, False, True], 0, 2), # Runner on 1st out, 3rd safe (total 3 outs)
-                    (1, (False, True, True)): ([False, False, True], 0, 2), # Runner on 2nd out, 3rd safe (total 3 outs)
-                    (1, (True, True, True)): ([False, False, True], 0, 2), # Runner on 1st out, 2nd out, 3rd safe (total 3 outs)
-
-                    (2, (False, False, False)): ([False, False, False], 0, 1),
-                    (2, (True, False, False)): ([False, False, False], 0, 1),
-                    (2, (False, True, False)): ([False, False, False], 0, 1),
-                    (2, (False, False, True)): ([False, False, False], 0, 1),
-                    (2, (True, True, False)): ([False, False, False], 0, 1),
-                    (2, (True, False, True)): ([False, False, False], 0, 1),
-                    (2, (False, True, True)): ([False, False, False], 0, 1),
-                    (2, (True, True, True)): ([False, False, False], 0, 1),
-                }
-                outcome = high_diff_lgo_s9_plus_outcomes.get((current_outs, gamestate_tuple))
-                if outcome:
-                    new_runners, runs_this_play, outs_for_play = outcome
-                    return new_runners, runs_this_play, outs_for_play
-                else: # Fallback for unexpected states, though the table should be exhaustive
-                    outs_for_play = 1
-                    new_runners = list(runners_before_play)
-                    runs_this_play = 0
-                    return new_runners, runs_this_play, outs_for_play
-
-            elif season >= 1 and season <= 8:
-                if runners_before_play[0] and runners_before_play[1]: # Runners on 1st and 2nd (110) or Bases loaded (111)
-                    outs_for_play = 3
-                    new_runners = [False, False, False]
-                    runs_this_play = 0
-                    return new_runners, runs_this_play, outs_for_play # Only return if it's a triple play
-                # If not a triple play, fall through to normal LGO logic.
-        
-        # Normal LGO/RGO double play logic (applies to all seasons)
-        if result in ['LGO', 'RGO'] and runners_before_play[0]:
-            outs_for_play = 2
-            new_runners = [False, False, False]
-            if (current_outs + outs_for_play) < 3:
-                if runners_before_play[2]: runs_this_play += 1
-                if runners_before_play[1]: new_runners[2] = True
-            return new_runners, runs_this_play, outs_for_play
-
-        # Original logic for other seasons
-        elif 2 <= season <= 3:
-            if str(result).strip() == 'DP':
-                outs_for_play = 2
-                if runners_before_play[0]:
-                    new_runners = [False, False, False]
-                    if (current_outs + outs_for_play) < 3:
-                        if runners_before_play[2]: runs_this_play += 1
-                        if runners_before_play[1]: new_runners[2] = True
-                else:
-                    # This is a non-force DP. Assume a flyout and a runner is doubled-off.
-                    # No runners advance. The most advanced runner is out.
-                    new_runners = list(runners_before_play)
-                    if new_runners[2]:
-                        new_runners[2] = False
-                    elif new_runners[1]:
-                        new_runners[1] = False
-                    runs_this_play = 0
+            else: # Fallback for unexpected states, though the table should be exhaustive
+                outs_for_play = 1
+                new_runners = list(runners_before_play)
+                runs_this_play = 0
                 return new_runners, runs_this_play, outs_for_play
-            if str(result).strip() == 'TP':
+
+        elif season >= 1 and season <= 8:
+            if runners_before_play[0] and runners_before_play[1]: # Runners on 1st and 2nd (110) or Bases loaded (111)
                 outs_for_play = 3
                 new_runners = [False, False, False]
                 runs_this_play = 0
-                return new_runners, runs_this_play, outs_for_play
+                return new_runners, runs_this_play, outs_for_play # Only return if it's a triple play
+            # If not a triple play, fall through to normal LGO logic.
+    
+    # Normal LGO/RGO double play logic (applies to all seasons)
+    if result in ['LGO', 'RGO'] and runners_before_play[0]:
+        outs_for_play = 2
+        new_runners = [False, False, False]
+        if (current_outs + outs_for_play) < 3:
+            if runners_before_play[2]: runs_this_play += 1
+            if runners_before_play[1]: new_runners[2] = True
+        return new_runners, runs_this_play, outs_for_play
 
-        # --- DEFAULT LOGIC ---
-        if result == 'HR':
-            runs_this_play = sum(runners_before_play) + 1
-            new_runners = [False, False, False]
-        elif result == '3B':
-            runs_this_play = sum(runners_before_play)
-            new_runners = [False, False, True]
-        elif result == '2B':
-            new_runners = [False, False, False]
-            if current_outs == 2:
-                new_runners[1] = True
-                if runners_before_play[2]: runs_this_play += 1
-                if runners_before_play[1]: runs_this_play += 1
-                if runners_before_play[0]: runs_this_play += 1
+    # Original logic for other seasons
+    elif 2 <= season <= 3:
+        if str(result).strip() == 'DP':
+            outs_for_play = 2
+            if runners_before_play[0]:
+                new_runners = [False, False, False]
+                if (current_outs + outs_for_play) < 3:
+                    if runners_before_play[2]: runs_this_play += 1
+                    if runners_before_play[1]: new_runners[2] = True
             else:
-                if runners_before_play[2]: runs_this_play += 1
-                if runners_before_play[1]: runs_this_play += 1
-                if runners_before_play[0]: new_runners[2] = True
-                new_runners[1] = True
-        elif result in ['1B', 'BUNT 1B', 'Bunt 1B']:
+                # This is a non-force DP. Assume a flyout and a runner is doubled-off.
+                # No runners advance. The most advanced runner is out.
+                new_runners = list(runners_before_play)
+                if new_runners[2]:
+                    new_runners[2] = False
+                elif new_runners[1]:
+                    new_runners[1] = False
+                runs_this_play = 0
+            return new_runners, runs_this_play, outs_for_play
+        if str(result).strip() == 'TP':
+            outs_for_play = 3
             new_runners = [False, False, False]
-            if result == '1B' and current_outs == 2:
-                new_runners[0] = True
-                if runners_before_play[2]: runs_this_play += 1
-                if runners_before_play[1]: runs_this_play += 1
-                if runners_before_play[0]: new_runners[2] = True
-            else:
-                if runners_before_play[2]: runs_this_play += 1
-                if runners_before_play[1]: new_runners[2] = True
-                if runners_before_play[0]: new_runners[1] = True
-                new_runners[0] = True
-        elif result.upper() in ['BB', 'IBB', 'AUTO BB']:
-            if runners_before_play[0] and runners_before_play[1] and runners_before_play[2]: runs_this_play += 1
-            if runners_before_play[0] and runners_before_play[1]: new_runners[2] = runners_before_play[1]
-            if runners_before_play[0]: new_runners[1] = runners_before_play[0]
+            runs_this_play = 0
+            return new_runners, runs_this_play, outs_for_play
+
+    # --- DEFAULT LOGIC ---
+    if result == 'HR':
+        runs_this_play = sum(runners_before_play) + 1
+        new_runners = [False, False, False]
+    elif result == '3B':
+        runs_this_play = sum(runners_before_play)
+        new_runners = [False, False, True]
+    elif result == '2B':
+        new_runners = [False, False, False]
+        if current_outs == 2:
+            new_runners[1] = True
+            if runners_before_play[2]: runs_this_play += 1
+            if runners_before_play[1]: runs_this_play += 1
+            if runners_before_play[0]: runs_this_play += 1
+        else:
+            if runners_before_play[2]: runs_this_play += 1
+            if runners_before_play[1]: runs_this_play += 1
+            if runners_before_play[0]: new_runners[2] = True
+            new_runners[1] = True
+    elif result in ['1B', 'BUNT 1B', 'Bunt 1B']:
+        new_runners = [False, False, False]
+        if result == '1B' and current_outs == 2:
             new_runners[0] = True
-        elif result.upper() == 'STEAL 2B':
-            if runners_before_play[0]:
-                new_runners[0] = False
-                new_runners[1] = True
-        elif result.upper() == 'STEAL 3B':
-            if runners_before_play[1]:
-                new_runners[1] = False
-                new_runners[2] = True
-        elif result.upper() == 'STEAL HOME':
-            if runners_before_play[2]:
-                new_runners[2] = False
-                runs_this_play += 1
-        elif result.upper() == 'SB':
-            # Check for runner on 1st stealing 2nd (if 2nd is open)
-            if new_runners[0] and not new_runners[1]:
-                new_runners[0] = False
-                new_runners[1] = True
-            # Check for runner on 2nd stealing 3rd (if 3rd is open)
-            elif new_runners[1] and not new_runners[2]:
-                new_runners[1] = False
-                new_runners[2] = True
-            # Check for runner on 3rd stealing home
-            elif new_runners[2]:
-                new_runners[2] = False
-                runs_this_play += 1
-        elif result.upper() == 'MSTEAL 3B':
-            new_runners[2] = runners_before_play[1] or runners_before_play[2]
+            if runners_before_play[2]: runs_this_play += 1
+            if runners_before_play[1]: runs_this_play += 1
+            if runners_before_play[0]: new_runners[2] = True
+        else:
+            if runners_before_play[2]: runs_this_play += 1
+            if runners_before_play[1]: new_runners[2] = True
+            if runners_before_play[0]: new_runners[1] = True
+            new_runners[0] = True
+    elif result.upper() in ['BB', 'IBB', 'AUTO BB']:
+        if runners_before_play[0] and runners_before_play[1] and runners_before_play[2]: runs_this_play += 1
+        if runners_before_play[0] and runners_before_play[1]: new_runners[2] = runners_before_play[1]
+        if runners_before_play[0]: new_runners[1] = runners_before_play[0]
+        new_runners[0] = True
+    elif result.upper() == 'STEAL 2B':
+        if runners_before_play[0]:
+            new_runners[0] = False
+            new_runners[1] = True
+    elif result.upper() == 'STEAL 3B':
+        if runners_before_play[1]:
+            new_runners[1] = False
+            new_runners[2] = True
+    elif result.upper() == 'STEAL HOME':
+        if runners_before_play[2]:
+            new_runners[2] = False
+            runs_this_play += 1
+    elif result.upper() == 'SB':
+        # Check for runner on 1st stealing 2nd (if 2nd is open)
+        if new_runners[0] and not new_runners[1]:
+            new_runners[0] = False
+            new_runners[1] = True
+        # Check for runner on 2nd stealing 3rd (if 3rd is open)
+        elif new_runners[1] and not new_runners[2]:
+            new_runners[1] = False
+            new_runners[2] = True
+        # Check for runner on 3rd stealing home
+        elif new_runners[2]:
+            new_runners[2] = False
+            runs_this_play += 1
+    elif result.upper() == 'MSTEAL 3B':
+        new_runners[2] = runners_before_play[1] or runners_before_play[2]
+        new_runners[1] = runners_before_play[0]
+        new_runners[0] = False
+    elif result.upper() == 'MSTEAL HOME':
+        if runners_before_play[2]:
+            runs_this_play += 1
+        new_runners[2] = runners_before_play[1]
+        new_runners[1] = runners_before_play[0]
+        new_runners[0] = False
+    elif result.upper() == 'CS 2B':
+        if runners_before_play[0]:
+            new_runners[0] = False
+    elif result.upper() == 'CS 3B':
+        if runners_before_play[1]:
+            new_runners[1] = False
+    elif result.upper() == 'CS HOME':
+        if runners_before_play[2]:
+            new_runners[2] = False
+    elif result.upper() == 'CS':
+        if runners_before_play[0] and not runners_before_play[1]:
+            new_runners[0] = False
+        elif runners_before_play[1] and not runners_before_play[2]:
+            new_runners[1] = False
+        elif runners_before_play[2]:
+            new_runners[2] = False
+    elif result.upper() == 'CMS 3B':
+        if runners_before_play[1]:
+            new_runners[2] = runners_before_play[2]
             new_runners[1] = runners_before_play[0]
             new_runners[0] = False
-        elif result.upper() == 'MSTEAL HOME':
-            if runners_before_play[2]:
-                runs_this_play += 1
+    elif result.upper() == 'CMS HOME':
+        if runners_before_play[2]:
             new_runners[2] = runners_before_play[1]
             new_runners[1] = runners_before_play[0]
             new_runners[0] = False
-        elif result.upper() == 'CS 2B':
-            if runners_before_play[0]:
-                new_runners[0] = False
-        elif result.upper() == 'CS 3B':
-            if runners_before_play[1]:
-                new_runners[1] = False
-        elif result.upper() == 'CS HOME':
-            if runners_before_play[2]:
-                new_runners[2] = False
-        elif result.upper() == 'CS':
-            if runners_before_play[0] and not runners_before_play[1]:
-                new_runners[0] = False
-            elif runners_before_play[1] and not runners_before_play[2]:
-                new_runners[1] = False
-            elif runners_before_play[2]:
-                new_runners[2] = False
-        elif result.upper() == 'CMS 3B':
-            if runners_before_play[1]:
-                new_runners[2] = runners_before_play[2]
-                new_runners[1] = runners_before_play[0]
-                new_runners[0] = False
-        elif result.upper() == 'CMS HOME':
-            if runners_before_play[2]:
+    elif result in ['FO', 'Sac']:
+        if current_outs < 2 and runners_before_play[2]:
+            runs_this_play += 1
+            new_runners[2] = False
+    elif result in ['BUNT Sac', 'Bunt Sac', 'Bunt']:
+        if current_outs < 2:
+            if runners_before_play == [False, True, True]:
+                pass
+            elif runners_before_play == [True, True, True]:
+                new_runners = [True, True, True]
+            else:
+                new_runners = [False, False, False]
+                if runners_before_play[2] or runners_before_play[1]:
+                    new_runners[2] = True
+                if runners_before_play[0]:
+                    new_runners[1] = True
+    elif result.upper() in ['BUNT GO', 'BUNT DP']:
+        gamestate_str = "".join(["1" if r else "0" for r in runners_before_play])
+        
+        bunt_outcomes = {
+            "000": ([False, False, False], 0, 1),
+            "100": ([False, False, False], 0, 2),
+            "010": ([False, True, False], 0, 1),
+            "001": ([False, False, True], 0, 1),
+            "110": ([False, False, True], 0, 2),
+            "101": ([True, False, True], 0, 1),
+            "011": ([False, True, True], 0, 1),
+            "111": ([False, True, True], 0, 2)
+        }
+
+        outcome = bunt_outcomes.get(gamestate_str)
+        if outcome:
+            new_runners, runs_this_play, outs_for_play = outcome
+            if (current_outs + outs_for_play) > 3:
+                outs_for_play = 3 - current_outs
+                if outs_for_play < 0: outs_for_play = 0
+            return new_runners, runs_this_play, outs_for_play
+        else:
+            outs_for_play = 1
+            new_runners = list(runners_before_play)
+            runs_this_play = 0
+            return new_runners, runs_this_play, outs_for_play
+    elif result in ['LGO', 'RGO']:
+        if current_outs < 2:
+            if result == 'RGO':
+                if runners_before_play[2]: runs_this_play += 1
                 new_runners[2] = runners_before_play[1]
                 new_runners[1] = runners_before_play[0]
                 new_runners[0] = False
-        elif result in ['FO', 'Sac']:
-            if current_outs < 2 and runners_before_play[2]:
-                runs_this_play += 1
-                new_runners[2] = False
-        elif result in ['BUNT Sac', 'Bunt Sac', 'Bunt']:
-            if current_outs < 2:
-                if runners_before_play == [False, True, True]:
-                    pass
-                elif runners_before_play == [True, True, True]:
-                    new_runners = [True, True, True]
-                else:
-                    new_runners = [False, False, False]
-                    if runners_before_play[2] or runners_before_play[1]:
-                        new_runners[2] = True
-                    if runners_before_play[0]:
-                        new_runners[1] = True
-        elif result.upper() in ['BUNT GO', 'BUNT DP']:
-            gamestate_str = "".join(["1" if r else "0" for r in runners_before_play])
-            
-            bunt_outcomes = {
-                "000": ([False, False, False], 0, 1),
-                "100": ([False, False, False], 0, 2),
-                "010": ([False, True, False], 0, 1),
-                "001": ([False, False, True], 0, 1),
-                "110": ([False, False, True], 0, 2),
-                "101": ([True, False, True], 0, 1),
-                "011": ([False, True, True], 0, 1),
-                "111": ([False, True, True], 0, 2)
-            }
+            elif result == 'LGO':
+                if runners_before_play[2]: runs_this_play += 1
+                new_runners[2] = runners_before_play[1] and runners_before_play[0]
+                new_runners[1] = runners_before_play[0] or (runners_before_play[1] and not runners_before_play[0])
+                new_runners[0] = False
+        else:
+            new_runners = [False, False, False]
 
-            outcome = bunt_outcomes.get(gamestate_str)
-            if outcome:
-                new_runners, runs_this_play, outs_for_play = outcome
-                if (current_outs + outs_for_play) > 3:
-                    outs_for_play = 3 - current_outs
-                    if outs_for_play < 0: outs_for_play = 0
-                return new_runners, runs_this_play, outs_for_play
-            else:
-                outs_for_play = 1
-                new_runners = list(runners_before_play)
-                runs_this_play = 0
-                return new_runners, runs_this_play, outs_for_play
-        elif result in ['LGO', 'RGO']:
-            if current_outs < 2:
-                if result == 'RGO':
-                    if runners_before_play[2]: runs_this_play += 1
-                    new_runners[2] = runners_before_play[1]
-                    new_runners[1] = runners_before_play[0]
-                    new_runners[0] = False
-                elif result == 'LGO':
-                    if runners_before_play[2]: runs_this_play += 1
-                    new_runners[2] = runners_before_play[1] and runners_before_play[0]
-                    new_runners[1] = runners_before_play[0] or (runners_before_play[1] and not runners_before_play[0])
-                    new_runners[0] = False
-            else:
-                new_runners = [False, False, False]
+    if (current_outs + outs_for_play) >= 3 and result in ['LGO', 'RGO', 'BUNT GO', 'Bunt GO', 'DP', 'TP']:
+        runs_this_play = 0
+    
+    return new_runners, runs_this_play, outs_for_play
+
+# --- Transition Table ---
+# simulate_play compiled into arrays, so a whole season of plays can be resolved with NumPy fancy indexing.
+
+# Every result string the rulebook (or the gamelogs) use; anything else resolves like '' (no runner movement).
+# Spelling variants stay separate codes: some stats count 'BUNT 1B' and 'Bunt 1B' differently.
+RESULT_CODES = [
+    '', 'HR', '3B', '2B', '1B', 'BUNT 1B', 'Bunt 1B',
+    'BB', 'IBB', 'Auto BB', 'AUTO BB',
+    'STEAL 2B', 'Steal 2B', 'STEAL 3B', 'Steal 3B', 'STEAL HOME', 'STEAL Home', 'Steal Home', 'SB',
+    'MSTEAL 3B', 'MSteal 3B', 'MSTEAL HOME', 'MSteal Home',
+    'CS 2B', 'CS 3B', 'CS Home', 'CS', 'CMS 3B', 'CMS Home',
+    'FO', 'Sac', 'PO', 'LO', 'LGO', 'RGO', 'DP', 'TP',
+    'K', 'Auto K', 'AUTO K', 'Bunt K', 'BUNT K',
+    'Bunt', 'BUNT Sac', 'Bunt Sac', 'BUNT GO', 'Bunt GO', 'BUNT DP', 'Bunt DP'
+]
+# The first season of each rules era; the rulebook only changes between eras.
+RULES_ERA_FIRST_SEASONS = [1, 2, 4, 7, 9]
+# Old results that count as an out on their own (see _get_outs_from_result).
+OLD_RESULT_OUTS = {'FO', 'LGO', 'PO', 'RGO', 'Bunt', 'LO', 'K', 'Auto K', 'CS'}
+# The only results whose outcome depends on the gamelog's next OBC (see simulate_play).
+OBC_AFTER_RESULTS = {'RGO', 'LGO'}
+OLD_RESULT_OUT_CODES = [RESULT_CODES.index(result) for result in OLD_RESULT_OUTS]
+# Whether an 'Exact Result' counts as an out on its own, by result code (see _get_outs_from_result).
+IS_RESULT_OUT_CODE = np.array([_get_outs_from_result(result, '') == 1 for result in RESULT_CODES])
+MAX_TABLE_OUTS = 3
+
+# data_loader loads the result columns as categoricals over RESULT_CODES, so a play's category code is its table index.
+RESULT_COLUMNS = ['Exact Result', 'Old Result', 'Result at Neutral', 'Result At Neutral', 'Result All Neutral']
+RESULT_DTYPE = pd.CategoricalDtype(RESULT_CODES)
+
+def get_result_codes(results):
+    """RESULT_CODES index of each result; 0 ('') for missing or unknown results. Codes are passed through."""
+    if isinstance(results, np.ndarray) and np.issubdtype(results.dtype, np.integer):
+        return results
+    codes = pd.Categorical(results, dtype=RESULT_DTYPE).codes
+    return np.where(codes < 0, 0, codes)
+
+_transition_table = None
+
+def get_transition_table():
+    """
+    Returns the rulebook as arrays indexed by
+    (result code, rules era, OBC, outs, infield in, high diff, old result is an out):
+        'OBC', 'Runs', 'Outs': the base state after the play, the runs scored and the outs made.
+        'Alt OBC', 'Alt Runs', 'Alt Outs': the pre-S7 "infield in" reading of a groundout with a runner
+            on 3rd, which applies when the gamelog's next OBC matches 'Alt OBC' (-1 where there is none).
+    """
+    global _transition_table
+    if _transition_table is not None:
+        return _transition_table
+
+    shape = (len(RESULT_CODES), len(RULES_ERA_FIRST_SEASONS), 8, MAX_TABLE_OUTS + 1, 2, 2, 2)
+    table = {col: np.zeros(shape, dtype=np.int8) for col in ['OBC', 'Runs', 'Outs', 'Alt OBC', 'Alt Runs', 'Alt Outs']}
+    table['Alt OBC'][:] = -1
+    for index in np.ndindex(shape):
+        code, era, obc, outs, infield_in, high_diff, old_result_out = index
+        result = RESULT_CODES[code]
+        old_result = 'K' if old_result_out else ''
+        season = RULES_ERA_FIRST_SEASONS[era]
+        diff = 500 if high_diff else 0
+        pa_type = 2 if infield_in else 0
+        runners = OBC_TO_RUNNERS[obc]
+
+        new_runners, runs, outs_on_play = simulate_play(-1, runners, outs, result, old_result, diff, season, pa_type)
+        table['OBC'][index] = RUNNERS_TO_OBC[tuple(bool(r) for r in new_runners)]
+        table['Runs'][index] = runs
+        table['Outs'][index] = outs_on_play
+
+        if result not in OBC_AFTER_RESULTS:
+            continue
+        for obc_after in range(8):
+            alt_runners, alt_runs, alt_outs = simulate_play(obc_after, runners, outs, result, old_result, diff, season, pa_type)
+            alt = (RUNNERS_TO_OBC[tuple(bool(r) for r in alt_runners)], alt_runs, alt_outs)
+            if alt != (table['OBC'][index], runs, outs_on_play):
+                table['Alt OBC'][index], table['Alt Runs'][index], table['Alt Outs'][index] = alt
+                break
+
+    _transition_table = table
+    return table
+
+def get_transition_indices(result, old_result, season, obc, outs, diff, pa_type):
+    """Maps arrays of play attributes to the index arrays of get_transition_table()."""
+    codes = get_result_codes(result)
+    eras = np.searchsorted(RULES_ERA_FIRST_SEASONS, np.asarray(season), side='right') - 1
+    obc = np.asarray(obc)
+    obc = np.where((obc >= 0) & (obc <= 7), obc, 0)
+    outs = np.clip(np.asarray(outs), 0, MAX_TABLE_OUTS)
+    diff = np.asarray(diff)
+    infield_in = (np.asarray(pa_type) == 2).astype(int)
+    high_diff = ((diff >= 496) & (diff <= 500)).astype(int)
+    old_result_out = np.isin(get_result_codes(old_result), OLD_RESULT_OUT_CODES).astype(int)
+    return codes, np.maximum(eras, 0), obc, outs, infield_in, high_diff, old_result_out
+
+def resolve_plays(result, old_result, season, obc, outs, diff, pa_type, obc_after):
+    """
+    Vectorized simulate_play: returns arrays of (new OBC, runs, outs made) for arrays of plays.
+    Results may be given as strings or as get_result_codes() codes.
+    `obc_after` is the OBC the gamelog records after each play (only read for pre-S7 groundouts).
+    """
+    table = get_transition_table()
+    index = get_transition_indices(result, old_result, season, obc, outs, diff, pa_type)
+    alt_obc = table['Alt OBC'][index]
+    use_alt = (alt_obc >= 0) & (alt_obc == np.asarray(obc_after))
+    new_obc = np.where(use_alt, alt_obc, table['OBC'][index])
+    runs = np.where(use_alt, table['Alt Runs'][index], table['Runs'][index])
+    outs_made = np.where(use_alt, table['Alt Outs'][index], table['Outs'][index])
+    return new_obc, runs, outs_made
+
+# Results on which the play's 'Hitter' is a runner on base rather than a batter (compared upper-cased).
+BASERUNNING_RESULTS = {
+    'STEAL 2B', 'STEAL 3B', 'STEAL HOME', 'MSTEAL 3B', 'MSTEAL HOME', 'SB',
+    'CS 2B', 'CS 3B', 'CS HOME', 'CS', 'CMS 3B', 'CMS HOME'
+}
+# The base (0 = 1st) a caught stealing runner started from.
+CAUGHT_STEALING_BASES = {'CS 2B': 0, 'CS 3B': 1, 'CS HOME': 2, 'CMS 3B': 1, 'CMS HOME': 2}
+# The same lookups by result code, so replaying plays never compares strings.
+IS_BASERUNNING_CODE = [result.upper() in BASERUNNING_RESULTS for result in RESULT_CODES]
+CAUGHT_STEALING_BASE_BY_CODE = [CAUGHT_STEALING_BASES.get(result.upper()) for result in RESULT_CODES]
+UNKNOWN_RUNNER = (None, None)
+
+PLAY_STATE_COLUMNS = ['OBC After', 'Outs After', 'Runs Scored', 'Last Play of Inning', 'Runners Before', 'Scoring Runners', 'Scoring Pitchers']
+
+def _advance_runners(slots, batter, runs, new_runners, outs_after, caught_base):
+    """
+    Carries runner identities through a play the rulebook resolved to `new_runners` and `runs`.
 
-        if (current_outs + outs_for_play) >= 3 and result in ['LGO', 'RGO', 'BUNT GO', 'Bunt GO', 'DP', 'TP']:
-            runs_this_play = 0
-        
-        return new_runners, runs_this_play, outs_for_play
+    `slots` holds a (runner ID, responsible pitcher ID) pair per base, None for an empty base. Runners
+    never pass each other: the lead runners score, the rest fill the occupied bases in order, and the
+    trailing runners (the batter first) are the ones put out, unless a runner was caught stealing.
+    Runners that can't be placed that way are kept as UNKNOWN_RUNNER.
+
+    Returns (slots after the play, slots of the runners who scored).
+    """
+    candidates = [(base, slots[base]) for base in (2, 1, 0) if slots[base] is not None]
+    if batter is not None:
+        candidates.append((-1, batter))
+    scored = [slot for _, slot in candidates[:runs]]
+    if outs_after >= 3:
+        return [None, None, None], scored
+
+    remaining = candidates[runs:]
+    bases_after = [base for base in (2, 1, 0) if new_runners[base]]
+    if caught_base is not None and len(remaining) > len(bases_after):
+        remaining = [(base, slot) for base, slot in remaining if base != caught_base]
+    remaining = remaining[:len(bases_after)]
+
+    slots_after = [None, None, None]
+    for i, base_after in enumerate(bases_after):
+        if i < len(remaining) and base_after >= remaining[i][0]:
+            slots_after[base_after] = remaining[i][1]
+        else:
+            slots_after[base_after] = UNKNOWN_RUNNER
+    return slots_after, scored
+
+def simulate_plate_appearances(df):
+    """
+    Replays every play once with the rulebook and returns its base/out state, aligned with df's index.
+
+    Plays are replayed in gamelog order within each half-inning ('Inning ID'). The state before a play
+    is the one the gamelog records ('OBC', 'Outs'); the transition table decides what the play did. Columns:
+        'OBC After', 'Outs After', 'Runs Scored': the state after the play and the runs it scored.
+        'Last Play of Inning': True if no other play follows it in its half-inning.
+        'Runners Before': IDs of the runners on (1st, 2nd, 3rd) before the play, None if empty or unknown.
+        'Scoring Runners', 'Scoring Pitchers': IDs of the runners who scored on the play, and of the
+            pitchers responsible for them (None if unknown).
+    """
+    num_plays = len(df)
+    if num_plays == 0:
+        return pd.DataFrame({col: [] for col in PLAY_STATE_COLUMNS}, index=df.index)
+
+    def numeric_column(col):
+        if col not in df.columns:
+            return np.zeros(num_plays, dtype=int)
+        return df[col].to_numpy(dtype=int, na_value=0)
+
+    # Half-innings are contiguous in the gamelogs, but a stable sort keeps this correct if they aren't.
+    plays = pd.DataFrame({'Season': df['Season'].to_numpy(), 'Inning ID': df['Inning ID'].to_numpy()})
+    order = plays.sort_values(['Season', 'Inning ID'], kind='stable').index.to_numpy()
+    plays = plays.iloc[order]
+    is_first_play = plays.ne(plays.shift(1)).any(axis=1).to_numpy()
+    is_last_play = plays.ne(plays.shift(-1)).any(axis=1).to_numpy()
+
+    obcs = numeric_column('OBC')[order]
+    outs = numeric_column('Outs')[order]
+    next_obcs = np.where(is_last_play, 0, np.roll(obcs, -1))
+    result_codes = get_result_codes(df['Exact Result'].where(df['Exact Result'].notna(), df['Old Result']))[order]
+    season_nums = df['Season'].astype(str).str.replace('S', '').astype(int).to_numpy()[order]
+    new_obcs, runs, outs_made = resolve_plays(
+        result_codes, get_result_codes(df['Old Result'])[order], season_nums, obcs, outs,
+        numeric_column('Diff')[order], numeric_column('PA Type')[order], next_obcs
+    )
+    outs_after = outs + outs_made
+    obc_after = np.where(outs_after >= 3, 0, new_obcs)
+
+    # Carry runner identities through each half-inning; this is the only per-play loop.
+    hitter_ids = df['Hitter ID'].to_numpy()[order].tolist()
+    pitcher_ids = df['Pitcher ID'].to_numpy()[order].tolist()
+    runners_before_col = [None] * num_plays
+    scoring_runners_col = [()] * num_plays
+    scoring_pitchers_col = [()] * num_plays
+
+    slots = [None, None, None]
+    for n in range(num_plays):
+        runners_before = OBC_TO_RUNNERS.get(obcs[n], [False, False, False])
+        # Keep the runners carried over from the previous play where the gamelog agrees a base is occupied.
+        if is_first_play[n]:
+            slots = [None, None, None]
+        slots = [(slots[base] or UNKNOWN_RUNNER) if runners_before[base] else None for base in range(3)]
+
+        code = result_codes[n]
+        batter = None if IS_BASERUNNING_CODE[code] else (hitter_ids[n], pitcher_ids[n])
+        slots_after, scored = _advance_runners(slots, batter, runs[n], OBC_TO_RUNNERS[new_obcs[n]], outs_after[n], CAUGHT_STEALING_BASE_BY_CODE[code])
+
+        runners_before_col[n] = tuple(slot[0] if slot else None for slot in slots)
+        scoring_runners_col[n] = tuple(slot[0] for slot in scored)
+        scoring_pitchers_col[n] = tuple(slot[1] for slot in scored)
+        slots = slots_after
+
+    play_states = pd.DataFrame({
+        'OBC After': obc_after,
+        'Outs After': outs_after,
+        'Runs Scored': runs.astype(int),
+        'Last Play of Inning': is_last_play,
+        'Runners Before': runners_before_col,
+        'Scoring Runners': scoring_runners_col,
+        'Scoring Pitchers': scoring_pitchers_col,
+    }, index=order)
+    return play_states.sort_index().set_axis(df.index)
+
+def add_play_states(df):
+    """Returns a copy of df with the simulate_plate_appearances columns added."""
+    play_states = simulate_plate_appearances(df)
+    return df.assign(**{col: play_states[col].to_numpy() for col in PLAY_STATE_COLUMNS})
+
+class Game:
+    def __init__(self, game_df, season_name):
+        self.df = game_df
+        self.season = int(season_name.replace('S', ''))
+        self.home_team = None
+        self.away_team = None
+        self.home_score = 0
+        self.away_score = 0
+        self.inning = 1
+        self.top_of_inning = True
+        self.outs = 0
+        self.home_pitcher = None
+        self.away_pitcher = None
+        self.lead_changes = []
+        self.pitching_log = []
+        self.runners_on_base = [False, False, False]
+        self.obc_to_runners = OBC_TO_RUNNERS
+        self.runners_to_obc = RUNNERS_TO_OBC
+
+    def _runners_to_obc(self, runners):
+        return self.runners_to_obc.get(tuple(runners))
+
+    def _simulate_play(self, obc_after, runners_before_play, current_outs, result, old_result, diff, season, pa_type):
+        return simulate_play(obc_after, runners_before_play, current_outs, result, old_result, diff, season, pa_type)
 
     def _parse_inning(self, inning_str):
         inning_str = str(inning_str)
@@ -370,13 +617,13 @@ class Game:
             self.home_team = self.df.iloc[0]['Pitcher Team']
             self.away_team = self.df.iloc[0]['Batter Team']
 
+        if not set(PLAY_STATE_COLUMNS).issubset(self.df.columns):
+            self.df = add_play_states(self.df)
+
         self.df = self.df.reset_index()
         self.df['inning_num'], self.df['is_top'] = zip(*self.df['Inning'].apply(self._parse_inning))
         self.df = self.df.sort_values(by=['inning_num', 'is_top', 'index'], ascending=[True, False, True])
 
-        # Pre-calculate the OBC_after for determining ambiguous plays
-        self.df['OBC_after'] = pd.to_numeric(self.df.groupby(['inning_num', 'is_top'])['OBC'].shift(-1), errors='coerce').fillna(0).astype(int)
-
         self.home_pitcher = self.df[self.df['Pitcher Team'] == self.home_team]['Pitcher ID'].iloc[0]
         self.away_pitcher = self.df[self.df['Pitcher Team'] == self.away_team]['Pitcher ID'].iloc[0]
 
@@ -432,46 +679,15 @@ class Game:
 
             score_before = (self.home_score, self.away_score)
             
-            current_outs = self.outs
-            runners_before_play = self.obc_to_runners.get(play['OBC'], [False, False, False])
-            obc_after = play['OBC_after']
-            
-            result = play['Exact Result'] if pd.notna(play['Exact Result']) else play['Old Result']
-            old_result = play['Old Result']
-            diff_val = play.get('Diff')
-            if pd.isna(diff_val):
-                diff = 0
-            else:
-                # Attempt to convert to numeric, coercing errors to NaN
-                numeric_diff = pd.to_numeric(diff_val, errors='coerce')
-                if pd.isna(numeric_diff):
-                    diff = 0
-                else:
-                    diff = int(numeric_diff)
-            season = self.season
-
-            pa_type_val = play.get('PA Type')
-            if pd.isna(pa_type_val):
-                pa_type = 0
-            else:
-                numeric_pa_type = pd.to_numeric(pa_type_val, errors='coerce')
-                if pd.isna(numeric_pa_type):
-                    pa_type = 0
-                else:
-                    pa_type = int(numeric_pa_type)
-
-            new_runners_on_base, runs_this_play, outs_for_play = self._simulate_play(obc_after, runners_before_play, current_outs, result, old_result, diff, season, pa_type)
-            self.runners_on_base = new_runners_on_base
+            runs_this_play = play['Runs Scored']
+            self.runners_on_base = self.obc_to_runners.get(play['OBC After'], [False, False, False])
 
             if is_top:
                 self.away_score += runs_this_play
             else:
                 self.home_score += runs_this_play
 
-            self.outs += outs_for_play
-
-            if self.outs >= 3:
-                self.runners_on_base = [False, False, False]
+            self.outs = play['Outs After']
 
             if (score_before[0] - score_before[1]) * (self.home_score - self.away_score) <= 0 and (self.home_score != self.away_score):
                 self.lead_changes.append({'inning': self.inning, 'top_of_inning': self.top_of_inning, 'home_score': self.home_score, 'away_score': self.away_score, 'home_pitcher': self.home_pitcher, 'away_pitcher': self.away_pitcher})
@@ -506,7 +722,8 @@ def get_pitching_decisions(game_df, season_name):
             break
 
     # Calculate innings pitched for each pitcher
-    outs_per_pitcher = game.df.groupby('Pitcher ID').apply(lambda x: x.apply(lambda row: _get_outs_from_result(row['Exact Result'], row['Old Result']), axis=1).sum(), include_groups=False)
+    is_out = IS_RESULT_OUT_CODE[get_result_codes(game.df['Exact Result'])] | np.isin(get_result_codes(game.df['Old Result']), OLD_RESULT_OUT_CODES)
+    outs_per_pitcher = pd.Series(is_out.astype(int), index=game.df.index).groupby(game.df['Pitcher ID']).sum()
     ip = outs_per_pitcher / 3.0
 
     starting_pitcher_home = game.df[game.df['Pitcher Team'] == game.home_team]['Pitcher ID'].iloc[0]
@@ -595,4 +812,151 @@ def get_pitching_decisions(game_df, season_name):
         'loss': losing_pitcher,
         'save': save_pitcher,
         'holds': holds
-    }
\ No newline at end of file
+    }
+# The key of a game in the gamelogs, as used by the per-game results cache.
+GAME_KEYS = ['Season', 'Session', 'Game ID']
+
+def _to_python_list(values):
+    """Plain Python values (None for missing), so IDs compare and test for truth like Game's do."""
+    values = pd.Series(values)
+    return values.astype(object).where(values.notna(), None).tolist()
+
+def get_pitching_decisions_for_games(df, game_keys=GAME_KEYS):
+    """
+    Determines wins, losses, saves, and holds for every game in df at once.
+
+    Applies the rules of get_pitching_decisions to all games together: the running score is a cumulative
+    sum per game, lead changes are sign changes of the run differential, and each pitcher's entry score
+    and outs come from grouped first/last rows. Returns {game key: decisions}, where the key holds the
+    game's game_keys values and the decisions are what get_pitching_decisions returns for the game.
+    """
+    if df.empty:
+        return {}
+    if not set(PLAY_STATE_COLUMNS).issubset(df.columns):
+        df = add_play_states(df)
+
+    game = df.groupby(game_keys, sort=False).ngroup().to_numpy()
+    df, game = df[game >= 0], game[game >= 0]
+    game_first_rows = np.unique(game, return_index=True)[1]
+    keys = list(df.iloc[game_first_rows][game_keys].itertuples(index=False, name=None))
+    num_games = len(keys)
+
+    # Each game's home team comes from its first play in gamelog order, as in Game.process_game.
+    inning = df['Inning'].astype(str)
+    batter_teams = df['Batter Team'].to_numpy()
+    pitcher_teams = df['Pitcher Team'].to_numpy()
+    starts_in_bottom = inning.str.contains('B', regex=False).to_numpy()[game_first_rows]
+    home_teams = np.where(starts_in_bottom, batter_teams[game_first_rows], pitcher_teams[game_first_rows])
+    away_teams = np.where(starts_in_bottom, pitcher_teams[game_first_rows], batter_teams[game_first_rows])
+    # 0 when the home team is pitching, 1 for the away team
+    side = np.select([pitcher_teams == home_teams[game], pitcher_teams == away_teams[game]], [0, 1], -1)
+
+    # Replay order: by inning, top before bottom, then gamelog order.
+    is_top = inning.str.contains('T', regex=False).to_numpy()
+    inning_nums = inning.str.extract(r'(\d+)', expand=False).astype(int).to_numpy()
+    order = np.lexsort((np.arange(len(df)), ~is_top, inning_nums, game))
+    runs = df['Runs Scored'].to_numpy(dtype=int)
+    is_out = IS_RESULT_OUT_CODE[get_result_codes(df['Exact Result'])] | np.isin(get_result_codes(df['Old Result']), OLD_RESULT_OUT_CODES)
+    plays = pd.DataFrame({
+        'game': game,
+        'Pitcher ID': df['Pitcher ID'].array,
+        'side': side,
+        'run_diff': np.where(is_top, -runs, runs),
+        'is_out': is_out.astype(int),
+    }).iloc[order].reset_index(drop=True)
+
+    # --- Score and lead changes ---
+    plays_by_game = plays.groupby('game')
+    diff_after = plays_by_game['run_diff'].cumsum()
+    plays['diff_before'] = diff_after - plays['run_diff']
+    final_diff = diff_after.groupby(plays['game']).last().to_numpy()
+    is_lead_change = (plays['diff_before'] * diff_after <= 0) & (diff_after != 0)
+
+    # The pitcher each team has in the game at every play; before a team first pitches, its starter.
+    for team_side, col in [(0, 'home_pitcher'), (1, 'away_pitcher')]:
+        side_pitchers = plays['Pitcher ID'].where(plays['side'] == team_side)
+        plays[col] = side_pitchers.groupby(plays['game']).ffill().groupby(plays['game']).bfill()
+
+    # --- Pitchers of record ---
+    pitchers_of_record = plays_by_game.head(1).set_index('game')[['home_pitcher', 'away_pitcher']]
+    winner_leads = np.sign(diff_after) == np.sign(final_diff[plays['game']])
+    go_ahead = plays[is_lead_change & winner_leads].groupby('game').tail(1).set_index('game')
+    pitchers_of_record.loc[go_ahead.index] = go_ahead[['home_pitcher', 'away_pitcher']]
+    home_pitchers = _to_python_list(pitchers_of_record['home_pitcher'].reindex(range(num_games)))
+    away_pitchers = _to_python_list(pitchers_of_record['away_pitcher'].reindex(range(num_games)))
+
+    # --- Pitching changes ---
+    # A pitcher's last entry into the game sets the lead they are judged on (Game.pitching_log).
+    pitched = plays[plays['side'] >= 0]
+    by_team = pitched.groupby(['game', 'side'])
+    is_starter_row = (by_team.cumcount() == 0).to_numpy()
+    is_change = ~is_starter_row & pitched['Pitcher ID'].ne(by_team['Pitcher ID'].shift()).to_numpy(dtype=bool, na_value=False)
+    entries = pd.concat([
+        # Both starters enter at 0-0, home first, ahead of every change.
+        pitched[is_starter_row].assign(lead=0, entry=lambda x: x['side'] - 2),
+        pitched[is_change].assign(lead=lambda x: x['diff_before'].abs(), entry=lambda x: x.index),
+    ])
+    entry_leads = entries.sort_values(['game', 'entry']).groupby(['game', 'Pitcher ID'])['lead'].last()
+    outs = plays.groupby(['game', 'Pitcher ID'])['is_out'].sum()
+
+    # --- Winning team's pitchers, in order of appearance ---
+    winning_side = np.where(final_diff > 0, 0, 1)
+    winners = pitched[pitched['side'].to_numpy() == winning_side[pitched['game']]]
+    winners = winners.drop_duplicates(['game', 'Pitcher ID'])[['game', 'Pitcher ID']].reset_index(drop=True)
+    winners['order'] = winners.groupby('game').cumcount()
+    winners['count'] = winners.groupby('game')['game'].transform('size')
+    winners = winners.join(outs, on=['game', 'Pitcher ID']).join(entry_leads, on=['game', 'Pitcher ID'])
+    winners[['is_out', 'lead']] = winners[['is_out', 'lead']].fillna(0)
+
+    def per_game(rows, col):
+        return _to_python_list(rows.set_index('game')[col].reindex(range(num_games)))
+
+    starters = winners[winners['order'] == 0]
+    starter_ids, starter_outs, pitcher_counts = per_game(starters, 'Pitcher ID'), per_game(starters, 'is_out'), per_game(starters, 'count')
+    first_relievers = per_game(winners[(winners['order'] > 0) & (winners['is_out'] > 0)].groupby('game').head(1), 'Pitcher ID')
+    finishers = winners[(winners['order'] == winners['count'] - 1) & (winners['count'] > 1)]
+    # Save: entered with a lead of 3 or less and pitched 1+ inning, or pitched 3+ innings
+    save_candidates = per_game(finishers[((finishers['lead'] <= 3) & (finishers['is_out'] >= 3)) | (finishers['is_out'] >= 9)], 'Pitcher ID')
+    # Hold: a middle reliever who entered with a lead of 3 or less and got an out
+    setup_men = winners[(winners['order'] > 0) & (winners['order'] < winners['count'] - 1) & (winners['lead'] <= 3) & (winners['is_out'] > 0)]
+    hold_candidates = {g: _to_python_list(rows['Pitcher ID']) for g, rows in setup_men.groupby('game')}
+    finisher_ids = per_game(finishers, 'Pitcher ID')
+
+    results = {}
+    for g, key in enumerate(keys):
+        if final_diff[g] == 0: # Tie game
+            results[key] = {}
+            continue
+        if winning_side[g] == 0:
+            winning_pitcher_of_record, losing_pitcher = home_pitchers[g], away_pitchers[g]
+        else:
+            winning_pitcher_of_record, losing_pitcher = away_pitchers[g], home_pitchers[g]
+
+        if winning_pitcher_of_record == starter_ids[g]:
+            # 10 outs is the 3.333 innings a starter needs to qualify
+            if starter_outs[g] >= 10 or pitcher_counts[g] == 1:
+                winning_pitcher = starter_ids[g]
+            else:
+                winning_pitcher = first_relievers[g]
+        else:
+            winning_pitcher = winning_pitcher_of_record
+
+        save_pitcher = save_candidates[g] if finisher_ids[g] != winning_pitcher else None
+        holds = [h for h in hold_candidates.get(g, []) if h != losing_pitcher]
+
+        # Ensure no pitcher receives multiple decisions
+        if winning_pitcher:
+            if winning_pitcher == losing_pitcher:
+                losing_pitcher = None
+            if winning_pitcher == save_pitcher:
+                save_pitcher = None
+            holds = [h for h in holds if h != winning_pitcher]
+        if losing_pitcher:
+            if losing_pitcher == save_pitcher:
+                save_pitcher = None
+            holds = [h for h in holds if h != losing_pitcher]
+        if save_pitcher:
+            holds = [h for h in holds if h != save_pitcher]
+
+        results[key] = {'win': winning_pitcher, 'loss': losing_pitcher, 'save': save_pitcher, 'holds': holds}
+    return results
@@ -1,5 +1,26 @@
 import pandas as pd
 
+# (season, game_id) of every game apply_gamelog_corrections changes; add new corrections here too.
+CORRECTED_GAMES = [('S2', 164), ('S3', 90), ('S3', 188), ('S2', 122), ('S2', 13), ('S5', 228), ('S6', 145)]
+
+def apply_all_gamelog_corrections(df):
+    """
+    Applies the manual corrections to a DataFrame of many games.
+
+    Only the games in CORRECTED_GAMES go through apply_gamelog_corrections; every other game is unchanged.
+    
+    Returns:
+        pd.DataFrame: The same layout as df.groupby(['Season', 'Game ID']).apply(...).reset_index():
+        sorted by season and game, with each row's original index in a 'level_2' column.
+    """
+    is_corrected = pd.MultiIndex.from_frame(df[['Season', 'Game ID']]).isin(CORRECTED_GAMES)
+    unchanged = df[~is_corrected].set_index(['Season', 'Game ID'], append=True).reorder_levels([1, 2, 0])
+    corrected = df[is_corrected].groupby(['Season', 'Game ID']).apply(
+        lambda g: apply_gamelog_corrections(g, g.name), include_groups=False
+    )
+    combined = pd.concat([unchanged, corrected]) if not corrected.empty else unchanged
+    return combined.sort_index(level=['Season', 'Game ID'], sort_remaining=False).reset_index()
+
 def apply_gamelog_corrections(df, group_name):
     """
     Applies manual corrections to the gamelog data for known errors in the raw data.
@@ -79,8 +100,8 @@ def apply_gamelog_corrections(df, group_name):
             'OBC': 3,
             'Home Score': 2,
             'Away Score': 2,
-            'Batter WPA': 17.99,
-            'Pitcher WPA': 17.99,
+            'Batter WPA': 0.1799,
+            'Pitcher WPA': 0.1799,
             'RBI': 1,
             'Run': 0,
             'Scores': 0,
@@ -1,16 +1,10 @@
-import pandas as pd
-import itertools
-from game_processing import Game, _get_outs_from_result
+import os
+from game_processing import OBC_TO_RUNNERS, resolve_plays
 
 def generate_play_outcome_markdown():
     markdown_content = "# Baseball Play Outcome Rulebook\n\n"
     markdown_content += "This document details the logic for various baseball play outcomes as implemented in the game simulation engine (`game_processing.py`). For each outcome, it shows how the base-out state changes and how many runs are scored.\n\n"
 
-    obc_to_runners = {
-        0: [False, False, False], 1: [True, False, False], 2: [False, True, False], 3: [False, False, True],
-        4: [True, True, False], 5: [True, False, True], 6: [False, True, True], 7: [True, True, True]
-    }
-
     play_results = [
         'HR', '3B', '2B', '1B', 'BUNT 1B', 'Bunt 1B',
         'BB', 'IBB', 'Auto BB', 'AUTO BB',
@@ -22,9 +16,6 @@ def generate_play_outcome_markdown():
         'CS 2B', 'CS 3B', 'CS Home', 'CS', 'SB', 'CMS 3B', 'CMS Home', 'Bunt DP'
     ]
 
-    dummy_df = pd.DataFrame([{'Inning': 'T1', 'Batter Team': 'A', 'Pitcher Team': 'H', 'Pitcher ID': 'P1', 'OBC': 0, 'Exact Result': '1B', 'Old Result': ''}])
-    game_instance = Game(dummy_df)
-
     logic_explanations = {
         'HR': "All runners on base score, plus the batter. Bases become empty.",
         '3B': "All runners on base score. Batter is on 3rd.",
@@ -99,7 +90,7 @@ def generate_play_outcome_markdown():
             season = 3
 
         for initial_outs in range(3):
-            for obc_key, initial_runners in obc_to_runners.items():
+            for obc_key, initial_runners in OBC_TO_RUNNERS.items():
                 initial_bases_str = "".join(["1" if r else "0" for r in initial_runners])
 
                 # Filtering logic (from original generate_rulebook.py)
@@ -135,14 +126,15 @@ def generate_play_outcome_markdown():
                     if initial_bases_str not in ['100', '010', '110', '101']:
                         continue
 
-                new_runners, runs_scored, outs_this_play = game_instance._simulate_play(
-                    initial_runners, initial_outs, sim_result, sim_result, diff, season, pa_type
-                )
+                # Read the outcome from the same transition table the stats pipeline uses
+                new_obc, runs_scored, outs_this_play = (values[0] for values in resolve_plays(
+                    [sim_result], [sim_result], [season], [obc_key], [initial_outs], [diff], [pa_type], [-1]
+                ))
                 
                 resulting_outs = initial_outs + outs_this_play
                 if resulting_outs > 3: resulting_outs = 3
 
-                resulting_bases_str = "".join(["1" if r else "0" for r in new_runners])
+                resulting_bases_str = "".join(["1" if r else "0" for r in OBC_TO_RUNNERS[new_obc]])
 
                 current_table_rows.append(f"| {initial_outs} | {initial_bases_str} | {resulting_bases_str} | {runs_scored} | {resulting_outs} |")
         
@@ -163,7 +155,8 @@ def generate_play_outcome_markdown():
 
         markdown_content += table_content + "\n\n"
 
-    with open("C:\\Users\\tjjoh\\Documents\\MLR\\mlr\\rulebook.md", "w") as f:
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    with open(os.path.join(script_dir, '..', 'rulebook.md'), "w") as f:
         f.write(markdown_content)
 
 if __name__ == "__main__":
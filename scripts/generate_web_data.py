@@ -1,9 +1,17 @@
-from data_loader import load_all_seasons, load_player_types
-from game_processing import get_pitching_decisions
-from gamelog_corrections import apply_gamelog_corrections
+from data_loader import load_all_seasons, load_player_types, get_input_fingerprint, apply_gamelog_schema
+from game_processing import get_pitching_decisions_for_games, add_play_states
+from gamelog_corrections import apply_all_gamelog_corrections
+from parallel import get_default_workers, get_partition_columns, run_partitions
+from stage_profiler import StageProfiler
+from stage_cache import StageCache, get_source_digest, get_frame_digest, get_group_digests, get_key
+from export_writer import ExportWriter
 from player_data_corrections import apply_postprocessing_corrections
+import numpy as np
 import pandas as pd
+import argparse
 import sys
+import gzip
+import hashlib
 import json
 import os
 import re
@@ -12,73 +20,49 @@ from collections import defaultdict
 
 
 
-def _simulate_play_for_tracking(play, current_runners, outs):
-    runs_scored = []
-    runners = {k: v.copy() if v else None for k, v in current_runners.items()} # Deep copy
-    batter = {'id': play['Hitter ID'], 'is_manfred': False}
-    result = play['Exact Result'] if pd.notna(play['Exact Result']) else play['Old Result']
-    advancement_bonus = 1 if outs == 2 and result in ['1B', '2B'] else 0
-
-    # --- SIMULATE PLAY OUTCOME ---
-    if result == 'HR':
-        if runners[3]: runs_scored.append(runners[3])
-        if runners[2]: runs_scored.append(runners[2])
-        if runners[1]: runs_scored.append(runners[1])
-        runs_scored.append(batter)
-        runners = {1: None, 2: None, 3: None}
-    elif result == '3B':
-        if runners[3]: runs_scored.append(runners[3])
-        if runners[2]: runs_scored.append(runners[2])
-        if runners[1]: runs_scored.append(runners[1])
-        runners = {1: None, 2: None, 3: batter}
-    elif result == '2B':
-        if runners[3]: runs_scored.append(runners[3])
-        if runners[2]: runs_scored.append(runners[2])
-        new_runners = {1: None, 2: batter, 3: None}
-        if runners[1]: new_runners[3] = runners[1]
-        runners = new_runners
-    elif result in ['1B', 'BUNT 1B', 'Bunt 1B']:
-        if advancement_bonus > 0 and result == '1B':
-            if runners[3]: runs_scored.append(runners[3])
-            if runners[2]: runs_scored.append(runners[2])
-            if runners[1]: runners[3] = runners[1]
-            runners = {1: batter, 2: None, 3: runners.get(1)}
-        else:
-            if runners[3]: runs_scored.append(runners[3])
-            new_runners = {1: batter, 2: None, 3: None}
-            if runners[2]: new_runners[3] = runners[2]
-            if runners[1]: new_runners[2] = runners[1]
-            runners = new_runners
-    elif result in ['BB', 'IBB', 'Auto BB', 'AUTO BB']:
-        if runners[1] and runners[2] and runners[3]: runs_scored.append(runners[3])
-        new_runners = runners.copy()
-        if runners[1] and runners[2]: new_runners[3] = runners[2]
-        if runners[1]: new_runners[2] = runners[1]
-        new_runners[1] = batter
-        runners = new_runners
-    # Add other out results here...
-
-    return runs_scored, runners
-
-def _read_cache_manifest(cache_dir):
+def _load_cache_manifest_data(cache_dir):
     manifest_path = os.path.join(cache_dir, 'cache_info.json')
     if not os.path.exists(manifest_path):
-        return None
+        return {}
     try:
         with open(manifest_path, 'r') as f:
-            data = json.load(f)
-            return data.get('last_run_most_recent')
+            return json.load(f)
     except (json.JSONDecodeError, IOError):
-        return None
+        return {}
 
-def _write_cache_manifest(cache_dir, most_recent_season):
+def _write_cache_manifest(cache_dir, most_recent_season=None, last_build_inputs=None):
     manifest_path = os.path.join(cache_dir, 'cache_info.json')
+    manifest = _load_cache_manifest_data(cache_dir)
+    if most_recent_season is not None:
+        manifest['last_run_most_recent'] = most_recent_season
+    if last_build_inputs is not None:
+        manifest['last_build_inputs'] = last_build_inputs
     try:
         with open(manifest_path, 'w') as f:
-            json.dump({'last_run_most_recent': most_recent_season}, f)
+            json.dump(manifest, f)
     except IOError:
         print("Warning: Could not write to cache manifest file.")
 
+# Hand-maintained files in docs/data that the build reads
+BUILD_INPUT_DOCS = ['team_history.json']
+
+def get_build_fingerprint(options):
+    """
+    Digest of everything a build depends on: the raw and static inputs (get_input_fingerprint), the
+    hand-maintained files in BUILD_INPUT_DOCS, the source of every script and the options that change the
+    output ({'re_method': ..., 'sharded': ...}), so that a change to a stat formula, a gamelog or player data
+    correction or a different export mode is never skipped as "nothing new".
+    """
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    scripts = sorted(file_name for file_name in os.listdir(script_dir) if file_name.endswith('.py'))
+    doc_digests = {}
+    for file_name in BUILD_INPUT_DOCS:
+        path = os.path.join(script_dir, '..', 'docs', 'data', file_name)
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                doc_digests[file_name] = hashlib.sha256(f.read()).hexdigest()
+    return get_key(get_input_fingerprint(), get_source_digest(*scripts), doc_digests, options)
+
 def calculate_ops_plus_for_row(row, league_stats_by_season):
     if row['PA'] == 0:
         return pd.NA
@@ -113,361 +97,439 @@ def format_ip(ip_float):
         outs = 0
     return f"{whole_innings}.{outs}"
 
-def calculate_hitting_stats(df, season=None):
-    if df.empty: return None
-
-    if season is None:
-        season = df.name
-    use_old_results = season in ['S2', 'S3']
-
-    if use_old_results:
-        result_col = 'Old Result'
-        hits = {'1B', '2B', '3B', 'HR'}
-        walks = {'BB', 'IBB', 'Auto BB'}
-        strikeouts = {'K', 'Auto K'}
-        stolen_bases = {'SB'}
-        caught_stealing = {'CS'}
-        pa_events = hits | walks | strikeouts | {'FO', 'PO', 'LGO', 'RGO', 'LO', 'DP', 'TP', 'Sac', 'Bunt'}
-    else:
-        result_col = 'Exact Result'
-        hits = {'1B', '2B', '3B', 'HR', 'BUNT 1B', 'Bunt 1B'}
-        walks = {'BB', 'IBB', 'Auto BB', 'AUTO BB'}
-        strikeouts = {'K', 'Auto K', 'Bunt K', 'AUTO K', 'BUNT K'}
-        stolen_bases = {'STEAL 2B', 'STEAL 3B', 'Steal 2B', 'Steal 3B', 'MSTEAL 3B', 'MSteal 3B'}
-        caught_stealing = {'CS 2B', 'CS 3B', 'CS Home', 'CMS 3B', 'CMS Home'}
-        pa_events = hits | walks | strikeouts | {'FO', 'PO', 'LGO', 'RGO', 'LO', 'BUNT DP', 'Bunt DP', 'BUNT GO', 'Bunt GO', 'BUNT Sac', 'Bunt Sac'}
-
-    if use_old_results:
-        diff_events = pa_events | stolen_bases | caught_stealing
-        diff_df = df[df[result_col].isin(diff_events)]
-        pa_df = df[df[result_col].isin(pa_events)]
-    else:
-        diff_events_exact = pa_events | stolen_bases | caught_stealing
-        exact_diff_df = df[df['Exact Result'].isin(diff_events_exact)]
-        old_diff_df = df[df['Old Result'].isin(['DP', 'TP'])]
-        diff_df = pd.concat([exact_diff_df, old_diff_df]).drop_duplicates()
-
-        exact_pa_df = df[df['Exact Result'].isin(pa_events)]
-        old_pa_df = df[df['Old Result'].isin(['DP', 'TP'])]
-        pa_df = pd.concat([exact_pa_df, old_pa_df]).drop_duplicates()
-
-    numeric_diff = pd.to_numeric(diff_df['Diff'], errors='coerce')
-    avg_diff = numeric_diff.mean()
-
-    num_sb = df[df[result_col].isin(stolen_bases)].shape[0]
-    num_cs = df[df[result_col].isin(caught_stealing)].shape[0]
-
-    pa = len(pa_df)
-
-    re24_events = pa_events | stolen_bases | caught_stealing
-    re24_df = df[df[result_col].isin(re24_events)]
-    re24 = re24_df['RE24'].sum() if 'RE24' in re24_df.columns else 0
-    wpa = re24_df['Batter WPA'].sum() if 'Batter WPA' in re24_df.columns else 0
-
-    if pa == 0:
-        runs_scored = df['Run'].sum()
-        sb_pct = num_sb / (num_sb + num_cs) if (num_sb + num_cs) > 0 else pd.NA
-        return pd.Series({'G': df['Session'].nunique(), 'PA': 0, 'AB': 0, 'H': 0, 'R': runs_scored, 'RBI': 0, '1B': 0, '2B': 0, '3B': 0, 'HR': 0, 'TB': 0, 'BB': 0, 'IBB': 0, 'Auto K': 0, 'K': 0, 'SB': num_sb, 'CS': num_cs, 'SH': 0, 'SF': 0, 'GIDP': 0, 'RGO': 0, 'LGO': 0, 'FO': 0, 'PO': 0, 'LO': 0, 'AVG': pd.NA, 'OBP': pd.NA, 'SLG': pd.NA, 'OPS': pd.NA, 'Avg Diff': avg_diff, 'RE24': re24, 'WPA': wpa, 'ISO': pd.NA, 'BABIP': pd.NA, 'SB%': sb_pct, 'HR%': pd.NA, 'SO%': pd.NA, 'BB%': pd.NA, 'GB%': pd.NA, 'FB%': pd.NA, 'GB/FB': pd.NA, 'GB_outs': 0, 'FB_outs': 0, 'nOBP': pd.NA, 'nSLG': pd.NA})
-
-    games_played = df['Session'].nunique()
-    num_walks = pa_df[pa_df[result_col].isin(walks)].shape[0]
-    num_ibb = pa_df[pa_df[result_col] == 'IBB'].shape[0]
-    
-    num_gidp = pa_df[(pa_df['Old Result'].isin(['DP', 'TP'])) | (pa_df['Exact Result'] == 'BUNT DP')].shape[0]
-
-    if use_old_results:
-        num_sh = pa_df[pa_df['Old Result'] == 'Bunt'].shape[0]
-        num_sf = pa_df[pa_df['Old Result'] == 'Sac'].shape[0]
-    else:
-        num_sh = pa_df[pa_df['Exact Result'].isin(['BUNT Sac', 'Bunt Sac'])].shape[0]
-        num_sf = pa_df[(pa_df['Exact Result'] == 'FO') & (pd.to_numeric(pa_df['RBI'], errors='coerce').fillna(0) > 0)].shape[0]
-
-    num_sacrifices = num_sh + num_sf
-    
-    ab = pa - num_walks - num_sacrifices
-    num_hits = pa_df[pa_df[result_col].isin(hits)].shape[0]
-    num_doubles = pa_df[pa_df[result_col] == '2B'].shape[0]
-    num_triples = pa_df[pa_df[result_col] == '3B'].shape[0]
-    num_hr = pa_df[pa_df[result_col] == 'HR'].shape[0]
-    num_singles = pa_df[pa_df[result_col] == '1B'].shape[0]
-    if not use_old_results:
-        num_singles += pa_df[pa_df[result_col] == 'BUNT 1B'].shape[0]
-
-    num_tb = num_singles + (num_doubles * 2) + (num_triples * 3) + (num_hr * 4)
-    num_strikeouts = pa_df[pa_df[result_col].isin(strikeouts)].shape[0]
-    num_auto_k = pa_df[pa_df[result_col].isin(['Auto K', 'AUTO K'])].shape[0]
-    num_rgo = pa_df[pa_df[result_col] == 'RGO'].shape[0]
-    num_lgo = pa_df[pa_df[result_col] == 'LGO'].shape[0]
-    num_fo = pa_df[pa_df[result_col] == 'FO'].shape[0]
-    num_po = pa_df[pa_df[result_col] == 'PO'].shape[0]
-    num_lo = pa_df[pa_df[result_col] == 'LO'].shape[0]
-
-    runs_scored = df['Run'].sum()
-    rbi = df['RBI'].sum()
-
-    avg = num_hits / ab if ab > 0 else pd.NA
-    obp = (num_hits + num_walks) / (ab + num_walks + num_sf) if (ab + num_walks + num_sf) > 0 else pd.NA
-    slg = num_tb / ab if ab > 0 else pd.NA
-    ops = obp + slg if pd.notna(obp) and pd.notna(slg) else pd.NA
-    iso = slg - avg if pd.notna(slg) and pd.notna(avg) else pd.NA
-    babip = (num_hits - num_hr) / (ab - num_strikeouts - num_hr + num_sf) if (ab - num_strikeouts - num_hr + num_sf) > 0 else pd.NA
-    sb_pct = num_sb / (num_sb + num_cs) if (num_sb + num_cs) > 0 else pd.NA
-    hr_pct = num_hr / pa if pa > 0 else pd.NA
-    so_pct = num_strikeouts / pa if pa > 0 else pd.NA
-    bb_pct = num_walks / pa if pa > 0 else pd.NA
-
-    num_gb_outs = num_rgo + num_lgo + num_gidp
-    num_fb_outs = num_fo + num_po + num_lo + num_sf
-    total_bip_outs = num_gb_outs + num_fb_outs
-
-    gb_pct = num_gb_outs / total_bip_outs if total_bip_outs > 0 else pd.NA
-    fb_pct = num_fb_outs / total_bip_outs if total_bip_outs > 0 else pd.NA
-    gb_fb_ratio = num_gb_outs / num_fb_outs if num_fb_outs > 0 else pd.NA
-
-    # Initialize all neutral component variables to pd.NA
-    n_pa_val = pd.NA
-    n_ab_val = pd.NA
-    n_num_hits_val = pd.NA
-    n_num_walks_val = pd.NA
-    n_num_sf_val = pd.NA
-    n_num_sh_val = pd.NA
-    n_num_tb_val = pd.NA
-
-    nOBP = obp
-    nSLG = slg
-
-    use_neutral_results = season not in ['S1', 'S2']
-    if use_neutral_results:
-        neutral_result_col = 'Result at Neutral'
-        neutral_df = df[df[neutral_result_col].notna()]
-        
-        if not neutral_df.empty:
-            # Define event sets for neutral results, combining old and new possibilities
-            n_hits = {'1B', '2B', '3B', 'HR', 'BUNT 1B', 'Bunt 1B'}
-            n_walks = {'BB', 'IBB', 'Auto BB', 'AUTO BB'}
-            n_strikeouts = {'K', 'Auto K', 'Bunt K', 'AUTO K', 'BUNT K'}
-            n_pa_events = n_hits | n_walks | n_strikeouts | {'FO', 'PO', 'LGO', 'RGO', 'LO', 'DP', 'TP', 'Sac', 'Bunt', 'BUNT DP', 'Bunt DP', 'BUNT GO', 'Bunt GO', 'BUNT Sac', 'Bunt Sac'}
-
-            n_pa_df = neutral_df[neutral_df[neutral_result_col].isin(n_pa_events)]
-            n_pa_current = len(n_pa_df)
-            n_pa_val = n_pa_current
-
-            if n_pa_current > 0:
-                n_num_walks_current = n_pa_df[n_pa_df[neutral_result_col].isin(n_walks)].shape[0]
-                n_num_hits_current = n_pa_df[n_pa_df[neutral_result_col].isin(n_hits)].shape[0]
-
-                n_num_sf_current = n_pa_df[n_pa_df[neutral_result_col] == 'Sac'].shape[0]
-                n_num_sh_current = n_pa_df[n_pa_df[neutral_result_col].isin(['Bunt', 'BUNT Sac', 'Bunt Sac'])].shape[0]
-                n_num_sacrifices_current = n_num_sh_current + n_num_sf_current
-                
-                n_ab_current = n_pa_current - n_num_walks_current - n_num_sacrifices_current
-                
-                n_ab_val = n_ab_current
-                n_num_hits_val = n_num_hits_current
-                n_num_walks_val = n_num_walks_current
-                n_num_sf_val = n_num_sf_current
-                n_num_sh_val = n_num_sh_current
-
-                if (n_ab_current + n_num_walks_current + n_num_sf_current) > 0:
-                    calculated_nOBP = (n_num_hits_current + n_num_walks_current) / (n_ab_current + n_num_walks_current + n_num_sf_current)
-                    if not pd.isna(calculated_nOBP):
-                        nOBP = calculated_nOBP
-                
-                if n_ab_current > 0:
-                    n_num_doubles = n_pa_df[n_pa_df[neutral_result_col] == '2B'].shape[0]
-                    n_num_triples = n_pa_df[n_pa_df[neutral_result_col] == '3B'].shape[0]
-                    n_num_hr = n_pa_df[n_pa_df[neutral_result_col] == 'HR'].shape[0]
-                    n_num_singles = n_pa_df[n_pa_df[neutral_result_col].isin(['1B', 'BUNT 1B', 'Bunt 1B'])].shape[0]
-                    n_num_tb_current = n_num_singles + (n_num_doubles * 2) + (n_num_triples * 3) + (n_num_hr * 4)
-                    n_num_tb_val = n_num_tb_current
-                    
-                    calculated_nSLG = n_num_tb_current / n_ab_current
-                    if not pd.isna(calculated_nSLG):
-                        nSLG = calculated_nSLG
-
-    batting_type = df['Hitter Batting Type'].iloc[0] if 'Hitter Batting Type' in df.columns and not df['Hitter Batting Type'].dropna().empty else None
-
-    series_data = {
-        'G': games_played, 'PA': pa, 'AB': ab, 'H': num_hits, 'R': runs_scored, '1B': num_singles, '2B': num_doubles, '3B': num_triples, 'HR': num_hr, 'TB': num_tb, 'RBI': rbi,
-        'BB': num_walks, 'IBB': num_ibb, 'K': num_strikeouts, 'Auto K': num_auto_k, 'SB': num_sb, 'CS': num_cs, 'SH': num_sh, 'SF': num_sf, 'GIDP': num_gidp,
-        'RGO': num_rgo, 'LGO': num_lgo, 'FO': num_fo, 'PO': num_po, 'LO': num_lo,
-        'AVG': avg, 'OBP': obp, 'SLG': slg, 'OPS': ops, 'ISO': iso, 'BABIP': babip,
-        'SB%': sb_pct, 'HR%': hr_pct, 'SO%': so_pct, 'BB%': bb_pct,
-        'GB%': gb_pct, 'FB%': fb_pct, 'GB/FB': gb_fb_ratio,
-        'Avg Diff': avg_diff,
-        'nOBP': nOBP, 'nSLG': nSLG, 'RE24': re24, 'WPA': wpa,
-        'GB_outs': num_gb_outs, 'FB_outs': num_fb_outs,
-        'Type': batting_type
-    }
-
-    if pd.notna(n_pa_val): # Only update if neutral stats were actually calculated
-        series_data.update({
-            'nPA': n_pa_val,
-            'nAB': n_ab_val,
-            'nH': n_num_hits_val,
-            'nTB': n_num_tb_val,
-            'nBB': n_num_walks_val,
-            'nSF': n_num_sf_val,
-            'nSH': n_num_sh_val,
-        })
-
-    return pd.Series(series_data)
-
-def calculate_pitching_stats(df, season=None):
-    if df.empty: return None
-
-    if season is None:
-        season = df.name
-    use_old_results = season in ['S2', 'S3']
-
-    if use_old_results:
-        result_col = 'Old Result'
-        hits_allowed = {'1B', '2B', '3B', 'HR'}
-        walks_allowed = {'BB', 'IBB', 'Auto BB'}
-        ibb_events = {'IBB'}
-        strikeouts = {'K', 'Auto K'}
-        hr_allowed = {'HR'}
-        single_out_bip = {'FO', 'LGO', 'PO', 'RGO', 'Bunt', 'LO'}
-        caught_stealing = {'CS'}
-        stolen_bases = {'SB'}
-    else:
-        result_col = 'Exact Result'
-        hits_allowed = {'1B', '2B', '3B', 'HR', 'BUNT 1B', 'Bunt 1B'}
-        walks_allowed = {'BB', 'IBB', 'Auto BB', 'AUTO BB'}
-        ibb_events = {'IBB'}
-        strikeouts = {'K', 'Auto K', 'Bunt K', 'AUTO K', 'BUNT K'}
-        hr_allowed = {'HR'}
-        single_out_bip = {'FO', 'LGO', 'PO', 'RGO', 'LO', 'BUNT GO', 'Bunt GO', 'BUNT Sac', 'Bunt Sac'}
-        caught_stealing = {'CS 2B', 'CS 3B', 'CS Home', 'CMS 3B', 'CMS Home'}
-        stolen_bases = {'STEAL 2B', 'STEAL 3B', 'Steal 2B', 'Steal 3B', 'MSTEAL 3B', 'MSteal 3B'}
-
-    num_sb_allowed = df[df[result_col].isin(stolen_bases)].shape[0]
-    num_cs_against = df[df[result_col].isin(caught_stealing)].shape[0]
-    sb_pct_against = num_sb_allowed / (num_sb_allowed + num_cs_against) if (num_sb_allowed + num_cs_against) > 0 else pd.NA
-
-    if use_old_results:
-        pitching_pa_events = hits_allowed | walks_allowed | strikeouts | single_out_bip | {'DP', 'TP', 'Sac'}
-        diff_events = pitching_pa_events | stolen_bases | caught_stealing
-        diff_df = df[df[result_col].isin(diff_events)]
+# --- Batting Stats Engine ---
+# Each play is tagged once with era-aware event flags; every hitter, hitter-team and league row is then a groupby sum.
+
+OLD_RESULT_SEASONS = ['S2', 'S3'] # Seasons scored from 'Old Result' instead of 'Exact Result'
+NO_NEUTRAL_RESULT_SEASONS = ['S1', 'S2']
+
+BATTING_EVENTS = {
+    'old': {
+        'hits': {'1B', '2B', '3B', 'HR'},
+        'walks': {'BB', 'IBB', 'Auto BB'},
+        'strikeouts': {'K', 'Auto K'},
+        'stolen_bases': {'SB'},
+        'caught_stealing': {'CS'},
+        'other_pa': {'FO', 'PO', 'LGO', 'RGO', 'LO', 'DP', 'TP', 'Sac', 'Bunt'},
+    },
+    'new': {
+        'hits': {'1B', '2B', '3B', 'HR', 'BUNT 1B', 'Bunt 1B'},
+        'walks': {'BB', 'IBB', 'Auto BB', 'AUTO BB'},
+        'strikeouts': {'K', 'Auto K', 'Bunt K', 'AUTO K', 'BUNT K'},
+        'stolen_bases': {'STEAL 2B', 'STEAL 3B', 'Steal 2B', 'Steal 3B', 'MSTEAL 3B', 'MSteal 3B'},
+        'caught_stealing': {'CS 2B', 'CS 3B', 'CS Home', 'CMS 3B', 'CMS Home'},
+        'other_pa': {'FO', 'PO', 'LGO', 'RGO', 'LO', 'BUNT DP', 'Bunt DP', 'BUNT GO', 'Bunt GO', 'BUNT Sac', 'Bunt Sac'},
+    },
+}
+for events in BATTING_EVENTS.values():
+    events['pa'] = events['hits'] | events['walks'] | events['strikeouts'] | events.pop('other_pa')
+
+NEUTRAL_HITS = {'1B', '2B', '3B', 'HR', 'BUNT 1B', 'Bunt 1B'}
+NEUTRAL_WALKS = {'BB', 'IBB', 'Auto BB', 'AUTO BB'}
+NEUTRAL_STRIKEOUTS = {'K', 'Auto K', 'Bunt K', 'AUTO K', 'BUNT K'}
+NEUTRAL_PA_EVENTS = NEUTRAL_HITS | NEUTRAL_WALKS | NEUTRAL_STRIKEOUTS | {'FO', 'PO', 'LGO', 'RGO', 'LO', 'DP', 'TP', 'Sac', 'Bunt', 'BUNT DP', 'Bunt DP', 'BUNT GO', 'Bunt GO', 'BUNT Sac', 'Bunt Sac'}
+
+HITTING_STATS_COLUMNS = [
+    'G', 'PA', 'AB', 'H', 'R', '1B', '2B', '3B', 'HR', 'TB', 'RBI',
+    'BB', 'IBB', 'K', 'Auto K', 'SB', 'CS', 'SH', 'SF', 'GIDP',
+    'RGO', 'LGO', 'FO', 'PO', 'LO',
+    'AVG', 'OBP', 'SLG', 'OPS', 'ISO', 'BABIP',
+    'SB%', 'HR%', 'SO%', 'BB%',
+    'GB%', 'FB%', 'GB/FB',
+    'Avg Diff',
+    'nOBP', 'nSLG', 'RE24', 'WPA',
+    'GB_outs', 'FB_outs',
+    'Type'
+]
+NEUTRAL_HITTING_COLUMNS = ['nPA', 'nAB', 'nH', 'nTB', 'nBB', 'nSF', 'nSH']
+
+def tag_batting_events(df):
+    """Flags every play once with the batting events it counts toward, using its season's result column."""
+    use_old_results = df['Season'].isin(OLD_RESULT_SEASONS).to_numpy()
+    exact_result = df['Exact Result']
+    old_result = df['Old Result']
+    result = old_result.where(use_old_results, exact_result)
+
+    def era_isin(event_set):
+        return np.where(use_old_results, result.isin(BATTING_EVENTS['old'][event_set]), result.isin(BATTING_EVENTS['new'][event_set]))
+
+    old_dp_tp = old_result.isin(['DP', 'TP']).to_numpy()
+    stolen_bases = era_isin('stolen_bases')
+    caught_stealing = era_isin('caught_stealing')
+    result_pa = era_isin('pa')
+    # Modern seasons also count plays the old result scored as a DP/TP
+    pa = result_pa | (~use_old_results & old_dp_tp)
+    re24_play = result_pa | stolen_bases | caught_stealing
+    diff_play = re24_play | (~use_old_results & old_dp_tp)
+
+    rbi = df['RBI'].to_numpy(dtype=int, na_value=0)
+    diff = pd.Series(df['Diff'].to_numpy(dtype=float, na_value=np.nan), index=df.index).where(diff_play)
+
+    events = pd.DataFrame({
+        'PA': pa,
+        'H': pa & era_isin('hits'),
+        '1B': pa & ((result == '1B') | (~use_old_results & (result == 'BUNT 1B'))),
+        '2B': pa & (result == '2B'),
+        '3B': pa & (result == '3B'),
+        'HR': pa & (result == 'HR'),
+        'BB': pa & era_isin('walks'),
+        'IBB': pa & (result == 'IBB'),
+        'K': pa & era_isin('strikeouts'),
+        'Auto K': pa & result.isin(['Auto K', 'AUTO K']),
+        'SB': stolen_bases,
+        'CS': caught_stealing,
+        'SH': pa & np.where(use_old_results, old_result == 'Bunt', exact_result.isin(['BUNT Sac', 'Bunt Sac'])),
+        'SF': pa & np.where(use_old_results, old_result == 'Sac', (exact_result == 'FO') & (rbi > 0)),
+        'GIDP': pa & (old_dp_tp | (exact_result == 'BUNT DP')),
+        'RGO': pa & (result == 'RGO'),
+        'LGO': pa & (result == 'LGO'),
+        'FO': pa & (result == 'FO'),
+        'PO': pa & (result == 'PO'),
+        'LO': pa & (result == 'LO'),
+    }, index=df.index).astype(int)
+    events['R'] = df['Run'].to_numpy(dtype=int, na_value=0)
+    events['RBI'] = rbi
+    events['RE24'] = df['RE24'].where(re24_play, 0) if 'RE24' in df.columns else 0
+    # WPA is stored as float32; widen it and round off the float32 noise before summing
+    events['WPA'] = df['Batter WPA'].astype('float64').round(6).where(re24_play, 0) if 'Batter WPA' in df.columns else 0
+    events['Diff Total'] = diff.fillna(0)
+    events['Diff Count'] = diff.notna().astype(int)
+
+    # Neutral-result components
+    neutral_result = df['Result at Neutral'] if 'Result at Neutral' in df.columns else pd.Series(np.nan, index=df.index)
+    neutral_play = neutral_result.notna() & ~df['Season'].isin(NO_NEUTRAL_RESULT_SEASONS)
+    n_pa = neutral_play & neutral_result.isin(NEUTRAL_PA_EVENTS)
+    events['Neutral Plays'] = neutral_play.astype(int)
+    events['nPA'] = n_pa.astype(int)
+    events['nH'] = (n_pa & neutral_result.isin(NEUTRAL_HITS)).astype(int)
+    events['nBB'] = (n_pa & neutral_result.isin(NEUTRAL_WALKS)).astype(int)
+    events['nSF'] = (n_pa & (neutral_result == 'Sac')).astype(int)
+    events['nSH'] = (n_pa & neutral_result.isin(['Bunt', 'BUNT Sac', 'Bunt Sac'])).astype(int)
+    events['nTB'] = (
+        (n_pa & neutral_result.isin(['1B', 'BUNT 1B', 'Bunt 1B'])).astype(int)
+        + 2 * (n_pa & (neutral_result == '2B'))
+        + 3 * (n_pa & (neutral_result == '3B'))
+        + 4 * (n_pa & (neutral_result == 'HR'))
+    )
+    return events
+
+def _ratio(numerator, denominator):
+    """numerator / denominator, NA where the denominator isn't positive."""
+    return (numerator / denominator.where(denominator > 0)).astype(object).where(denominator > 0, pd.NA)
+
+def aggregate_batting_stats(df, events, keys):
+    """Sums tagged batting events by `keys` and derives the rate stats, in the hitting_stats_S*.csv column layout."""
+    grouped = events.groupby([df[key] for key in keys], sort=True)
+    totals = grouped.sum()
+    stats = pd.DataFrame(index=totals.index)
+    has_pa = totals['PA'] > 0
+
+    stats['G'] = df.groupby(keys, sort=True)['Session'].nunique()
+    stats['PA'] = totals['PA']
+    stats['AB'] = totals['PA'] - totals['BB'] - totals['SH'] - totals['SF']
+    stats['H'] = totals['H']
+    stats['R'] = totals['R']
+    for col in ['1B', '2B', '3B', 'HR']:
+        stats[col] = totals[col]
+    stats['TB'] = totals['1B'] + 2 * totals['2B'] + 3 * totals['3B'] + 4 * totals['HR']
+    stats['RBI'] = totals['RBI'].where(has_pa, 0)
+    for col in ['BB', 'IBB', 'K', 'Auto K', 'SB', 'CS', 'SH', 'SF', 'GIDP', 'RGO', 'LGO', 'FO', 'PO', 'LO']:
+        stats[col] = totals[col]
+
+    stats['AVG'] = _ratio(stats['H'], stats['AB'])
+    stats['OBP'] = _ratio(stats['H'] + stats['BB'], stats['AB'] + stats['BB'] + stats['SF'])
+    stats['SLG'] = _ratio(stats['TB'], stats['AB'])
+    has_obp_and_slg = stats['OBP'].notna() & stats['SLG'].notna()
+    stats['OPS'] = (stats['OBP'].where(has_obp_and_slg, 0) + stats['SLG'].where(has_obp_and_slg, 0)).where(has_obp_and_slg, pd.NA)
+    has_slg_and_avg = stats['SLG'].notna() & stats['AVG'].notna()
+    stats['ISO'] = (stats['SLG'].where(has_slg_and_avg, 0) - stats['AVG'].where(has_slg_and_avg, 0)).where(has_slg_and_avg, pd.NA)
+    stats['BABIP'] = _ratio(stats['H'] - stats['HR'], stats['AB'] - stats['K'] - stats['HR'] + stats['SF'])
+    stats['SB%'] = _ratio(stats['SB'], stats['SB'] + stats['CS'])
+    stats['HR%'] = _ratio(stats['HR'], stats['PA'])
+    stats['SO%'] = _ratio(stats['K'], stats['PA'])
+    stats['BB%'] = _ratio(stats['BB'], stats['PA'])
+
+    gb_outs = stats['RGO'] + stats['LGO'] + stats['GIDP']
+    fb_outs = stats['FO'] + stats['PO'] + stats['LO'] + stats['SF']
+    stats['GB%'] = _ratio(gb_outs, gb_outs + fb_outs)
+    stats['FB%'] = _ratio(fb_outs, gb_outs + fb_outs)
+    stats['GB/FB'] = _ratio(gb_outs, fb_outs)
+    stats['Avg Diff'] = totals['Diff Total'] / totals['Diff Count'].where(totals['Diff Count'] > 0)
+
+    # Neutral OBP/SLG, falling back to the actual ones where there are no neutral plate appearances
+    n_ab = totals['nPA'] - totals['nBB'] - totals['nSH'] - totals['nSF']
+    has_n_pa = totals['nPA'] > 0
+    n_obp = _ratio(totals['nH'] + totals['nBB'], (n_ab + totals['nBB'] + totals['nSF']).where(has_n_pa, 0))
+    n_slg = _ratio(totals['nTB'], n_ab.where(has_n_pa, 0))
+    stats['nOBP'] = n_obp.where(n_obp.notna(), stats['OBP']).where(has_pa, pd.NA)
+    stats['nSLG'] = n_slg.where(n_slg.notna(), stats['SLG']).where(has_pa, pd.NA)
+
+    stats['RE24'] = totals['RE24']
+    stats['WPA'] = totals['WPA']
+    stats['GB_outs'] = gb_outs
+    stats['FB_outs'] = fb_outs
+    if 'Hitter Batting Type' in df.columns:
+        first_plays = df.drop_duplicates(subset=keys, keep='first').set_index(keys)['Hitter Batting Type']
+        stats['Type'] = first_plays.reindex(stats.index).where(has_pa)
     else:
-        pa_events_exact = hits_allowed | walks_allowed | strikeouts | single_out_bip | {'BUNT DP'}
-        diff_events_exact = pa_events_exact | stolen_bases | caught_stealing
-        
-        exact_df = df[df['Exact Result'].isin(diff_events_exact)]
-        old_df = df[df['Old Result'].isin(['DP', 'TP'])]
-        
-        diff_df = pd.concat([exact_df, old_df]).drop_duplicates()
-
-    numeric_diff = pd.to_numeric(diff_df['Diff'], errors='coerce')
-    avg_diff = numeric_diff.mean()
-
-    if use_old_results:
-        pitching_pa_events = hits_allowed | walks_allowed | strikeouts | single_out_bip | {'DP', 'TP', 'Sac'}
-        bf_df = df[df[result_col].isin(pitching_pa_events)]
-        num_bf = bf_df.shape[0]
-        re24_events = pitching_pa_events | stolen_bases | caught_stealing
-        re24_df = df[df[result_col].isin(re24_events)]
+        stats['Type'] = None
+
+    # Neutral counts exist only for groups with neutral results, and only for players with a plate appearance
+    has_neutral = has_pa & (totals['Neutral Plays'] > 0)
+    if has_neutral.any():
+        stats['nPA'] = totals['nPA'].where(has_neutral)
+        stats['nAB'] = n_ab.where(has_neutral & has_n_pa)
+        stats['nH'] = totals['nH'].where(has_neutral & has_n_pa)
+        stats['nTB'] = totals['nTB'].where(has_neutral & has_n_pa & (n_ab > 0))
+        stats['nBB'] = totals['nBB'].where(has_neutral & has_n_pa)
+        stats['nSF'] = totals['nSF'].where(has_neutral & has_n_pa)
+        stats['nSH'] = totals['nSH'].where(has_neutral & has_n_pa)
+
+    # Players with no plate appearances only keep their baserunning and games
+    no_pa_columns = ['AB', 'H', '1B', '2B', '3B', 'HR', 'TB', 'BB', 'IBB', 'K', 'Auto K', 'SH', 'SF', 'GIDP', 'RGO', 'LGO', 'FO', 'PO', 'LO', 'GB_outs', 'FB_outs']
+    stats.loc[~has_pa, no_pa_columns] = 0
+    return stats
+
+def calculate_season_hitting_stats(season_df, season):
+    """
+    Calculates every hitter's line for a season: one row per hitter ('NTM' for traded players) plus one
+    sub-row per team for traded players, in the hitting_stats_S*.csv layout.
+    """
+    if season_df.empty:
+        return pd.DataFrame()
+    events = tag_batting_events(season_df)
+
+    totals = aggregate_batting_stats(season_df, events, ['Hitter ID']).reset_index()
+    teams_by_hitter = season_df.groupby('Hitter ID', sort=True)['Batter Team'].unique()
+    num_teams = teams_by_hitter.map(len).reindex(totals['Hitter ID']).to_numpy()
+    first_team = teams_by_hitter.map(lambda teams: teams[0]).reindex(totals['Hitter ID']).to_numpy()
+    last_team = season_df.sort_values('Session').groupby('Hitter ID', sort=True)['Batter Team'].last().reindex(totals['Hitter ID']).to_numpy()
+    totals['Season'] = season
+    totals['Team'] = np.where(num_teams > 1, pd.Series(num_teams).astype(str).to_numpy() + 'TM', first_team)
+    totals['is_sub_row'] = False
+    totals['Last Team'] = last_team
+    totals['Row Order'] = 0
+
+    # Per-team rows for traded players, in the order they played for each team
+    traded_ids = teams_by_hitter[teams_by_hitter.map(len) > 1].index
+    traded_df = season_df[season_df['Hitter ID'].isin(traded_ids)]
+    team_rows = aggregate_batting_stats(traded_df, events.loc[traded_df.index], ['Hitter ID', 'Batter Team']).reset_index()
+    if not team_rows.empty:
+        team_order = traded_df.drop_duplicates(subset=['Hitter ID', 'Batter Team']).reset_index(drop=True)
+        team_order['Row Order'] = team_order.groupby('Hitter ID').cumcount() + 1
+        team_rows = team_rows.merge(team_order[['Hitter ID', 'Batter Team', 'Row Order']], on=['Hitter ID', 'Batter Team'], how='left')
+        team_rows = team_rows.rename(columns={'Batter Team': 'Team'})
+        team_rows['Season'] = season
+        team_rows['is_sub_row'] = True
+        team_rows['Last Team'] = team_rows['Team']
+
+    stats = pd.concat([totals, team_rows], ignore_index=True).sort_values(['Hitter ID', 'Row Order'], kind='stable')
+    stat_columns = HITTING_STATS_COLUMNS + [col for col in NEUTRAL_HITTING_COLUMNS if col in stats.columns]
+    return stats[stat_columns + ['Season', 'Hitter ID', 'Team', 'is_sub_row', 'Last Team']].reset_index(drop=True)
+
+def calculate_league_hitting_stats(season_df):
+    """League-wide batting line for a season (used for the OPS+ baselines)."""
+    stats = aggregate_batting_stats(season_df.assign(League=0), tag_batting_events(season_df), ['League'])
+    return stats.iloc[0]
+
+# --- Pitching Stats Engine ---
+# Same shape as the batting engine: plays are tagged once, then pitcher, pitcher-team and league rows are groupby sums.
+
+PITCHING_EVENTS = {
+    'old': {
+        'hits': {'1B', '2B', '3B', 'HR'},
+        'walks': {'BB', 'IBB', 'Auto BB'},
+        'strikeouts': {'K', 'Auto K'},
+        'single_out_bip': {'FO', 'LGO', 'PO', 'RGO', 'Bunt', 'LO'},
+        'stolen_bases': {'SB'},
+        'caught_stealing': {'CS'},
+    },
+    'new': {
+        'hits': {'1B', '2B', '3B', 'HR', 'BUNT 1B', 'Bunt 1B'},
+        'walks': {'BB', 'IBB', 'Auto BB', 'AUTO BB'},
+        'strikeouts': {'K', 'Auto K', 'Bunt K', 'AUTO K', 'BUNT K'},
+        'single_out_bip': {'FO', 'LGO', 'PO', 'RGO', 'LO', 'BUNT GO', 'Bunt GO', 'BUNT Sac', 'Bunt Sac'},
+        'stolen_bases': {'STEAL 2B', 'STEAL 3B', 'Steal 2B', 'Steal 3B', 'MSTEAL 3B', 'MSteal 3B'},
+        'caught_stealing': {'CS 2B', 'CS 3B', 'CS Home', 'CMS 3B', 'CMS Home'},
+    },
+}
+PITCHING_EVENTS['old']['bf'] = PITCHING_EVENTS['old']['hits'] | PITCHING_EVENTS['old']['walks'] | PITCHING_EVENTS['old']['strikeouts'] | PITCHING_EVENTS['old']['single_out_bip'] | {'DP', 'TP', 'Sac'}
+PITCHING_EVENTS['new']['bf'] = PITCHING_EVENTS['new']['hits'] | PITCHING_EVENTS['new']['walks'] | PITCHING_EVENTS['new']['strikeouts'] | PITCHING_EVENTS['new']['single_out_bip'] | {'BUNT DP'}
+
+PITCHING_STATS_COLUMNS = [
+    'G', 'IP', 'BF', 'H', 'R', 'ER', 'BB', 'IBB', 'Auto BB', 'K', 'HR',
+    '1B', 'RGO', 'LGO', 'FO', 'PO', 'LO',
+    'ERA', 'WHIP', 'H/6', 'HR/6', 'BB/6', 'K/6', 'K/BB',
+    'BAA', 'OBPA', 'SLGA', 'OPSA', 'BABIP_A',
+    'HR%_A', 'K%_A', 'BB%_A',
+    'GB%_A', 'FB%_A', 'GB/FB_A',
+    'Avg Diff', 'RE24', 'WPA',
+    'AB_A', 'SF_A', 'SH_A', '2B_A', '3B_A',
+    'GB_outs_A', 'FB_outs_A',
+    'SB_A', 'CS_A', 'SB%_A',
+    'Type'
+]
+
+def tag_pitching_events(df):
+    """Flags every play once with the pitching events and outs it counts toward, using its season's result column."""
+    use_old_results = df['Season'].isin(OLD_RESULT_SEASONS).to_numpy()
+    exact_result = df['Exact Result']
+    old_result = df['Old Result']
+    result = old_result.where(use_old_results, exact_result)
+
+    def era_isin(event_set):
+        return np.where(use_old_results, result.isin(PITCHING_EVENTS['old'][event_set]), result.isin(PITCHING_EVENTS['new'][event_set]))
+
+    old_dp_tp = old_result.isin(['DP', 'TP']).to_numpy()
+    stolen_bases = era_isin('stolen_bases')
+    caught_stealing = era_isin('caught_stealing')
+    strikeouts = era_isin('strikeouts')
+    single_out_bip = era_isin('single_out_bip')
+    # Modern seasons also count plays the old result scored as a DP/TP
+    bf = era_isin('bf') | (~use_old_results & old_dp_tp)
+    re24_play = bf | stolen_bases | caught_stealing
+    sac = bf & (old_result == 'Sac')
+    sac_fly = sac & (df['RBI'].to_numpy(dtype=int, na_value=0) > 0)
+
+    events = pd.DataFrame({
+        'BF': bf,
+        'H': bf & era_isin('hits'),
+        '2B': bf & (result == '2B'),
+        '3B': bf & (result == '3B'),
+        'HR': bf & (result == 'HR'),
+        'BB': bf & era_isin('walks'),
+        'IBB': bf & (result == 'IBB'),
+        'Auto BB': bf & result.isin(['Auto BB', 'AUTO BB']),
+        'K': bf & strikeouts,
+        'SF': sac_fly,
+        'SH': sac & ~sac_fly,
+        'GIDP': bf & (old_dp_tp | (exact_result == 'BUNT DP')),
+        'RGO': bf & (result == 'RGO'),
+        'LGO': bf & (result == 'LGO'),
+        'FO': bf & (result == 'FO'),
+        'PO': bf & (result == 'PO'),
+        'LO': bf & (result == 'LO'),
+        'BUNT GO': bf & (result == 'BUNT GO'),
+        'SB': stolen_bases,
+        'CS': caught_stealing,
+    }, index=df.index).astype(int)
+    events['Outs'] = (
+        2 * (old_result == 'DP') + 3 * (old_result == 'TP')
+        + (~old_dp_tp & (strikeouts | single_out_bip | caught_stealing))
+    ).astype(int)
+    events['R'] = df['Run'].to_numpy(dtype=int, na_value=0)
+    events['Unearned'] = df['is_unearned'] if 'is_unearned' in df.columns else 0
+    events['RE24'] = df['RE24'].where(re24_play, 0) if 'RE24' in df.columns else 0
+    events['WPA'] = df['Pitcher WPA'].astype('float64').round(6).where(re24_play, 0) if 'Pitcher WPA' in df.columns else 0
+    diff = pd.Series(df['Diff'].to_numpy(dtype=float, na_value=np.nan), index=df.index).where(re24_play)
+    events['Diff Total'] = diff.fillna(0)
+    events['Diff Count'] = diff.notna().astype(int)
+    return events
+
+def aggregate_pitching_stats(df, events, keys):
+    """Sums tagged pitching events by `keys` and derives the rate stats, in the pitching_stats_S*.csv column layout."""
+    totals = events.groupby([df[key] for key in keys], sort=True).sum()
+    stats = pd.DataFrame(index=totals.index)
+    ip = totals['Outs'] / 3
+
+    stats['G'] = df.groupby(keys, sort=True)['Session'].nunique()
+    stats['IP'] = ip
+    for col in ['BF', 'H', 'R']:
+        stats[col] = totals[col]
+    stats['ER'] = totals['R'] - totals['Unearned']
+    for col in ['BB', 'IBB', 'Auto BB', 'K', 'HR']:
+        stats[col] = totals[col]
+    stats['1B'] = totals['H'] - totals['2B'] - totals['3B'] - totals['HR']
+    for col in ['RGO', 'LGO', 'FO', 'PO', 'LO']:
+        stats[col] = totals[col]
+
+    stats['ERA'] = _ratio(stats['ER'] * 6, ip)
+    stats['WHIP'] = _ratio(stats['BB'] + stats['H'], ip)
+    stats['H/6'] = _ratio(stats['H'] * 6, ip)
+    stats['HR/6'] = _ratio(stats['HR'] * 6, ip)
+    stats['BB/6'] = _ratio(stats['BB'] * 6, ip)
+    stats['K/6'] = _ratio(stats['K'] * 6, ip)
+    stats['K/BB'] = _ratio(stats['K'], stats['BB'])
+
+    ab_against = totals['BF'] - totals['BB'] - totals['SH'] - totals['SF']
+    stats['BAA'] = _ratio(stats['H'], ab_against)
+    stats['OBPA'] = _ratio(stats['H'] + stats['BB'], stats['BF'])
+    stats['SLGA'] = _ratio(stats['1B'] + 2 * totals['2B'] + 3 * totals['3B'] + 4 * stats['HR'], ab_against)
+    has_obpa_and_slga = stats['OBPA'].notna() & stats['SLGA'].notna()
+    stats['OPSA'] = (stats['OBPA'].where(has_obpa_and_slga, 0) + stats['SLGA'].where(has_obpa_and_slga, 0)).where(has_obpa_and_slga, pd.NA)
+    stats['BABIP_A'] = _ratio(stats['H'] - stats['HR'], ab_against - stats['K'] - stats['HR'] + totals['SF'])
+    stats['HR%_A'] = _ratio(stats['HR'], stats['BF'])
+    stats['K%_A'] = _ratio(stats['K'], stats['BF'])
+    stats['BB%_A'] = _ratio(stats['BB'], stats['BF'])
+
+    fb_outs = totals['FO'] + totals['PO']
+    gb_outs = totals['LGO'] + totals['RGO'] + totals['BUNT GO'] + totals['GIDP']
+    stats['GB%_A'] = _ratio(gb_outs, gb_outs + fb_outs)
+    stats['FB%_A'] = _ratio(fb_outs, gb_outs + fb_outs)
+    stats['GB/FB_A'] = _ratio(gb_outs, fb_outs)
+
+    stats['Avg Diff'] = totals['Diff Total'] / totals['Diff Count'].where(totals['Diff Count'] > 0)
+    stats['RE24'] = totals['RE24']
+    stats['WPA'] = totals['WPA']
+    stats['AB_A'] = ab_against
+    stats['SF_A'] = totals['SF']
+    stats['SH_A'] = totals['SH']
+    stats['2B_A'] = totals['2B']
+    stats['3B_A'] = totals['3B']
+    stats['GB_outs_A'] = gb_outs
+    stats['FB_outs_A'] = fb_outs
+    stats['SB_A'] = totals['SB']
+    stats['CS_A'] = totals['CS']
+    stats['SB%_A'] = _ratio(totals['SB'], totals['SB'] + totals['CS'])
+
+    # A pitcher's type is read from his first play, as long as any of his plays has one
+    if 'Pitcher Pitching Type' in df.columns:
+        first_plays = df.drop_duplicates(subset=keys, keep='first').set_index(keys)['Pitcher Pitching Type'].reindex(stats.index)
+        has_type = df['Pitcher Pitching Type'].notna().groupby([df[key] for key in keys], sort=True).any()
+        stats['Type'] = first_plays.where(has_type, None)
     else:
-        pa_events_exact = hits_allowed | walks_allowed | strikeouts | single_out_bip | {'BUNT DP'}
-        exact_pa_df = df[df['Exact Result'].isin(pa_events_exact)]
-        old_pa_df = df[df['Old Result'].isin(['DP', 'TP'])]
-        bf_df = pd.concat([exact_pa_df, old_pa_df]).drop_duplicates()
-        num_bf = bf_df.shape[0]
-        re24_events_exact = pa_events_exact | stolen_bases | caught_stealing
-        exact_re24_df = df[df['Exact Result'].isin(re24_events_exact)]
-        re24_df = pd.concat([exact_re24_df, old_pa_df]).drop_duplicates()
-
-    re24 = re24_df['RE24'].sum() if 'RE24' in re24_df.columns else 0
-    wpa = re24_df['Pitcher WPA'].sum() if 'Pitcher WPA' in re24_df.columns else 0
-
-    games_played = df['Session'].nunique()
-    num_hits_allowed = bf_df[bf_df[result_col].isin(hits_allowed)].shape[0]
-    num_walks_allowed = bf_df[bf_df[result_col].isin(walks_allowed)].shape[0]
-    num_auto_bb_allowed = bf_df[bf_df[result_col].isin(['Auto BB', 'AUTO BB'])].shape[0]
-    num_ibb = bf_df[bf_df[result_col].isin(ibb_events)].shape[0]
-    num_strikeouts = bf_df[bf_df[result_col].isin(strikeouts)].shape[0]
-    num_hr_allowed = bf_df[bf_df[result_col].isin(hr_allowed)].shape[0]
-
-    dp_outs = df[df['Old Result'] == 'DP'].shape[0] * 2
-    tp_outs = df[df['Old Result'] == 'TP'].shape[0] * 3
-
-    non_dp_tp_df = df[~df['Old Result'].isin(['DP', 'TP'])]
-    k_outs = non_dp_tp_df[non_dp_tp_df[result_col].isin(strikeouts)].shape[0]
-    other_single_outs = non_dp_tp_df[non_dp_tp_df[result_col].isin(single_out_bip)].shape[0]
-    cs_outs = non_dp_tp_df[non_dp_tp_df[result_col].isin(caught_stealing)].shape[0]
-
-    total_outs = dp_outs + tp_outs + k_outs + other_single_outs + cs_outs
-    ip = total_outs / 3
-
-    runs_allowed = df['Run'].sum()
-    unearned_runs = df['is_unearned'].sum() if 'is_unearned' in df.columns else 0
-    earned_runs = runs_allowed - unearned_runs
-
-    sac_events_df = bf_df[bf_df['Old Result'] == 'Sac']
-    num_sf_allowed = sac_events_df[pd.to_numeric(sac_events_df['RBI'], errors='coerce').fillna(0) > 0].shape[0]
-    num_sh_allowed = len(sac_events_df) - num_sf_allowed
-    
-    ab_against = num_bf - num_walks_allowed - num_sh_allowed - num_sf_allowed
-
-    num_doubles_allowed = bf_df[bf_df[result_col] == '2B'].shape[0]
-    num_triples_allowed = bf_df[bf_df[result_col] == '3B'].shape[0]
-    num_singles_allowed = num_hits_allowed - num_doubles_allowed - num_triples_allowed - num_hr_allowed
-
-    baa = num_hits_allowed / ab_against if ab_against > 0 else pd.NA
-    obpa = (num_hits_allowed + num_walks_allowed) / num_bf if num_bf > 0 else pd.NA
-    slga = (num_singles_allowed + 2*num_doubles_allowed + 3*num_triples_allowed + 4*num_hr_allowed) / ab_against if ab_against > 0 else pd.NA
-    opsa = obpa + slga if pd.notna(obpa) and pd.notna(slga) else pd.NA
-
-    babip_denom = ab_against - num_strikeouts - num_hr_allowed + num_sf_allowed
-    babip_against = (num_hits_allowed - num_hr_allowed) / babip_denom if babip_denom > 0 else pd.NA
-
-    hr_pct_against = num_hr_allowed / num_bf if num_bf > 0 else pd.NA
-    k_pct_against = num_strikeouts / num_bf if num_bf > 0 else pd.NA
-    bb_pct_against = num_walks_allowed / num_bf if num_bf > 0 else pd.NA
+        stats['Type'] = None
+    return stats
 
-    fly_ball_events = {'FO', 'PO'}
-    ground_ball_events = {'LGO', 'RGO', 'BUNT GO'}
-    num_fb_outs_allowed = bf_df[bf_df[result_col].isin(fly_ball_events)].shape[0]
-    num_gidp_allowed = bf_df[(bf_df['Old Result'].isin(['DP', 'TP'])) | (bf_df['Exact Result'] == 'BUNT DP')].shape[0]
-    num_gb_outs_allowed = bf_df[bf_df[result_col].isin(ground_ball_events)].shape[0] + num_gidp_allowed
-    
-    total_fb_gb_allowed = num_fb_outs_allowed + num_gb_outs_allowed
-    gb_pct_against = num_gb_outs_allowed / total_fb_gb_allowed if total_fb_gb_allowed > 0 else pd.NA
-    fb_pct_against = num_fb_outs_allowed / total_fb_gb_allowed if total_fb_gb_allowed > 0 else pd.NA
-    num_rgo_allowed = bf_df[bf_df[result_col] == 'RGO'].shape[0]
-    num_lgo_allowed = bf_df[bf_df[result_col] == 'LGO'].shape[0]
-    num_fo_allowed = bf_df[bf_df[result_col] == 'FO'].shape[0]
-    num_po_allowed = bf_df[bf_df[result_col] == 'PO'].shape[0]
-    num_lo_allowed = bf_df[bf_df[result_col] == 'LO'].shape[0]
-
-    gb_fb_ratio_against = num_gb_outs_allowed / num_fb_outs_allowed if num_fb_outs_allowed > 0 else pd.NA
-
-    h6 = (num_hits_allowed / ip) * 6 if ip > 0 else pd.NA
-    hr6 = (num_hr_allowed / ip) * 6 if ip > 0 else pd.NA
-    bb6 = (num_walks_allowed / ip) * 6 if ip > 0 else pd.NA
-    k6 = (num_strikeouts / ip) * 6 if ip > 0 else pd.NA
-    k_bb = num_strikeouts / num_walks_allowed if num_walks_allowed > 0 else pd.NA
-
-    pitching_type = df['Pitcher Pitching Type'].iloc[0] if 'Pitcher Pitching Type' in df.columns and not df['Pitcher Pitching Type'].dropna().empty else None
-    
-    return pd.Series({
-        'G': games_played, 'IP': ip, 'BF': num_bf, 'H': num_hits_allowed, 'R': runs_allowed, 'ER': earned_runs, 'BB': num_walks_allowed, 'IBB': num_ibb, 'Auto BB': num_auto_bb_allowed, 'K': num_strikeouts, 'HR': num_hr_allowed,
-        '1B': num_singles_allowed, 'RGO': num_rgo_allowed, 'LGO': num_lgo_allowed, 'FO': num_fo_allowed, 'PO': num_po_allowed, 'LO': num_lo_allowed,
-        'ERA': (earned_runs * 6) / ip if ip > 0 else pd.NA,
-        'WHIP': (num_walks_allowed + num_hits_allowed) / ip if ip > 0 else pd.NA,
-        'H/6': h6, 'HR/6': hr6, 'BB/6': bb6, 'K/6': k6, 'K/BB': k_bb,
-        'BAA': baa, 'OBPA': obpa, 'SLGA': slga, 'OPSA': opsa, 'BABIP_A': babip_against,
-        'HR%_A': hr_pct_against, 'K%_A': k_pct_against, 'BB%_A': bb_pct_against,
-        'GB%_A': gb_pct_against, 'FB%_A': fb_pct_against, 'GB/FB_A': gb_fb_ratio_against,
-        'Avg Diff': avg_diff,
-        'RE24': re24,
-        'WPA': wpa,
-        'AB_A': ab_against, 'SF_A': num_sf_allowed, 'SH_A': num_sh_allowed,
-        '2B_A': num_doubles_allowed, '3B_A': num_triples_allowed,
-        'GB_outs_A': num_gb_outs_allowed, 'FB_outs_A': num_fb_outs_allowed,
-        'SB_A': num_sb_allowed, 'CS_A': num_cs_against, 'SB%_A': sb_pct_against,
-        'Type': pitching_type
-    })
+def calculate_season_pitching_stats(season_df, season):
+    """
+    Calculates every pitcher's line for a season: one row per pitcher ('NTM' for traded players) plus one
+    sub-row per team for traded players, in the pitching_stats_S*.csv layout.
+    """
+    if season_df.empty:
+        return pd.DataFrame()
+    events = tag_pitching_events(season_df)
+
+    totals = aggregate_pitching_stats(season_df, events, ['Pitcher ID']).reset_index()
+    teams_by_pitcher = season_df.groupby('Pitcher ID', sort=True)['Pitcher Team'].unique()
+    num_teams = teams_by_pitcher.map(len).reindex(totals['Pitcher ID']).to_numpy()
+    first_team = teams_by_pitcher.map(lambda teams: teams[0]).reindex(totals['Pitcher ID']).to_numpy()
+    last_team = season_df.sort_values('Session').groupby('Pitcher ID', sort=True)['Pitcher Team'].last().reindex(totals['Pitcher ID']).to_numpy()
+    totals['Season'] = season
+    totals['Team'] = np.where(num_teams > 1, pd.Series(num_teams).astype(str).to_numpy() + 'TM', first_team)
+    totals['is_sub_row'] = False
+    totals['Last Team'] = last_team
+    totals['Row Order'] = 0
+
+    # Per-team rows for traded players, in the order they pitched for each team
+    traded_ids = teams_by_pitcher[teams_by_pitcher.map(len) > 1].index
+    traded_df = season_df[season_df['Pitcher ID'].isin(traded_ids)]
+    team_rows = aggregate_pitching_stats(traded_df, events.loc[traded_df.index], ['Pitcher ID', 'Pitcher Team']).reset_index()
+    if not team_rows.empty:
+        team_order = traded_df.drop_duplicates(subset=['Pitcher ID', 'Pitcher Team']).reset_index(drop=True)
+        team_order['Row Order'] = team_order.groupby('Pitcher ID').cumcount() + 1
+        team_rows = team_rows.merge(team_order[['Pitcher ID', 'Pitcher Team', 'Row Order']], on=['Pitcher ID', 'Pitcher Team'], how='left')
+        team_rows = team_rows.rename(columns={'Pitcher Team': 'Team'})
+        team_rows['Season'] = season
+        team_rows['is_sub_row'] = True
+        team_rows['Last Team'] = team_rows['Team']
+
+    stats = pd.concat([totals, team_rows], ignore_index=True).sort_values(['Pitcher ID', 'Row Order'], kind='stable')
+    return stats[PITCHING_STATS_COLUMNS + ['Season', 'Pitcher ID', 'Team', 'is_sub_row', 'Last Team']].reset_index(drop=True)
+
+def calculate_league_pitching_stats(df):
+    """League-wide pitching line for every season in `df`, one row per season (used for the FIP constants)."""
+    return aggregate_pitching_stats(df, tag_pitching_events(df), ['Season']).reset_index()
 
 def calculate_team_hitting_stats(df, league_stats_for_season):
     sum_cols = ['G', 'PA', 'AB', 'H', 'R', '1B', '2B', '3B', 'HR', 'TB', 'RBI', 'BB', 'IBB', 'K', 'Auto K', 'SB', 'CS', 'SH', 'SF', 'GIDP', 'RGO', 'LGO', 'FO', 'PO', 'LO', 'RE24', 'WPA', 'WAR', 'GB_outs', 'FB_outs']
@@ -1241,234 +1303,138 @@ def generate_re_matrix_html(season_num):
 
     }
 
-def _simulate_play_for_tracking(play, current_runners, outs):
-    runs_scored = []
-    runners = {k: v.copy() if v else None for k, v in current_runners.items()} # Deep copy
-    batter = {'id': play['Hitter ID'], 'is_manfred': False}
-    result = play['Exact Result'] if pd.notna(play['Exact Result']) else play['Old Result']
-    advancement_bonus = 1 if outs == 2 and result in ['1B', '2B'] else 0
-
-    # --- SIMULATE PLAY OUTCOME ---
-    if result == 'HR':
-        if runners[3]: runs_scored.append(runners[3])
-        if runners[2]: runs_scored.append(runners[2])
-        if runners[1]: runs_scored.append(runners[1])
-        runs_scored.append(batter)
-        runners = {1: None, 2: None, 3: None}
-    elif result == '3B':
-        if runners[3]: runs_scored.append(runners[3])
-        if runners[2]: runs_scored.append(runners[2])
-        if runners[1]: runs_scored.append(runners[1])
-        runners = {1: None, 2: None, 3: batter}
-    elif result == '2B':
-        if runners[3]: runs_scored.append(runners[3])
-        if runners[2]: runs_scored.append(runners[2])
-        new_runners = {1: None, 2: batter, 3: None}
-        if runners[1]: new_runners[3] = runners[1]
-        runners = new_runners
-    elif result in ['1B', 'BUNT 1B', 'Bunt 1B']:
-        if advancement_bonus > 0 and result == '1B':
-            if runners[3]: runs_scored.append(runners[3])
-            if runners[2]: runs_scored.append(runners[2])
-            if runners[1]: runners[3] = runners[1]
-            runners = {1: batter, 2: None, 3: runners.get(1)}
-        else:
-            if runners[3]: runs_scored.append(runners[3])
-            new_runners = {1: batter, 2: None, 3: None}
-            if runners[2]: new_runners[3] = runners[2]
-            if runners[1]: new_runners[2] = runners[1]
-            runners = new_runners
-    elif result in ['BB', 'IBB', 'Auto BB', 'AUTO BB']:
-        if runners[1] and runners[2] and runners[3]: runs_scored.append(runners[3])
-        new_runners = runners.copy()
-        if runners[1] and runners[2]: new_runners[3] = runners[2]
-        if runners[1]: new_runners[2] = runners[1]
-        new_runners[1] = batter
-        runners = new_runners
-    # Add other out results here...
-
-    return runs_scored, runners
-
-def _get_simulated_runs_for_inning(inning_df):
-    """Simulates an inning play-by-play based on rulebook logic to determine runs scored."""
-    if inning_df.empty:
-        return pd.Series([], dtype=int)
-
-    # Mapping from OBC code to a list representing [1B, 2B, 3B]
-    obc_to_runners = {
-        0: [0, 0, 0], 1: [1, 0, 0], 2: [0, 1, 0], 3: [0, 0, 1],
-        4: [1, 1, 0], 5: [1, 0, 1], 6: [0, 1, 1], 7: [1, 1, 1]
-    }
-
-    sim_runs_on_play = []
-    
-    # Get initial state from the first play
-    initial_obc = inning_df['OBC'].iloc[0]
-    initial_outs = inning_df['Outs'].iloc[0]
-    
-    runners = obc_to_runners.get(initial_obc, [0, 0, 0])
-    outs = initial_outs
-    
-    for _, play in inning_df.iterrows():
-        # The state for this play is the one we've been tracking
-        runs_this_play = 0
-        
-        # Determine which result column to use
-        use_old_results = play['Season'] in ['S2', 'S3']
-        result = play['Old Result'] if use_old_results else play['Exact Result']
-
-        # Two-out hit rule modifier
-        advancement_bonus = 1 if outs == 2 and result in ['1B', '2B', '3B'] else 0
-
-        # --- SIMULATE PLAY OUTCOME ---
-        if result == 'HR':
-            runs_this_play = sum(runners) + 1
-            runners = [0, 0, 0]
-        elif result == '3B':
-            runs_this_play = sum(runners)
-            runners = [0, 0, 1]
-        elif result == '2B':
-            if runners[2]: runs_this_play += 1 # Runner from 3rd scores
-            if runners[1]: runs_this_play += 1 # Runner from 2nd scores
-            runners = [0, 1, 1] if runners[0] else [0, 1, 0]
-        elif result in ['1B', 'BUNT 1B', 'Bunt 1B']:
-            new_runners = [0,0,0]
-            if runners[2]: runs_this_play += 1
-            if runners[1]: new_runners[2] = 1
-            if runners[0]: new_runners[1] = 1
-            new_runners[0] = 1
-            runners = new_runners
-            # Apply 2-out bonus
-            if advancement_bonus > 0:
-                if runners[2]: runs_this_play += 1; runners[2] = 0
-                if runners[1]: runs_this_play += 1; runners[1] = 0
-                if runners[0]: runners[2] = 1; runners[0] = 0
-
-        elif result in ['BB', 'IBB', 'Auto BB', 'AUTO BB']:
-            if runners[0] and runners[1] and runners[2]: runs_this_play += 1
-            if runners[0] and runners[1]: runners[2] = 1
-            if runners[0]: runners[1] = 1
-            runners[0] = 1
-        elif result in ['FO', 'Sac']:
-            outs += 1
-            if outs <= 2 and runners[2]: # Sac Fly
-                runs_this_play += 1
-                runners[2] = 0
-        elif result in ['BUNT Sac', 'Bunt Sac', 'Bunt']:
-            outs += 1
-            if outs <= 2:
-                # Runner on 2nd advances if 3rd is not occupied
-                if runners[1] and not runners[2]:
-                    runners[2] = 1
-                    runners[1] = 0
-                # Runner on 1st advances if 2nd is not occupied
-                if runners[0] and not runners[1]:
-                    runners[1] = 1
-                    runners[0] = 0
-        elif result in ['K', 'Auto K', 'Bunt K', 'AUTO K', 'PO', 'BUNT K']:
-            outs += 1
-        elif result == 'LO':
-            outs += 1
-            num_runners = sum(runners)
-            if outs <= 2 and num_runners > 0:
-                outs += 1 # Double Play
-                # Trailing runner is out
-                if runners[0]: runners[0] = 0
-                elif runners[1]: runners[1] = 0
-                else: runners[2] = 0
-        elif result in ['LGO', 'RGO', 'BUNT GO', 'Bunt GO']:
-            # Check for LGO Triple Play
-            diff = pd.to_numeric(play['Diff'], errors='coerce')
-            if result == 'LGO' and 496 <= diff <= 500 and outs == 0 and runners[0] and runners[1]:
-                outs = 3
-                runs_this_play = 0
-                runners = [0, 0, 0]
-            else:
-                outs += 1
-                is_lgo = result in ['LGO', 'BUNT GO', 'Bunt GO']
-                # Double Play
-                if outs <= 2 and runners[0]:
-                    outs += 1
-                    runners[0] = 0
-                # Runner advancement on non-DP groundouts
-                if outs <= 2:
-                    if runners[2]: runs_this_play += 1; runners[2] = 0
-                    if runners[1] and not (is_lgo and not runners[0]): runners[2] = 1; runners[1] = 0
-        elif result == 'DP':
-            # On a regular GIDP, a run can score from 3rd only if there are 0 outs.
-            if outs == 0 and runners[2]:
-                runs_this_play += 1
-            outs += 2
-            # Runner from 2nd advances to 3rd, other runners are out.
-            if runners[1]:
-                runners = [0, 0, 1]
-            else:
-                runners = [0, 0, 0]
-        elif result == 'TP':
-            outs = 3
-            runs_this_play = 0 # No runs on TP
-            runners = [0,0,0]
-
-        sim_runs_on_play.append(runs_this_play)
+RE_METHODS = ['empirical', 'markov']
 
-        # Stop if inning is over
-        if outs >= 3:
-            # Fill remaining plays in this inning with 0 runs if any
-            sim_runs_on_play.extend([0] * (len(inning_df) - len(sim_runs_on_play)))
-            break
-            
-    return pd.Series(sim_runs_on_play, index=inning_df.index)
+def build_run_expectancy_array(season_df):
+    """
+    Averages the runs scored from each play to the end of its half-inning by the play's base/out
+    state. Returns an 8x3 array indexed by [OBC, Outs], NaN for states that never occur.
+    """
+    if 'Runs Scored' not in season_df.columns:
+        season_df = add_play_states(season_df)
+
+    # Runs to the end of the inning: a reverse cumulative sum of the runs scored per play within each half-inning
+    runs = season_df['Runs Scored'].to_numpy()[::-1]
+    inning_ids = season_df['Inning ID'].to_numpy()[::-1]
+    runs_after = pd.Series(runs).groupby(inning_ids, dropna=False).cumsum().to_numpy()[::-1]
+
+    obcs = season_df['OBC'].to_numpy(dtype=int, na_value=0)
+    outs = season_df['Outs'].to_numpy(dtype=int, na_value=0)
+    valid = (obcs >= 0) & (obcs <= 7) & (outs >= 0) & (outs <= 2)
+    states = obcs[valid] * 3 + outs[valid]
+    totals = np.bincount(states, weights=runs_after[valid], minlength=24)
+    counts = np.bincount(states, minlength=24)
+    with np.errstate(invalid='ignore'):
+        return (totals / counts).reshape(8, 3)
+
+def solve_run_expectancy_array(season_df):
+    """
+    Estimates run expectancy by treating a half-inning as an absorbing Markov chain over the 24
+    base/out states. The transition probabilities P and the mean runs per play r are counted from
+    the plays, and RE = (I - P)^-1 r is solved with numpy.linalg.solve. Returns the same 8x3 array as
+    build_run_expectancy_array. This needs far fewer plays than averaging whole innings, which
+    matters early in a season.
+    """
+    if 'Runs Scored' not in season_df.columns:
+        season_df = add_play_states(season_df)
+
+    obcs = season_df['OBC'].to_numpy(dtype=int, na_value=0)
+    outs = season_df['Outs'].to_numpy(dtype=int, na_value=0)
+    valid = (obcs >= 0) & (obcs <= 7) & (outs >= 0) & (outs <= 2)
+    states = (obcs * 3 + outs)[valid]
+
+    # State 24 is the end of the half-inning
+    outs_after = season_df['Outs After'].to_numpy(dtype=int)
+    ends_inning = (outs_after >= 3) | season_df['Last Play of Inning'].to_numpy(dtype=bool)
+    next_states = np.where(ends_inning, 24, season_df['OBC After'].to_numpy(dtype=int) * 3 + np.minimum(outs_after, 2))[valid]
+
+    transitions = np.bincount(states * 25 + next_states, minlength=24 * 25).reshape(24, 25)
+    plays_from_state = transitions.sum(axis=1)
+    runs_from_state = np.bincount(states, weights=season_df['Runs Scored'].to_numpy()[valid], minlength=24)
+    seen = plays_from_state > 0
+    divisor = np.where(seen, plays_from_state, 1)
+
+    transition_matrix = transitions[:, :24] / divisor[:, None]
+    run_expectancy = np.linalg.solve(np.eye(24) - transition_matrix, runs_from_state / divisor)
+    run_expectancy[~seen] = np.nan
+    return run_expectancy.reshape(8, 3)
+
+# The columns a season's run expectancy matrix is built from (see build_run_expectancy_array and solve_run_expectancy_array).
+RE_MATRIX_COLUMNS = ['Inning ID', 'OBC', 'Outs', 'OBC After', 'Outs After', 'Runs Scored', 'Last Play of Inning']
+
+def get_run_expectancy_matrix(season, season_df, stage_cache=None, method='empirical'):
+    """
+    Calculates or loads a run expectancy matrix for a given season using a simulation engine.
+    `method` is 'empirical' (average runs to the end of the inning) or 'markov' (see solve_run_expectancy_array).
 
-def get_run_expectancy_matrix(season, season_df, is_most_recent_season=False):
-    """Calculates or loads a run expectancy matrix for a given season using a simulation engine."""
+    The cached matrix is reused while the season's plays, the method and this module's source are unchanged.
+    """
     script_dir = os.path.dirname(os.path.abspath(__file__))
     data_dir = os.path.join(script_dir, '..', 'data', 'cache')
     cache_path = os.path.join(data_dir, f're_matrix_{season}.csv')
 
-    # Do not use cache for the most recent season, as it may be in progress.
-    if os.path.exists(cache_path) and not is_most_recent_season:
-        re_df = pd.read_csv(cache_path)
-        re_matrix = {}
-        for _, row in re_df.iterrows():
-            re_matrix[(int(row['OBC']), int(row['Outs']))] = row['RunExpectancy']
-        return re_matrix
-
-    # Ensure key columns are numeric
-    for col in ['OBC', 'Outs', 'Run']:
-        season_df[col] = pd.to_numeric(season_df[col], errors='coerce').fillna(0).astype(int)
-
-    # Get simulated runs for all innings
-    simulated_runs = season_df.groupby('Inning ID').apply(_get_simulated_runs_for_inning, include_groups=False)
-    season_df['SimulatedRuns'] = simulated_runs.reset_index(level=0, drop=True)
-
-    all_plays = []
-    for _, inning_df in season_df.groupby('Inning ID'):
-        total_inning_runs = inning_df['SimulatedRuns'].sum()
-        runs_scored_previously = inning_df['SimulatedRuns'].cumsum().shift(1).fillna(0)
-        runs_after = total_inning_runs - runs_scored_previously
-
-        temp_df = inning_df[['OBC', 'Outs']].copy()
-        temp_df['RunsAfter'] = runs_after
-        all_plays.append(temp_df)
-
-    if not all_plays:
+    key = get_key(get_source_digest('generate_web_data.py'), method, get_frame_digest(season_df, RE_MATRIX_COLUMNS))
+    if stage_cache is not None and stage_cache.is_fresh(f're_matrix/{season}', key, [cache_path]):
+        # Read the floats back exactly, so RE24 is the same whether the matrix was cached or not
+        re_df = pd.read_csv(cache_path, float_precision='round_trip')
+        return {(int(obc), int(outs)): run_expectancy for obc, outs, run_expectancy in zip(re_df['OBC'], re_df['Outs'], re_df['RunExpectancy'])}
+
+    re_array = None
+    if method == 'markov':
+        try:
+            re_array = solve_run_expectancy_array(season_df)
+        except np.linalg.LinAlgError:
+            print(f"  Could not solve the Markov run expectancy for {season}; using the inning averages instead.")
+    if re_array is None:
+        re_array = build_run_expectancy_array(season_df)
+    re_matrix = {(obc, outs): re_array[obc, outs] for obc in range(8) for outs in range(3) if not np.isnan(re_array[obc, outs])}
+    if not re_matrix:
         return {}
 
-    all_plays_df = pd.concat(all_plays)
-    re_matrix_df = all_plays_df.groupby(['OBC', 'Outs'])['RunsAfter'].mean().reset_index()
-    re_matrix_df.rename(columns={'RunsAfter': 'RunExpectancy'}, inplace=True)
-
     if not os.path.exists(data_dir):
         os.makedirs(data_dir)
+    re_matrix_df = pd.DataFrame([(obc, outs, run_expectancy) for (obc, outs), run_expectancy in re_matrix.items()], columns=['OBC', 'Outs', 'RunExpectancy'])
     re_matrix_df.to_csv(cache_path, index=False)
+    if stage_cache is not None:
+        stage_cache.record(f're_matrix/{season}', key)
 
-    re_matrix = {}
-    for _, row in re_matrix_df.iterrows():
-        re_matrix[(row['OBC'], row['Outs'])] = row['RunExpectancy']
-        
     return re_matrix
 
 
+def get_re_matrix_array(re_matrix):
+    """Returns a run expectancy matrix as an 8x4 array indexed by [OBC, Outs]; the 3-out column is 0."""
+    re_array = np.zeros((8, 4))
+    for (obc, outs), run_expectancy in re_matrix.items():
+        if 0 <= obc <= 7 and 0 <= outs <= 2:
+            re_array[int(obc), int(outs)] = run_expectancy
+    return re_array
+
+def calculate_re24(df, run_expectancy_by_season):
+    """
+    Calculates RE24 for every play from the play-state columns (see game_processing.add_play_states):
+    the run expectancy after the play, minus the one before it, plus the runs it scored. The run
+    expectancy after the last play of a half-inning is 0. Plays of seasons without a matrix get 0.
+    """
+    seasons = sorted(run_expectancy_by_season, key=lambda s: int(s.replace('S', '')))
+    re_arrays = np.stack([get_re_matrix_array(run_expectancy_by_season[season]) for season in seasons] + [np.zeros((8, 4))])
+    has_matrix = np.array([bool(run_expectancy_by_season[season]) for season in seasons] + [False])
+    # Seasons without a matrix point at the trailing all-zero one
+    season_index = pd.Index(seasons).get_indexer(df['Season'])
+    season_index = np.where(season_index < 0, len(seasons), season_index)
+
+    obcs = df['OBC'].to_numpy(dtype=int, na_value=0)
+    outs = df['Outs'].to_numpy(dtype=int, na_value=0)
+    valid_before = (obcs >= 0) & (obcs <= 7) & (outs >= 0)
+    re_before = np.where(valid_before, re_arrays[season_index, np.clip(obcs, 0, 7), np.clip(outs, 0, 3)], 0)
+
+    obc_after = df['OBC After'].to_numpy(dtype=int)
+    outs_after = np.clip(df['Outs After'].to_numpy(dtype=int), 0, 3)
+    re_after = np.where(df['Last Play of Inning'].to_numpy(dtype=bool), 0, re_arrays[season_index, obc_after, outs_after])
+
+    re24 = re_after - re_before + df['Runs Scored'].to_numpy()
+    return pd.Series(np.where(has_matrix[season_index], re24, 0), index=df.index)
+
+
 def _simulate_neutral_inning(inning_df, re_matrix):
     """Simulates a single inning based on 'Result at Neutral' to find neutral runs and outs,
     correctly attributing runs to pitchers and not charging for inherited runners."""
@@ -1486,18 +1452,19 @@ def _simulate_neutral_inning(inning_df, re_matrix):
         if runners_dict.get(3) and (not inherited_only or runners_dict[3] == 'i'): obc |= 4
         return obc
 
-    initial_obc = inning_df['OBC'].iloc[0]
+    initial_obc = int(inning_df['OBC'].iloc[0])
     runners = obc_to_runners_map.get(initial_obc, {1: None, 2: None, 3: None}).copy()
-    outs = inning_df['Outs'].iloc[0]
+    initial_outs = int(inning_df['Outs'].iloc[0])
+    outs = initial_outs
     total_n_runs = 0
 
-    for _, play in inning_df.iterrows():
+    for neutral_result, old_result in zip(inning_df['Result at Neutral'], inning_df['Old Result']):
         if outs >= 3:
             break
 
-        result = play['Result at Neutral']
+        result = neutral_result
         if pd.isna(result):
-            result = play['Old Result']
+            result = old_result
         
         batter = 'p'
 
@@ -1579,16 +1546,34 @@ def _simulate_neutral_inning(inning_df, re_matrix):
         if re_pitcher_responsibility > 0:
             total_n_runs += re_pitcher_responsibility
 
-    return pd.Series({'nRuns': total_n_runs, 'nOuts': outs if outs <= 3 else 3})
+    # Only the outs recorded in this stretch of the inning, so segments of the same inning add up
+    return pd.Series({'nRuns': total_n_runs, 'nOuts': (outs if outs <= 3 else 3) - initial_outs})
 
-def calculate_neutral_pitching_stats(df, re_matrix):
-    """Calculates total neutral runs and outs for a pitcher's season."""
-    if df.empty or not re_matrix:
-        return pd.Series({'nRuns': 0, 'nOuts': 0})
-    
-    # This will be slow, but it's the only way to do it row-by-row
-    inning_stats = df.groupby('Inning ID').apply(lambda x: _simulate_neutral_inning(x, re_matrix), include_groups=False)
-    return inning_stats.sum()
+NEUTRAL_SEGMENT_KEYS = ['Season', 'Inning ID', 'Pitcher ID', 'Pitcher Team']
+
+def calculate_neutral_inning_segments(df, run_expectancy_by_season):
+    """
+    Replays each pitcher's stretch of every half-inning once with neutral results. Returns nRuns and
+    nOuts per (Season, Inning ID, Pitcher ID, Pitcher Team); pitcher, team and league neutral stats
+    are sums over this table. Seasons without a run expectancy matrix are left out.
+    """
+    segments = []
+    for season, season_df in df.groupby('Season'):
+        re_matrix = run_expectancy_by_season.get(season, {})
+        if not re_matrix or season_df.empty:
+            continue
+        season_segments = season_df.groupby(NEUTRAL_SEGMENT_KEYS, dropna=False, sort=False).apply(
+            lambda x: _simulate_neutral_inning(x, re_matrix), include_groups=False
+        )
+        segments.append(season_segments.reset_index())
+    if not segments:
+        return pd.DataFrame(columns=NEUTRAL_SEGMENT_KEYS + ['nRuns', 'nOuts'])
+    return pd.concat(segments, ignore_index=True)
+
+def get_neutral_era(neutral_stats):
+    """Neutral ERA (per 6 innings) from summed nRuns/nOuts."""
+    n_ip = neutral_stats['nOuts'] / 3
+    return (neutral_stats['nRuns'] * 6) / n_ip if n_ip > 0 else 0
 
 def _get_pitch_histogram_data(pitch_series, bin_size):
     pitch_series = pitch_series.dropna().astype(int)
@@ -1609,10 +1594,14 @@ def _get_pitch_histogram_data(pitch_series, bin_size):
         output.append({'label': label, 'count': int(count)})
     return output
 
+# The columns a scouting report reads, besides 'Pitcher ID' (see get_scouting_report_data).
+SCOUTING_REPORT_COLUMNS = ['Pitch', 'Swing', 'Diff', 'Season', 'Session', 'Game ID', 'Inning', 'OBC', 'Batter Team', 'Pitcher Team']
+
 def get_scouting_report_data(player_id, pitcher_df, bin_size=100):
     if pitcher_df.empty: return None
     pitcher_df = pitcher_df.copy()
-    pitcher_df['Pitch'] = pd.to_numeric(pitcher_df['Pitch'], errors='coerce')
+    # Missing pitches compare unequal to everything below, so work on float copies with NaN
+    pitcher_df['Pitch'] = pitcher_df['Pitch'].astype('float64')
     pitcher_df['Season_num'] = pitcher_df['Season'].str.replace('S', '').astype(int)
     pitcher_df.sort_values(by=['Season_num', 'Session', 'Inning'], inplace=True)
     
@@ -1625,8 +1614,8 @@ def get_scouting_report_data(player_id, pitcher_df, bin_size=100):
     total_opportunities = len(pitches) - 1
     repeat_percentage = (repeat_count / total_opportunities) * 100 if total_opportunities > 0 else 0
     has_tripled_up = ((pitches[:-2] == pitches[1:-1]) & (pitches[1:-1] == pitches[2:])).any() if len(pitches) > 2 else False
-    swing = pd.to_numeric(pitcher_df['Swing'], errors='coerce')
-    diff = pd.to_numeric(pitcher_df['Diff'], errors='coerce')
+    swing = pitcher_df['Swing'].astype('float64')
+    diff = pitcher_df['Diff'].astype('float64')
     swing_match_rate = (pitcher_df['Pitch'] == swing.shift(1)).mean() * 100
     diff_match_rate = (pitcher_df['Pitch'] == diff.shift(1)).mean() * 100
     meme_numbers = {69, 420, 666, 327, 880}
@@ -1637,7 +1626,7 @@ def get_scouting_report_data(player_id, pitcher_df, bin_size=100):
         "overall": _get_pitch_histogram_data(pitcher_df['Pitch'], bin_size),
         "first_of_game": _get_pitch_histogram_data(pitcher_df.groupby(['Season', 'Game ID']).first()['Pitch'], bin_size),
         "first_of_inning": _get_pitch_histogram_data(pitcher_df.groupby(['Season', 'Game ID', 'Inning']).first()['Pitch'], bin_size),
-        "risp": _get_pitch_histogram_data(pitcher_df[pd.to_numeric(pitcher_df['OBC'], errors='coerce').fillna(0) > 1]['Pitch'], bin_size)
+        "risp": _get_pitch_histogram_data(pitcher_df[pitcher_df['OBC'].fillna(0) > 1]['Pitch'], bin_size)
     }
 
     # Conditional Histograms
@@ -1701,86 +1690,192 @@ def get_scouting_report_data(player_id, pitcher_df, bin_size=100):
         "recent_game_info": recent_game_info
     }
 
-def calculate_games_started(df):
-    achievements = []
-    game_groups = list(df.groupby(['Season', 'Game ID']))
-    num_games = len(game_groups)
-    print(f"Calculating games started for {num_games} games...")
+# --- Per-Game Results Cache ---
+# The modules each per-game stage is computed by. Cached games are reprocessed whenever one of them changes.
+GAME_STAGE_SOURCES = {
+    'decisions': ['game_processing.py'],
+    'games_started': ['generate_web_data.py'],
+    'achievements': ['generate_web_data.py'],
+}
+# Columns that can change without any of a game's plays changing: the row position left behind by the
+# corrections groupby, and RE24, which moves with the season's RE matrix. No per-game stage reads them.
+GAME_DIGEST_EXCLUDED_COLUMNS = ['level_2', 'RE24']
+
+def _game_results_cache_path(cache_dir, stage, season):
+    return os.path.join(cache_dir, 'game_results', f'{stage}_{season}.json')
+
+def _load_game_results(cache_dir, stage, season, source):
+    path = _game_results_cache_path(cache_dir, stage, season)
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r') as f:
+            data = json.load(f)
+    except (json.JSONDecodeError, IOError):
+        return {}
+    if data.get('source') != source:
+        return {}
+    return data.get('games', {})
 
-    for i, ((season, game_id), game_df) in enumerate(game_groups):
-        if (i + 1) % 100 == 0:
-            print(f"  ... processed {i + 1} / {num_games} games for GS")
+def _save_game_results(cache_dir, stage, season, games, source):
+    path = _game_results_cache_path(cache_dir, stage, season)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    try:
+        with open(path, 'w') as f:
+            # NumPy scalars (IDs, scores) are written as plain numbers.
+            json.dump({'source': source, 'games': games}, f, default=lambda o: o.item())
+    except IOError:
+        print(f"Warning: Could not write game results cache {path}.")
 
-        teams_in_game = game_df['Batter Team'].unique()
-        if len(teams_in_game) != 2:
-            continue
-        
-        team_A, team_B = teams_in_game[0], teams_in_game[1]
+def get_game_digests(df):
+    """
+    Returns {(Season, Session, Game ID): digest} over every row of each game.
 
-        pitchers_A = game_df[game_df['Pitcher Team'] == team_A]['Pitcher ID'].unique().tolist()
-        pitchers_B = game_df[game_df['Pitcher Team'] == team_B]['Pitcher ID'].unique().tolist()
+    A game's digest only changes when one of its plays is added, removed or edited, which is what
+    tells a new or corrected game apart from one that was already processed on a previous run.
+    """
+    return get_group_digests(df, ['Season', 'Session', 'Game ID'], [col for col in df.columns if col not in GAME_DIGEST_EXCLUDED_COLUMNS])
 
-        if pitchers_A:
-            starter_id_A = game_df[game_df['Pitcher Team'] == team_A]['Pitcher ID'].iloc[0]
-            achievements.append({'Season': season, 'Pitcher ID': starter_id_A, 'Stat': 'GS', 'Team': team_A})
+def process_games_incrementally(df, stage, process_game, cache_dir=None, full_rebuild=False, batched=False, workers=1, columns=None):
+    """
+    Runs `process_game(game_df, season)` for every game in df, keyed on (Season, Session, Game ID).
 
-        if pitchers_B:
-            starter_id_B = game_df[game_df['Pitcher Team'] == team_B]['Pitcher ID'].iloc[0]
-            achievements.append({'Season': season, 'Pitcher ID': starter_id_B, 'Stat': 'GS', 'Team': team_B})
-    
-    if not achievements: return pd.DataFrame(columns=['Season', 'Pitcher ID', 'Team', 'GS'])
+    Results are cached per season under data/cache/game_results. Games whose plays are unchanged since
+    the last run reuse their cached result, so a mid-season run only processes the newly completed
+    (or corrected) games; a change to the stage's code (GAME_STAGE_SOURCES) reprocesses every game.
+    Pass full_rebuild=True to ignore the cache. With batched=True, process_game is
+    instead called once as `process_game(games_df)` on the plays of every game to process, and returns
+    {(Season, Session, Game ID): result}.
 
-    achievements_df = pd.DataFrame(achievements)
-    agg_df = achievements_df.groupby(['Season', 'Pitcher ID', 'Team', 'Stat']).size().unstack(fill_value=0).reset_index()
+    Otherwise, with workers > 1 the games are split into chunks that run in worker processes; each chunk
+    is sent as arrays of only the given columns (default: all of them), so process_game must be a
+    module-level function that only reads those.
 
-    if 'GS' not in agg_df.columns:
-        agg_df['GS'] = 0
-
-    return agg_df[['Season', 'Pitcher ID', 'Team', 'GS']]
+    Returns a dict mapping (Season, Session, Game ID) to the result, in game order.
+    """
+    digests = get_game_digests(df)
+    source = get_source_digest(*GAME_STAGE_SOURCES[stage])
+    cached_by_season = {}
+    if cache_dir and not full_rebuild:
+        for season in {key[0] for key in digests}:
+            cached_by_season[season] = _load_game_results(cache_dir, stage, season, source)
+
+    results = {}
+    to_process = []
+    for key, digest in digests.items():
+        season, session, game_id = key
+        entry = cached_by_season.get(season, {}).get(f'{session}|{game_id}')
+        if entry and entry.get('digest') == digest:
+            results[key] = entry['result']
+        else:
+            results[key] = None
+            to_process.append(key)
+
+    num_games = len(to_process)
+    print(f"  Reusing {len(digests) - num_games} unchanged games, processing {num_games} new or changed games for {stage}...")
+    game_groups = df.groupby(['Season', 'Session', 'Game ID'])
+    if batched:
+        if to_process:
+            games_df = df.iloc[np.sort(np.concatenate([game_groups.indices[key] for key in to_process]))]
+            results.update(process_game(games_df))
+    elif workers > 1 and num_games > 1:
+        # A few chunks per worker keeps the workers busy when some chunks finish early.
+        chunks = [chunk.tolist() for chunk in np.array_split(np.arange(num_games), min(num_games, workers * 4))]
+        print(f"  Processing in {len(chunks)} chunks on {workers} workers...")
+        tasks = []
+        for chunk in chunks:
+            chunk_keys = [to_process[i] for i in chunk]
+            positions = [game_groups.indices[key] for key in chunk_keys]
+            chunk_columns = get_partition_columns(df, np.concatenate(positions), columns or list(df.columns))
+            tasks.append((process_game, chunk_keys, [len(p) for p in positions], chunk_columns))
+        for (_, chunk_keys, _, _), chunk_results in zip(tasks, run_partitions(_process_game_chunk, tasks, workers)):
+            results.update(zip(chunk_keys, chunk_results))
+    else:
+        for i, key in enumerate(to_process):
+            if (i + 1) % 100 == 0:
+                print(f"  ... processed {i + 1} / {num_games} games for {stage}")
+            results[key] = process_game(game_groups.get_group(key), key[0])
+
+    if cache_dir:
+        games_by_season = defaultdict(dict)
+        for (season, session, game_id), result in results.items():
+            games_by_season[season][f'{session}|{game_id}'] = {'digest': digests[(season, session, game_id)], 'result': result}
+        for season, games in games_by_season.items():
+            _save_game_results(cache_dir, stage, season, games, source)
+    return results
+
+def _process_game_chunk(process_game, keys, game_lengths, columns):
+    """Runs process_game on each game of a chunk sent to a worker by process_games_incrementally."""
+    chunk_df = pd.DataFrame(columns)
+    bounds = np.cumsum([0] + game_lengths)
+    return [process_game(chunk_df.iloc[start:end], key[0]) for key, start, end in zip(keys, bounds[:-1], bounds[1:])]
+
+def _get_games_started(game_df, season):
+    """The first pitcher used by each team is credited with a GS."""
+    teams_in_game = game_df['Batter Team'].unique()
+    if len(teams_in_game) != 2:
+        return []
+
+    starts = []
+    for team in teams_in_game:
+        team_pitchers = game_df[game_df['Pitcher Team'] == team]['Pitcher ID']
+        if not team_pitchers.empty:
+            starts.append({'Pitcher ID': team_pitchers.iloc[0], 'Stat': 'GS', 'Team': team})
+    return starts
+
+def _get_game_achievements(game_df, season):
+    """The last pitcher used by each team gets a GF; a team's only pitcher gets a CG (and SHO if unscored on)."""
+    teams_in_game = game_df['Batter Team'].unique()
+    if len(teams_in_game) != 2:
+        return []
+
+    team_A, team_B = teams_in_game[0], teams_in_game[1]
+    runs_allowed = {
+        team_A: game_df[game_df['Batter Team'] == team_B]['Run'].sum(),
+        team_B: game_df[game_df['Batter Team'] == team_A]['Run'].sum(),
+    }
 
-def calculate_game_achievements(df):
     achievements = []
-    game_groups = list(df.groupby(['Season', 'Game ID']))
-    num_games = len(game_groups)
-    print(f"Calculating achievements for {num_games} games...")
-
-    for i, ((season, game_id), game_df) in enumerate(game_groups):
-        if (i + 1) % 100 == 0:
-            print(f"  ... processed {i + 1} / {num_games} games for achievements")
-        
-        teams_in_game = game_df['Batter Team'].unique()
-        if len(teams_in_game) != 2:
+    for team in [team_A, team_B]:
+        team_pitcher_ids = game_df[game_df['Pitcher Team'] == team]['Pitcher ID']
+        pitchers = team_pitcher_ids.unique().tolist()
+        if not pitchers:
             continue
 
-        team_A, team_B = teams_in_game[0], teams_in_game[1]
-
-        runs_A = game_df[game_df['Batter Team'] == team_A]['Run'].sum()
-        runs_B = game_df[game_df['Batter Team'] == team_B]['Run'].sum()
+        achievements.append({'Pitcher ID': team_pitcher_ids.iloc[-1], 'Stat': 'GF', 'Team': team})
+        if len(pitchers) == 1:
+            achievements.append({'Pitcher ID': pitchers[0], 'Stat': 'CG', 'Team': team})
+            if runs_allowed[team] == 0:
+                achievements.append({'Pitcher ID': pitchers[0], 'Stat': 'SHO', 'Team': team})
+    return achievements
 
-        pitchers_A = game_df[game_df['Pitcher Team'] == team_A]['Pitcher ID'].unique().tolist()
-        pitchers_B = game_df[game_df['Pitcher Team'] == team_B]['Pitcher ID'].unique().tolist()
+def calculate_games_started(df, cache_dir=None, full_rebuild=False, workers=1):
+    num_games = df.groupby(['Season', 'Game ID']).ngroups
+    print(f"Calculating games started for {num_games} games...")
+    game_results = process_games_incrementally(
+        df, 'games_started', _get_games_started, cache_dir, full_rebuild,
+        workers=workers, columns=['Batter Team', 'Pitcher Team', 'Pitcher ID']
+    )
+    achievements = [dict(start, Season=season) for (season, _, _), starts in game_results.items() for start in starts]
 
-        if pitchers_A:
-            finisher_id_A = game_df[game_df['Pitcher Team'] == team_A]['Pitcher ID'].iloc[-1]
-            achievements.append({'Season': season, 'Pitcher ID': finisher_id_A, 'Stat': 'GF', 'Team': team_A})
+    if not achievements: return pd.DataFrame(columns=['Season', 'Pitcher ID', 'Team', 'GS'])
 
-            if len(pitchers_A) == 1:
-                pitcher_id = pitchers_A[0]
-                achievements.append({'Season': season, 'Pitcher ID': pitcher_id, 'Stat': 'CG', 'Team': team_A})
-                
-                if runs_B == 0:
-                    achievements.append({'Season': season, 'Pitcher ID': pitcher_id, 'Stat': 'SHO', 'Team': team_A})
+    achievements_df = pd.DataFrame(achievements)
+    agg_df = achievements_df.groupby(['Season', 'Pitcher ID', 'Team', 'Stat']).size().unstack(fill_value=0).reset_index()
 
-        if pitchers_B:
-            finisher_id_B = game_df[game_df['Pitcher Team'] == team_B]['Pitcher ID'].iloc[-1]
-            achievements.append({'Season': season, 'Pitcher ID': finisher_id_B, 'Stat': 'GF', 'Team': team_B})
+    if 'GS' not in agg_df.columns:
+        agg_df['GS'] = 0
 
-            if len(pitchers_B) == 1:
-                pitcher_id = pitchers_B[0]
-                achievements.append({'Season': season, 'Pitcher ID': pitcher_id, 'Stat': 'CG', 'Team': team_B})
+    return agg_df[['Season', 'Pitcher ID', 'Team', 'GS']]
 
-                if runs_A == 0:
-                    achievements.append({'Season': season, 'Pitcher ID': pitcher_id, 'Stat': 'SHO', 'Team': team_B})
+def calculate_game_achievements(df, cache_dir=None, full_rebuild=False, workers=1):
+    num_games = df.groupby(['Season', 'Game ID']).ngroups
+    print(f"Calculating achievements for {num_games} games...")
+    game_results = process_games_incrementally(
+        df, 'achievements', _get_game_achievements, cache_dir, full_rebuild,
+        workers=workers, columns=['Batter Team', 'Pitcher Team', 'Pitcher ID', 'Run']
+    )
+    achievements = [dict(achievement, Season=season) for (season, _, _), game_achievements in game_results.items() for achievement in game_achievements]
 
     if not achievements: return pd.DataFrame(columns=['Season', 'Pitcher ID', 'Team', 'GF', 'CG', 'SHO'])
 
@@ -1795,117 +1890,251 @@ def calculate_game_achievements(df):
     return agg_df[['Season', 'Pitcher ID', 'Team', 'GF', 'CG', 'SHO']]
 
 
-def preprocess_gamelogs_for_stat_corrections(df, player_id_to_name_map):
+STEAL_EVENTS = {'STEAL 2B', 'STEAL 3B', 'Steal 2B', 'Steal 3B', 'MSTEAL 3B', 'MSteal 3B', 'CS 2B', 'CS 3B', 'CS Home', 'CMS 3B', 'CMS Home'}
+MULTI_STEAL_EVENTS = {'MSTEAL 3B', 'MSteal 3B', 'CMS 3B', 'CMS Home'}
+# The columns the pinch runner and multi-steal corrections read
+STAT_CORRECTION_COLUMNS = ['Game ID', 'Inning', 'PA of Inning', 'Hitter ID', 'Exact Result', 'Old Result', 'Run', 'Runners Before']
+
+def _correct_season_stat_attribution(columns):
+    """
+    Finds the pinch runner and multi-steal corrections for one season's plays, game by game.
+
+    Takes the season's STAT_CORRECTION_COLUMNS as arrays, in gamelog order. Returns the corrected
+    'Run' and 'Hitter ID' values as {row: value}, and the SB credit rows to add as
+    (row of the multi-steal, runner ID, 'Exact Result') tuples, rows being positions in the arrays.
+    """
+    season_df = pd.DataFrame(columns)
+    # Plays read their own hitter as it was before any corrections; the lookups below read the corrected IDs.
+    original_hitter_ids = season_df['Hitter ID'].astype(object).where(season_df['Hitter ID'].notna(), None).tolist()
+    hitter_ids = list(original_hitter_ids)
+    runs = season_df['Run'].astype(object).tolist()
+    on_base_events = {'1B', '2B', '3B', 'HR', 'BB', 'IBB', 'BUNT 1B', 'Bunt 1B'}
+    is_on_base = (season_df['Old Result'].isin(on_base_events) | season_df['Exact Result'].isin(on_base_events)).tolist()
+    exact_results = season_df['Exact Result'].astype(object).tolist()
+    runners_before = season_df['Runners Before'].tolist()
+
+    run_changes = {}
+    hitter_id_changes = {}
+    credit_rows = []
+    game_ids = season_df['Game ID'].tolist()
+    rows_by_game = season_df.groupby('Game ID').indices
+    # Game by game, and each game's plays by inning and PA
+    play_order = season_df[season_df['Game ID'].notna()].sort_values(by=['Game ID', 'Inning', 'PA of Inning']).index
+    current_game = None
+    for index in play_order:
+        if game_ids[index] != current_game:
+            current_game = game_ids[index]
+            game_rows = rows_by_game[current_game].tolist()
+            pinch_runners = {} # original runner ID -> pinch runner ID
+
+        # Runners on base before the play (base -> player_id), as tracked by the play-by-play simulation
+        runners = {base + 1: pinch_runners.get(runner_id, runner_id) for base, runner_id in enumerate(runners_before[index])}
+
+        player_id = original_hitter_ids[index]
+        result = exact_results[index]
+
+        is_steal_event = result in STEAL_EVENTS
+        is_batter_on_base = player_id in runners.values()
+
+        if is_steal_event and not is_batter_on_base:
+            # This player is a pinch runner. Find who they replaced.
+            original_runner_id = None
+            if result in ['STEAL 2B', 'CS 2B']:
+                original_runner_id = runners[1]
+                if original_runner_id: runners[1] = player_id
+            elif result in ['STEAL 3B', 'CS 3B', 'MSTEAL 3B', 'MSteal 3B', 'CMS 3B']:
+                original_runner_id = runners[2]
+                if original_runner_id: runners[2] = player_id
+            elif result in ['CS Home', 'CMS Home']:
+                original_runner_id = runners[3]
+                if original_runner_id: runners[3] = player_id
+
+            if original_runner_id:
+                # If the original runner was credited with a run, move it to the pinch runner.
+                original_runner_pa_rows = [row for row in game_rows if row < index and hitter_ids[row] == original_runner_id and is_on_base[row]]
+                if original_runner_pa_rows:
+                    original_pa_row_index = original_runner_pa_rows[-1]
+                    if runs[original_pa_row_index] == 1:
+                        runs[original_pa_row_index] = run_changes[original_pa_row_index] = 0
+                        runs[index] = run_changes[index] = 1
+
+                # Later plays still list the original runner on base; read them as the pinch runner
+                pinch_runners[original_runner_id] = player_id
+
+                # Find all future plays for the original runner and re-assign them
+                for row in game_rows:
+                    if row > index and hitter_ids[row] == original_runner_id:
+                        hitter_ids[row] = hitter_id_changes[row] = player_id
+
+        # --- Multi-Steal SB Attribution ---
+        if result in MULTI_STEAL_EVENTS:
+            for base, runner_id in runners.items():
+                if runner_id and runner_id != player_id:
+                    # This is a successful trailing runner. Award SB.
+                    # Determine the type of steal based on the base they are advancing to
+                    credit_rows.append((index, runner_id, f'STEAL {base + 1}B' if base < 3 else 'STEAL Home'))
+
+    return run_changes, hitter_id_changes, credit_rows
+
+def preprocess_gamelogs_for_stat_corrections(df, player_id_to_name_map, workers=1):
     """
     Processes a DataFrame of all gamelogs to correct stat attribution for pinch runners
     and multi-steal events. This is a major pre-processing step.
+
+    Seasons are independent, so each one is corrected in its own worker process.
     """
+    season_positions = sorted(df.groupby('Season').indices.items())
+    tasks = [(get_partition_columns(df, positions, STAT_CORRECTION_COLUMNS),) for _, positions in season_positions]
+    season_corrections = run_partitions(_correct_season_stat_attribution, tasks, workers)
+
+    credit_rows = []
+    for (_, positions), (run_changes, hitter_id_changes, season_credit_rows) in zip(season_positions, season_corrections):
+        # Credit rows copy the multi-steal play as it was before any corrections
+        for row, runner_id, result in season_credit_rows:
+            new_row = df.iloc[positions[row]].copy()
+            new_row['Hitter ID'] = runner_id
+            new_row['Hitter'] = player_id_to_name_map.get(runner_id, 'Unknown Player')
+            new_row['Exact Result'] = result
+            # The credit row doesn't change the base/out state, so it carries no runs or RE24
+            new_row['OBC After'], new_row['Outs After'] = new_row['OBC'], new_row['Outs']
+            new_row['Runs Scored'], new_row['Scoring Runners'], new_row['Scoring Pitchers'] = 0, (), ()
+            new_row['Last Play of Inning'] = False
+            credit_rows.append(new_row)
+        for col, changes in [('Run', run_changes), ('Hitter ID', hitter_id_changes)]:
+            if changes:
+                df.loc[df.index[positions[list(changes)]], col] = list(changes.values())
+
+    if credit_rows:
+        # The credit rows are plain object rows; narrow the columns back to the gamelog schema.
+        return apply_gamelog_schema(pd.concat([df, pd.DataFrame(credit_rows)], ignore_index=True))
     
-    steal_events = {'STEAL 2B', 'STEAL 3B', 'Steal 2B', 'Steal 3B', 'MSTEAL 3B', 'MSteal 3B', 'CS 2B', 'CS 3B', 'CS Home', 'CMS 3B', 'CMS Home'}
-    multi_steal_events = {'MSTEAL 3B', 'MSteal 3B', 'CMS 3B', 'CMS Home'}
-    
-    corrected_rows = []
+    return df
+
+# The per-season stats build_season_stats returns, in order; each is cached as data/cache/<name>_<season>.csv.
+SEASON_STATS_NAMES = ['hitting_stats', 'pitching_stats', 'team_hitting_stats', 'team_pitching_stats']
+
+def build_season_stats(season, season_leaderboard_df, player_types_df, season_tables):
+    """
+    Builds one season's hitting, pitching (with WAR) and team stats from its plays.
+
+    Seasons are independent once the league-wide tables are known, so each one runs as its own task.
+    season_tables holds the season's share of them: 'fip_constant', 'league_hitting' (lg_nOBP/lg_nSLG),
+    'league_n_era', 'team_n_era' ({team: nERA}), and the 'neutral_stats', 'achievements' and 'decisions'
+    rows to merge into the pitchers. Returns (hitting, pitching, team hitting, team pitching) DataFrames.
+    """
+    if player_types_df is not None:
+        # Merge for hitters
+        hitter_types_df = player_types_df.rename(columns={'Player ID': 'Hitter ID', 'Batting Type': 'Hitter Batting Type', 'Pitching Type': 'Hitter Pitching Type'})
+        season_leaderboard_df = pd.merge(season_leaderboard_df, hitter_types_df, on='Hitter ID', how='left')
+
+        # Merge for pitchers
+        pitcher_types_df = player_types_df.rename(columns={'Player ID': 'Pitcher ID', 'Batting Type': 'Pitcher Batting Type', 'Pitching Type': 'Pitcher Pitching Type'})
+        season_leaderboard_df = pd.merge(season_leaderboard_df, pitcher_types_df, on='Pitcher ID', how='left')
+
+    # --- Hitting Stats Calculation ---
+    season_hitting_stats = calculate_season_hitting_stats(season_leaderboard_df, season)
+
+    # --- Pitching Stats Calculation ---
+    season_pitching_stats = calculate_season_pitching_stats(season_leaderboard_df, season)
+
+    # --- Merge additional pitching stats ---
+    if not season_pitching_stats.empty:
+        fip_constant = season_tables['fip_constant']
+        season_pitching_stats['FIP'] = ((13 * season_pitching_stats['HR']) + (3 * season_pitching_stats['BB']) - (2 * season_pitching_stats['K'])) / season_pitching_stats['IP'] + fip_constant
+        season_neutral_stats = season_tables['neutral_stats']
+        season_achievements = season_tables['achievements']
+        season_decisions = season_tables['decisions']
+
+        if not season_neutral_stats.empty:
+            season_pitching_stats = season_pitching_stats.merge(season_neutral_stats, on=['Season', 'Pitcher ID', 'Team'], how='left')
+        if not season_achievements.empty:
+            season_pitching_stats = season_pitching_stats.merge(season_achievements, on=['Season', 'Pitcher ID', 'Team'], how='left')
+        if not season_decisions.empty: 
+            season_pitching_stats = season_pitching_stats.merge(season_decisions, on=['Season', 'Pitcher ID', 'Team'], how='left')
+
+        stats_to_sum = ['W', 'L', 'SV', 'HLD', 'GS', 'GF', 'CG', 'SHO']
+        for col in stats_to_sum:
+            if col not in season_pitching_stats.columns:
+                season_pitching_stats[col] = 0
+        season_pitching_stats[stats_to_sum] = season_pitching_stats[stats_to_sum].fillna(0)
+
+        traded_player_ids = season_pitching_stats[season_pitching_stats['is_sub_row'] == True]['Pitcher ID'].unique()
+        for pid in traded_player_ids:
+            player_mask = season_pitching_stats['Pitcher ID'] == pid
+            total_row_idx = season_pitching_stats.index[player_mask & (season_pitching_stats['is_sub_row'] == False)]
+            if len(total_row_idx) > 0:
+                team_rows = season_pitching_stats[player_mask & (season_pitching_stats['is_sub_row'] == True)]
+                season_pitching_stats.loc[total_row_idx, stats_to_sum] = team_rows[stats_to_sum].sum().values
+
+        if 'W' in season_pitching_stats.columns and 'L' in season_pitching_stats.columns:
+            season_pitching_stats['W-L%'] = (season_pitching_stats['W'] / (season_pitching_stats['W'] + season_pitching_stats['L'])).fillna(0)
+
+    # --- WAR Calculation ---
+    if not season_hitting_stats.empty and not season_pitching_stats.empty:
+        # WAR is based on the total number of games played in a season.
+        num_total_games = season_leaderboard_df['Game ID'].nunique()
+
+        if num_total_games > 0:
+            # The league generates 0.41 WAR per game, so we use that as our constant.
+            total_war_season = num_total_games * 0.41
+            runs_per_win = 10
+            total_rar_season = total_war_season * runs_per_win
+
+            # Hitting WAR
+            total_pa_season = season_hitting_stats['PA'].sum()
+            if total_pa_season > 0:
+                total_rar_h = total_rar_season / 2
+                runs_per_pa_replacement_h = total_rar_h / total_pa_season
+                season_hitting_stats['WAR'] = (season_hitting_stats['RE24'] + runs_per_pa_replacement_h * season_hitting_stats['PA']) / runs_per_win
+            else:
+                season_hitting_stats['WAR'] = 0
+
+            # Pitching WAR
+            total_bf_season = season_pitching_stats['BF'].sum()
+            if total_bf_season > 0:
+                total_rar_p = total_rar_season / 2
+                runs_per_bf_replacement_p = total_rar_p / total_bf_season
+                season_pitching_stats['WAR'] = (-season_pitching_stats['RE24'] + runs_per_bf_replacement_p * season_pitching_stats['BF']) / runs_per_win
+            else:
+                season_pitching_stats['WAR'] = 0
+        else:
+            season_hitting_stats['WAR'] = 0
+            season_pitching_stats['WAR'] = 0
     
-    for game_id, game_df in df.groupby(['Season', 'Game ID']):
-        
-        game_df = game_df.sort_values(by=['Inning', 'PA of Inning']).copy()
-        
-        runners = {1: None, 2: None, 3: None} # base -> player_id
-        player_on_base_map = {} # player_id -> base
+    # --- Team Hitting Stats Calculation ---
+    team_hitting_records = []
+    if not season_hitting_stats.empty:
+        source_hitting_df = season_hitting_stats[~season_hitting_stats['Team'].str.contains("TM")].copy()
+        league_stats_for_season = season_tables['league_hitting']
+        for team, team_df in source_hitting_df.groupby('Team'):
+            team_stats_series = calculate_team_hitting_stats(team_df, league_stats_for_season)
+            team_stats_series['Season'] = season
+            team_stats_series['Team'] = team
+            team_hitting_records.append(team_stats_series)
+    season_team_hitting_stats = pd.DataFrame(team_hitting_records)
+    if not season_team_hitting_stats.empty:
+        team_games = season_leaderboard_df.groupby('Batter Team')['Session'].nunique()
+        season_team_hitting_stats['G'] = season_team_hitting_stats['Team'].map(team_games)
+
+    # --- Team Pitching Stats Calculation ---
+    team_pitching_records = []
+    if not season_pitching_stats.empty:
+        source_pitching_df = season_pitching_stats[~season_pitching_stats['Team'].str.contains("TM")].copy()
+        league_n_era_for_season = season_tables['league_n_era']
+        fip_constant_for_season = season_tables['fip_constant']
+
+        season_team_neutral_pitching_stats = season_tables['team_n_era']
         
-        new_rows_for_game = []
+        for team, team_df in source_pitching_df.groupby('Team'):
+            team_n_era = season_team_neutral_pitching_stats.get(team, 0)
+            team_stats_series = calculate_team_pitching_stats(team_df, league_n_era_for_season, team_n_era, fip_constant_for_season)
+            team_stats_series['Season'] = season
+            team_stats_series['Team'] = team
+            team_pitching_records.append(team_stats_series)
+    season_team_pitching_stats = pd.DataFrame(team_pitching_records)
 
-        for index, play in game_df.iterrows():
-            current_runners = runners.copy()
-            
-            player_id = play['Hitter ID']
-            result = play['Exact Result']
-            
-            is_steal_event = result in steal_events
-            is_batter_on_base = player_id in player_on_base_map
-            
-            if is_steal_event and not is_batter_on_base:
-                # This player is a pinch runner. Find who they replaced.
-                original_runner_id = None
-                if result in ['STEAL 2B', 'CS 2B']:
-                    original_runner_id = runners[1]
-                    if original_runner_id: runners[1] = player_id
-                elif result in ['STEAL 3B', 'CS 3B', 'MSTEAL 3B', 'MSteal 3B', 'CMS 3B']:
-                    original_runner_id = runners[2]
-                    if original_runner_id: runners[2] = player_id
-                elif result in ['CS Home', 'CMS Home']:
-                    original_runner_id = runners[3]
-                    if original_runner_id: runners[3] = player_id
-
-                if original_runner_id:
-                    # If the original runner was credited with a run, move it to the pinch runner.
-                    on_base_events = {'1B', '2B', '3B', 'HR', 'BB', 'IBB', 'BUNT 1B', 'Bunt 1B'}
-                    original_runner_pa_mask = (
-                        (df['Game ID'] == game_id[1]) &
-                        (df.index < index) &
-                        (df['Hitter ID'] == original_runner_id) &
-                        (df['Old Result'].isin(on_base_events) | df['Exact Result'].isin(on_base_events))
-                    )
-                    original_runner_pa_rows = df[original_runner_pa_mask]
-
-                    if not original_runner_pa_rows.empty:
-                        original_pa_row_index = original_runner_pa_rows.index[-1]
-                        if df.loc[original_pa_row_index, 'Run'] == 1:
-                            df.loc[original_pa_row_index, 'Run'] = 0
-                            df.loc[index, 'Run'] = 1
-
-                    # Update the map for future lookups
-                    if original_runner_id in player_on_base_map:
-                        base = player_on_base_map.pop(original_runner_id)
-                        player_on_base_map[player_id] = base
-                    
-                    # Find all future plays for the original runner and re-assign them
-                    mask = (df['Game ID'] == game_id[1]) & (df.index > index) & (df['Hitter ID'] == original_runner_id)
-                    df.loc[mask, 'Hitter ID'] = player_id
-
-            # --- Multi-Steal SB Attribution ---
-            if result in multi_steal_events:
-                is_caught_steal = result.startswith('CMS')
-                caught_runner = player_id if is_caught_steal else None
-
-                for base, runner_id in current_runners.items():
-                    if runner_id and runner_id != caught_runner:
-                        # This is a successful trailing runner. Award SB.
-                        new_row = play.copy()
-                        new_row['Hitter ID'] = runner_id
-                        new_row['Hitter'] = player_id_to_name_map.get(runner_id, 'Unknown Player')
-                        # Determine the type of steal based on the base they are advancing to
-                        new_row['Exact Result'] = f'STEAL {base + 1}B' if base < 3 else 'STEAL Home'
-                        new_rows_for_game.append(new_row)
-
-            # --- Update runner state for the NEXT play ---
-            # This is a simplified simulation just for tracking who is on base.
-            # It does not need to be perfect because we only use it for PR/CMS identification.
-            batter_id = play['Hitter ID']
-            
-            # Clear bases
-            runners = {1: None, 2: None, 3: None}
-            player_on_base_map.clear()
-
-            # Place batter if they reached base
-            if play['Old Result'] in {'1B', '2B', '3B', 'HR', 'BB', 'IBB'} or play['Exact Result'] in {'BUNT 1B', 'Bunt 1B'}:
-                if play['Old Result'] == '1B' or play['Exact Result'] in {'BUNT 1B', 'Bunt 1B', 'BB', 'IBB'}:
-                    runners[1] = batter_id
-                elif play['Old Result'] == '2B':
-                    runners[2] = batter_id
-                elif play['Old Result'] == '3B':
-                    runners[3] = batter_id
-            
-            # Place runners based on OBC After. This is tricky without knowing who is who.
-            # This part of the logic is imperfect but is a best-effort for tracking.
-            # The key part (PR substitution) happens before this state update.
-            
-        corrected_rows.extend(new_rows_for_game)
+    return season_hitting_stats, season_pitching_stats, season_team_hitting_stats, season_team_pitching_stats
 
-    if corrected_rows:
-        return pd.concat([df, pd.DataFrame(corrected_rows)], ignore_index=True)
-    
-    return df
 
 def aggregate_decisions(df, games_df):
     if df.empty: return pd.DataFrame(columns=['Season', 'Pitcher ID', 'Team', 'W', 'L', 'SV', 'HLD'])
@@ -1944,15 +2173,210 @@ def aggregate_decisions(df, games_df):
         
     return agg_df
 
-def main():
+# --- Sharded Export ---
+# The columns the stats indexes keep: what the leaderboards (every stat they offer, the qualifiers and the
+# filters), the team pages and the standings read. Everything else, such as 'Last Team', the pitchers' ER (the
+# app shows R) and the inputs to other stats, is only kept in the per-player files the player pages load.
+INDEX_KEY_COLUMNS = ['Season', 'Team', 'Type', 'is_sub_row']
+# Totals that only the all-time leaderboards filtered by team or type read. They are written to
+# <name>_totals.json, which the app fetches the first time such a filter is used.
+INDEX_TOTALS_SEASONS = ['Franchise', 'Type']
+INDEX_COLUMNS = {
+    'hitting': ['Hitter ID'] + INDEX_KEY_COLUMNS + [
+        'WAR', 'G', 'PA', 'AB', 'R', 'H', '1B', '2B', '3B', 'HR', 'TB', 'RBI', 'SB', 'CS', 'SB%', 'BB', 'IBB',
+        'K', 'Auto K', 'SH', 'SF', 'GIDP', 'RGO', 'LGO', 'FO', 'PO', 'LO', 'AVG', 'OBP', 'SLG', 'OPS', 'OPS+',
+        'ISO', 'BABIP', 'HR%', 'SO%', 'BB%', 'GB%', 'FB%', 'GB/FB', 'Avg Diff', 'RE24', 'WPA',
+    ],
+    'pitching': ['Pitcher ID'] + INDEX_KEY_COLUMNS + [
+        'WAR', 'W', 'L', 'W-L%', 'G', 'GS', 'GF', 'CG', 'SHO', 'SV', 'HLD', 'IP', 'BF', 'H', 'R', 'BB', 'IBB',
+        'Auto BB', 'K', 'HR', '1B', '2B_A', '3B_A', 'SB_A', 'CS_A', 'SB%_A', 'RGO', 'LGO', 'FO', 'PO', 'LO',
+        'ERA', 'ERA-', 'FIP', 'WHIP', 'H/6', 'HR/6', 'BB/6', 'K/6', 'K/BB', 'BAA', 'OBPA', 'SLGA', 'OPSA',
+        'BABIP_A', 'HR%_A', 'K%_A', 'BB%_A', 'GB%_A', 'FB%_A', 'GB/FB_A', 'Avg Diff', 'RE24', 'WPA',
+    ],
+}
+
+# Decimal places kept for each stat in the web data: two more than the app displays (three-decimal rates
+# and percentages shown to a tenth, two-decimal rates and everything else).
+THREE_DECIMAL_STATS = [
+    'AVG', 'OBP', 'SLG', 'OPS', 'ISO', 'BABIP', 'BAA', 'OBPA', 'SLGA', 'OPSA', 'BABIP_A', 'W-L%',
+    'SB%', 'HR%', 'SO%', 'BB%', 'GB%', 'FB%', 'HR%_A', 'K%_A', 'BB%_A', 'GB%_A', 'FB%_A', 'SB%_A',
+]
+STAT_DECIMALS = {stat: 5 for stat in THREE_DECIMAL_STATS}
+DEFAULT_STAT_DECIMALS = 4
+
+def round_for_display(numbers, decimals):
+    """
+    Rounds to `decimals` places for a stat the app shows with two fewer. A value that lands exactly halfway
+    between two displayed values (.8065 for a stat shown to .001) would be displayed rounded up or down
+    depending on its binary representation, so it is moved one place towards the side the unrounded value is
+    on. The app then displays exactly what it would for the unrounded value.
+    """
+    rounded = numbers.round(decimals)
+    halfway = (rounded * 10 ** (decimals - 1)).round(6) % 10 == 5
+    return rounded.where(~halfway, rounded + np.sign(numbers - rounded) * 10.0 ** -decimals).round(decimals)
+
+def to_compact_data(df):
+    """
+    {"columns", "dictionaries", "data"} for df, decoded by parseCompactData in docs/app.js. Text and flag
+    columns are stored as indexes into their entry in "dictionaries", numbers are rounded to STAT_DECIMALS
+    places, whole numbers (all counting stats) are stored as ints, and NaN and infinities as None.
+    """
+    dictionaries = {}
+    columns = []
+    for col in df.columns:
+        values = df[col]
+        # Rate columns with missing values can be object columns of floats and Nones; they are still numbers
+        if pd.api.types.infer_dtype(values, skipna=True) not in ('integer', 'floating', 'mixed-integer-float'):
+            codes, uniques = pd.factorize(values)
+            dictionaries[col] = uniques.tolist()
+            columns.append([int(code) if code >= 0 else None for code in codes])
+            continue
+        numbers = pd.Series(values.to_numpy(dtype=float, na_value=np.nan)).replace([np.inf, -np.inf], np.nan)
+        numbers = round_for_display(numbers, STAT_DECIMALS.get(col, DEFAULT_STAT_DECIMALS))
+        columns.append([None if np.isnan(number) else int(number) if number.is_integer() else number for number in numbers.tolist()])
+    return {"columns": df.columns.tolist(), "dictionaries": dictionaries, "data": [list(row) for row in zip(*columns)]}
+
+def slice_compact_data(compact, positions, columns=None):
+    """
+    The compact data of the rows at positions (and only the given columns) of data already encoded by
+    to_compact_data, so a frame is typed, rounded and encoded once however many files it is split into.
+    Each dictionary is cut down to the values the rows use, in the order they first appear.
+    """
+    columns = compact['columns'] if columns is None else columns
+    col_indexes = [compact['columns'].index(col) for col in columns]
+    data = compact['data']
+    rows = [[data[i][j] for j in col_indexes] for i in positions]
+    dictionaries = {}
+    for j, col in enumerate(columns):
+        if col not in compact['dictionaries']:
+            continue
+        remap = {}
+        for row in rows:
+            if row[j] is not None:
+                row[j] = remap.setdefault(row[j], len(remap))
+        values = compact['dictionaries'][col]
+        dictionaries[col] = [values[code] for code in remap]
+    return {"columns": list(columns), "dictionaries": dictionaries, "data": rows}
+
+def write_stats_index(exporter, name, compact):
+    """
+    Writes the INDEX_COLUMNS of the encoded stats as <name>_index.json (the season and Career rows, which the
+    leaderboards, team pages and standings read) and <name>_totals.json (the INDEX_TOTALS_SEASONS rows).
+    The per-team rows of traded players stay in the index for the team-filtered leaderboards and team pages.
+    """
+    columns = [col for col in compact['columns'] if col in INDEX_COLUMNS[name]]
+    season_col = compact['columns'].index('Season')
+    seasons = compact['dictionaries']['Season']
+    is_totals = [seasons[row[season_col]] in INDEX_TOTALS_SEASONS for row in compact['data']]
+    index_rows = [i for i, totals in enumerate(is_totals) if not totals]
+    totals_rows = [i for i, totals in enumerate(is_totals) if totals]
+    exporter.write_json(f'{name}_index.json', slice_compact_data(compact, index_rows, columns), separators=(',', ':'))
+    exporter.write_json(f'{name}_totals.json', slice_compact_data(compact, totals_rows, columns), separators=(',', ':'))
+
+def write_shards(exporter, shard_dir, shards):
+    """Writes {player_id: data} as <shard_dir>/<player_id>.json and removes the files of players not in shards."""
+    for player_id, shard in shards.items():
+        exporter.write_json(f'{shard_dir}/{player_id}.json', shard, separators=(',', ':'))
+
+    written = {f'{player_id}.json' for player_id in shards}
+    if exporter.exists(shard_dir):
+        for file_name in os.listdir(exporter.path(shard_dir)):
+            if file_name.endswith('.json') and file_name not in written:
+                exporter.remove(f'{shard_dir}/{file_name}')
+
+def write_player_shards(exporter, hitting_stats, pitching_stats, compact_stats):
+    """
+    Writes players/<id>.json for every player with stats, holding all of their hitting and pitching rows,
+    so a player page is one small fetch. The rows are sliced from compact_stats ({'hitting': ..., 'pitching':
+    ...}, the frames encoded by to_compact_data). Files of players that no longer have any stats are removed.
+    """
+    shards = defaultdict(dict)
+    for name, stats_df, id_col in [('hitting', hitting_stats, 'Hitter ID'), ('pitching', pitching_stats, 'Pitcher ID')]:
+        for player_id, positions in stats_df.groupby(id_col, sort=False).indices.items():
+            shards[int(player_id)][name] = slice_compact_data(compact_stats[name], positions)
+    write_shards(exporter, 'players', shards)
+    return len(shards)
+
+# --- Build Manifest ---
+# Files in docs/data that the web app doesn't load
+MANIFEST_EXCLUDED_FILES = ['manifest.json', 'build_profile.json']
+
+def write_build_manifest(exporter):
+    """
+    Copies every dataset in docs/data to hashed/<name>.<content hash>.json, with a gzip-compressed copy
+    beside it, and writes manifest.json mapping each dataset's file name to its hashed copy. A hashed file
+    never changes, so clients can cache it forever and only fetch the datasets that changed. The copies of
+    the previous build are kept, so a page loaded before the data was updated can still fetch them.
+    """
+    previous_manifest = {}
+    if exporter.exists('manifest.json'):
+        try:
+            with open(exporter.path('manifest.json'), 'r') as f:
+                previous_manifest = json.load(f)
+        except (json.JSONDecodeError, IOError):
+            previous_manifest = {}
+
+    manifest = {}
+    for file_name in sorted(os.listdir(exporter.output_dir)):
+        if not file_name.endswith('.json') or file_name in MANIFEST_EXCLUDED_FILES:
+            continue
+        with open(exporter.path(file_name), 'rb') as f:
+            content = f.read()
+        hashed_name = f"hashed/{file_name[:-len('.json')]}.{hashlib.sha256(content).hexdigest()[:12]}.json"
+        if not (exporter.exists(hashed_name) and exporter.exists(hashed_name + '.gz')):
+            exporter.write_bytes(hashed_name, content)
+            # mtime=0 keeps the compressed bytes the same for the same content
+            exporter.write_bytes(hashed_name + '.gz', gzip.compress(content, mtime=0))
+        manifest[file_name] = hashed_name
+
+    exporter.write_json('manifest.json', manifest, indent=1, sort_keys=True)
+
+    kept = {os.path.basename(name) for name in list(manifest.values()) + list(previous_manifest.values())}
+    for file_name in os.listdir(exporter.path('hashed')) if exporter.exists('hashed') else []:
+        if file_name.removesuffix('.gz') not in kept:
+            exporter.remove(f'hashed/{file_name}')
+    return manifest
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Builds the JSON data for the web app from the MLR gamelogs.")
+    parser.add_argument('--force', action='store_true', help="Rebuild even if the downloaded gamelogs and player types are unchanged since the last build.")
+    parser.add_argument('--re-method', choices=RE_METHODS, default='empirical', help="How to calculate run expectancy matrices that aren't cached: 'empirical' averages the runs to the end of the inning, 'markov' solves the base/out state transition chain (steadier with few plays).")
+    parser.add_argument('--full', action='store_true', help="Rebuild every cached artifact (per-game decisions, GS, GF, CG and SHO, RE matrices, season stats, scouting reports) instead of reusing the ones whose inputs and code are unchanged since the last run.")
+    parser.add_argument('--workers', type=int, default=get_default_workers(), help="Number of worker processes for the per-game and per-season stages (default: one per core). 1 runs everything in this process.")
+    parser.add_argument('--sharded', action='store_true', help="Write the player stats as hitting_index.json and pitching_index.json (the columns the leaderboards and team pages read, with the Franchise and Type totals in hitting_totals.json and pitching_totals.json) plus one players/<id>.json file per player with their full rows, instead of hitting_stats.json and pitching_stats.json.")
+    parser.add_argument('--profile', action='store_true', help="Time every stage (wall and CPU time, peak memory, rows in and out), print a summary and write it to docs/data/build_profile.json.")
+    parser.add_argument('--cprofile', action='store_true', help="With --profile, also write a cProfile dump of each stage to data/cache/profile.")
+    args = parser.parse_args(argv)
+
+    # Stage timings for --profile; the begin/end calls below record nothing without it.
+    profile_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'cache', 'profile')
+    profiler = StageProfiler(enabled=args.profile, cprofile_dir=profile_dir if args.cprofile else None)
+
+    profiler.begin('load_gamelogs')
     print("Loading all season data... (this may take a moment)")
     all_season_data, most_recent_season, force_recalc_seasons = load_all_seasons()
     if not all_season_data: return
+    profiler.end(rows_out=sum(len(df) for df in all_season_data.values()))
 
+    profiler.begin('load_player_types')
     print("Loading player type data...")
     player_type_data = load_player_types(force_seasons=force_recalc_seasons)
+    profiler.end(rows_out=sum(len(df) for df in player_type_data.values()) if player_type_data else 0)
+
+    # Skip the whole rebuild when the inputs, the code and the output options are identical to the last
+    # completed build. --full asks for a rebuild of everything, so it never skips.
+    cache_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'cache')
+    input_fingerprint = get_build_fingerprint({'re_method': args.re_method, 'sharded': args.sharded})
+    if not (args.force or args.full) and _load_cache_manifest_data(cache_dir).get('last_build_inputs') == input_fingerprint:
+        print("Gamelogs, player types, scripts and options are unchanged since the last build. Nothing to do (use --force to rebuild anyway).")
+        return
+    stage_cache = StageCache(cache_dir, enabled=not args.full)
+    # Every file in docs/data goes through the exporter, which skips the ones whose content is unchanged
+    exporter = ExportWriter(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'docs', 'data'), cache_dir)
+
     combined_df = pd.concat([df.assign(Season=season) for season, df in all_season_data.items() if not df.empty], ignore_index=True)
 
+    profiler.begin('player_ids', rows_in=len(combined_df))
     print("Processing player info data...")
     player_info = {}
     if player_type_data:
@@ -1998,9 +2422,7 @@ def main():
                         player_info[pid][key] = value
 
     # Save the combined player info to a JSON file
-    output_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'docs', 'data', 'player_info.json')
-    with open(output_path, 'w') as f:
-        json.dump(player_info, f)
+    exporter.write_json('player_info.json', player_info)
 
     # The following code block is commented out because the user wants to manually edit the type_definitions.json file.
     # To regenerate the file, uncomment this block.
@@ -2096,14 +2518,23 @@ def main():
     # Create the PA of Inning column needed for sorting
     combined_df['PA of Inning'] = combined_df.groupby(['Season', 'Game ID', 'Inning']).cumcount()
 
+    profiler.end(rows_out=len(combined_df))
+
+    profiler.begin('corrections', rows_in=len(combined_df))
     print("Applying manual gamelog corrections...")
-    # The lambda function calls our correction function for each group (game)
-    # and passes the group's name (a tuple of season and game_id) as an argument.
-    combined_df = combined_df.groupby(['Season', 'Game ID']).apply(
-        lambda g: apply_gamelog_corrections(g, g.name), include_groups=False
-    ).reset_index()
+    combined_df = apply_all_gamelog_corrections(combined_df)
     print("Gamelog corrections applied.")
 
+    # Concatenating the corrected games widens the column types again; restore the gamelog schema once for everything below.
+    combined_df = apply_gamelog_schema(combined_df)
+    profiler.end(rows_out=len(combined_df))
+
+    # Replay every play once; decisions, stat corrections, RE matrices and RE24 all read these columns.
+    profiler.begin('play_states', rows_in=len(combined_df))
+    print("Simulating base/out states for all plays...")
+    combined_df = add_play_states(combined_df)
+    profiler.end(rows_out=len(combined_df))
+
     # Exclude in-progress games from the most recent season for pitching decisions
     decision_games_df = combined_df.copy()
     if most_recent_season:
@@ -2114,17 +2545,14 @@ def main():
             decision_games_mask = ~((combined_df['Season'] == most_recent_season) & (combined_df['Session'] == max_session))
             decision_games_df = combined_df[decision_games_mask]
 
-    # Calculate pitching decisions on the filtered data
+    # Calculate pitching decisions on the filtered data. Games processed on a previous run are reused.
+    profiler.begin('decisions', rows_in=len(decision_games_df))
     print("Calculating pitching decisions (W, L, SV, HLD)...")
+    game_decisions = process_games_incrementally(decision_games_df, 'decisions', get_pitching_decisions_for_games, cache_dir, full_rebuild=args.full, batched=True)
     pitching_decisions = []
-    game_groups = list(decision_games_df.groupby(['Season', 'Game ID']))
-    num_games = len(game_groups)
-    print(f"  Processing {num_games} games for decisions...")
-    for i, ((season, game_id), game_df) in enumerate(game_groups):
-        if (i + 1) % 100 == 0:
-            print(f"  ... {i + 1} / {num_games} games processed")
-        decisions = get_pitching_decisions(game_df, season)
+    for (season, session, game_id), decisions in game_decisions.items():
         if decisions:
+            decisions = dict(decisions)
             decisions['Season'] = season
             decisions['Game ID'] = game_id
             pitching_decisions.append(decisions)
@@ -2133,6 +2561,7 @@ def main():
     pitching_decisions_df = pitching_decisions_df.merge(game_types, on=['Season', 'Game ID'], how='left')
     regular_season_decisions = pitching_decisions_df[pitching_decisions_df['GameType'] == 'Regular']
     regular_pitcher_stats_agg = aggregate_decisions(regular_season_decisions, combined_df)
+    profiler.end(rows_out=len(pitching_decisions_df))
 
     # Flag unearned runs from Manfred runners
     # combined_df = flag_unearned_runs(combined_df)
@@ -2170,29 +2599,25 @@ def main():
     player_id_to_name_map = {k: v['currentName'] for k, v in player_id_map.items()}
 
     # Apply corrections for pinch runners and multi-steals
+    profiler.begin('stat_corrections', rows_in=len(combined_df))
     print("Pre-processing gamelogs for stat corrections...")
-    combined_df = preprocess_gamelogs_for_stat_corrections(combined_df, player_id_to_name_map)
+    combined_df = preprocess_gamelogs_for_stat_corrections(combined_df, player_id_to_name_map, workers=args.workers)
     print("Pre-processing complete.")
+    profiler.end(rows_out=len(combined_df))
 
     # Disambiguate Line Outs (LO) from Left Ground Outs (LGO) in modern seasons.
     is_modern_season = ~combined_df['Season'].isin(['S2', 'S3'])
     lo_mask = (combined_df['Exact Result'] == 'LGO') & (combined_df['Old Result'] == 'LO')
     combined_df.loc[is_modern_season & lo_mask, 'Exact Result'] = 'LO'
 
-    # Ensure key numeric columns are treated as numbers, filling non-numeric with 0
-    combined_df['RBI'] = pd.to_numeric(combined_df['RBI'], errors='coerce').fillna(0)
-    combined_df['Run'] = pd.to_numeric(combined_df['Run'], errors='coerce').fillna(0)
-    if 'Batter WPA' in combined_df.columns:
-        combined_df['Batter WPA'] = pd.to_numeric(combined_df['Batter WPA'].astype(str).str.strip('%'), errors='coerce').fillna(0) / 100
-    if 'Pitcher WPA' in combined_df.columns:
-        combined_df['Pitcher WPA'] = pd.to_numeric(combined_df['Pitcher WPA'].astype(str).str.strip('%'), errors='coerce').fillna(0) / 100
-
-    combined_df['Pitcher ID'] = pd.to_numeric(combined_df['Pitcher ID'], errors='coerce').fillna(0).astype(int)
-    combined_df['Hitter ID'] = pd.to_numeric(combined_df['Hitter ID'], errors='coerce').fillna(0).astype(int)
+    # Columns are already typed by the gamelog schema; missing counts, WPA and IDs count as 0
+    fill_zero_cols = [col for col in ['RBI', 'Run', 'Batter WPA', 'Pitcher WPA', 'Pitcher ID', 'Hitter ID'] if col in combined_df.columns]
+    combined_df[fill_zero_cols] = combined_df[fill_zero_cols].fillna(0)
     combined_df['Season_num'] = combined_df['Season'].str.replace('S', '').astype(int)
     combined_df.sort_values(by=['Season_num', 'Session'], ascending=[True, True], inplace=True)
     combined_df.drop(columns=['Season_num'], inplace=True)
     
+    profiler.begin('re_matrices', rows_in=len(combined_df))
     print("Processing Run Expectancy Matrices...")
     run_expectancy_by_season = {}
     all_season_names = combined_df['Season'].unique()
@@ -2205,85 +2630,16 @@ def main():
     sorted_seasons = sorted(all_season_names, key=lambda s: int(s.replace('S', '')))
     for season in sorted_seasons:
         season_df = combined_df[combined_df['Season'] == season]
-        is_current = (season == most_recent_season)
-        if is_current: print(f"Calculating matrix for current season {season} (will not use cache)...")
-        run_expectancy_by_season[season] = get_run_expectancy_matrix(season, season_df.copy(), is_most_recent_season=is_current)
+        run_expectancy_by_season[season] = get_run_expectancy_matrix(season, season_df.copy(), stage_cache, method=args.re_method)
+    stage_cache.save()
     print("Run Expectancy Matrices are ready.")
+    profiler.end(rows_out=len(run_expectancy_by_season))
 
+    profiler.begin('re24', rows_in=len(combined_df))
     print("Calculating RE24 for all plays...")
-    from game_processing import Game
-
-    re24_values = []
-    for season in sorted_seasons:
-        season_df = combined_df[combined_df['Season'] == season].copy()
-        re_matrix = run_expectancy_by_season.get(season, {})
-        if not re_matrix:
-            re24_values.append(pd.Series(0, index=season_df.index))
-            continue
-
-        game_simulator = Game(pd.DataFrame(), season)
-
-        season_df['OBC'] = pd.to_numeric(season_df['OBC'], errors='coerce').fillna(0).astype(int)
-        season_df['Outs'] = pd.to_numeric(season_df['Outs'], errors='coerce').fillna(0).astype(int)
-        re_before = season_df.apply(lambda row: re_matrix.get((row['OBC'], row['Outs']), 0), axis=1)
-
-        inning_groups = season_df.groupby('Inning ID')
-        obc_after_raw = inning_groups['OBC'].shift(-1)
-        outs_after_raw = inning_groups['Outs'].shift(-1)
-        obc_after_raw_for_sim = inning_groups['OBC'].shift(-1).fillna(0).astype(int)
-
-        last_play_of_game_mask = ~season_df.duplicated(subset='Game ID', keep='last')
-        
-        runners_map = {0:[False,False,False], 1:[True,False,False], 2:[False,True,False], 3:[False,False,True], 4:[True,True,False], 5:[True,False,True], 6:[False,True,True], 7:[True,True,True]}
-        
-        def get_re24_components(row):
-            runners_before = runners_map.get(row['OBC'], [False, False, False])
-            result = row['Exact Result'] if pd.notna(row['Exact Result']) else row['Old Result']
-            diff_val = pd.to_numeric(row.get('Diff'), errors='coerce')
-            diff = int(diff_val if pd.notna(diff_val) else 0)
-            pa_type_val = pd.to_numeric(row.get('PA Type'), errors='coerce')
-            pa_type = int(pa_type_val if pd.notna(pa_type_val) else 0)
-            
-            new_runners, runs_on_play, outs_for_play = game_simulator._simulate_play(
-                row['obc_after_for_sim'], runners_before, row['Outs'], result, row['Old Result'],
-                diff, int(row['Season'].replace('S','')), pa_type
-            )
-            
-            outs_after = row['Outs'] + outs_for_play
-            
-            is_last_play_of_inning = pd.isna(row['obc_after_raw'])
-
-            if outs_after >= 3 or is_last_play_of_inning:
-                re_after = 0
-            else:
-                obc_after = game_simulator._runners_to_obc(tuple(new_runners))
-                re_after = re_matrix.get((obc_after, outs_after), 0)
-                
-            return pd.Series([re_after, runs_on_play])
-
-        temp_df = season_df.copy()
-        temp_df['obc_after_raw'] = obc_after_raw
-        temp_df['outs_after_raw'] = outs_after_raw
-        temp_df['obc_after_for_sim'] = obc_after_raw_for_sim
-        temp_df['is_last_play_of_game'] = last_play_of_game_mask
-        
-        re24_components = temp_df.apply(get_re24_components, axis=1)
-        re24_components.columns = ['re_after', 'runs_on_play']
-        
-        re_after = re24_components['re_after']
-        runs_on_play = re24_components['runs_on_play']
-        
-        re_after.index = season_df.index
-        runs_on_play.index = season_df.index
-
-        season_re24 = re_after - re_before + runs_on_play
-        re24_values.append(season_re24)
-
-    if re24_values:
-        combined_df['RE24'] = pd.concat(re24_values)
-    else:
-        combined_df['RE24'] = 0
+    combined_df['RE24'] = calculate_re24(combined_df, run_expectancy_by_season)
     print("RE24 calculation complete.")
+    profiler.end(rows_out=len(combined_df))
 
 
 
@@ -2291,309 +2647,128 @@ def main():
     combined_df.sort_values(by=['Season_num', 'Session'], ascending=[True, True], inplace=True)
     combined_df.drop(columns=['Season_num'], inplace=True)
 
-    cache_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'cache')
-    previous_most_recent = _read_cache_manifest(cache_dir)
-    seasons_to_recalc = []
-    if most_recent_season != previous_most_recent and previous_most_recent is not None:
-        print(f"New season detected. Finalizing stats cache for {previous_most_recent}...")
-        seasons_to_recalc.append(previous_most_recent)
-
-    print("Calculating all player stats and decisions (using cache for past seasons)...")
+    print("Calculating all player stats and decisions (reusing the cached stats of unchanged seasons)...")
 
     leaderboard_df = combined_df
 
     # --- Pre-calculate all stats that need to be merged before caching ---
+    profiler.begin('fip_constants', rows_in=len(leaderboard_df))
     print("Calculating FIP constants...")
     fip_constants_by_season = {}
-    league_pitching_totals = leaderboard_df.groupby('Season').apply(lambda df: calculate_pitching_stats(df, season=df.name), include_groups=False).reset_index()
+    league_pitching_totals = calculate_league_pitching_stats(leaderboard_df)
     if not league_pitching_totals.empty:
         league_pitching_totals['lg_ERA'] = (league_pitching_totals['R'] * 6) / league_pitching_totals['IP']
         league_pitching_totals['lg_FIP_unscaled'] = ((13 * league_pitching_totals['HR']) + (3 * league_pitching_totals['BB']) - (2 * league_pitching_totals['K'])) / league_pitching_totals['IP']
         league_pitching_totals['FIP_Constant'] = league_pitching_totals['lg_ERA'] - league_pitching_totals['lg_FIP_unscaled']
         fip_constants_by_season = league_pitching_totals.set_index('Season')['FIP_Constant'].to_dict()
 
+    profiler.end(rows_out=len(fip_constants_by_season))
+
+    profiler.begin('neutral_stats', rows_in=len(leaderboard_df))
     print("Calculating Neutral ERA and ERA-...")
-    league_n_era_by_season = {}
+    # Every inning is replayed once per pitcher; all neutral stats below are sums over these segments.
+    neutral_segments = calculate_neutral_inning_segments(leaderboard_df, run_expectancy_by_season)
+    league_n_era_by_season = {
+        season: get_neutral_era(season_segments[['nRuns', 'nOuts']].sum())
+        for season, season_segments in neutral_segments.groupby('Season')
+    }
+    team_n_era_by_season = defaultdict(dict)
+    for (season, team), team_segments in neutral_segments.groupby(['Season', 'Pitcher Team']):
+        team_n_era_by_season[season][team] = get_neutral_era(team_segments[['nRuns', 'nOuts']].sum())
+
+    def get_neutral_pitching_row(season, pitcher_id, team, player_segments):
+        player_neutral_stats = player_segments[['nRuns', 'nOuts']].sum()
+        player_n_era = get_neutral_era(player_neutral_stats)
+        lg_n_era = league_n_era_by_season[season]
+        era_minus = round(100 * (player_n_era / lg_n_era)) if lg_n_era > 0 else 100
+        return {'Season': season, 'Pitcher ID': pitcher_id, 'Team': team, 'nIP': player_neutral_stats['nOuts'] / 3, 'ERA-': era_minus, 'nRuns': player_neutral_stats['nRuns']}
+
     neutral_pitching_stats = []
-    for season in sorted_seasons:
-        season_df = leaderboard_df[leaderboard_df['Season'] == season]
-        re_matrix = run_expectancy_by_season.get(season, {})
-        if not re_matrix: continue
-        lg_neutral_stats = calculate_neutral_pitching_stats(season_df, re_matrix)
-        lg_n_ip = lg_neutral_stats['nOuts'] / 3
-        lg_n_era = (lg_neutral_stats['nRuns'] * 6) / lg_n_ip if lg_n_ip > 0 else 0
-        league_n_era_by_season[season] = lg_n_era
-        
-        # Calculate per-team ERA-
-        for (pitcher_id, team), player_team_df in season_df.groupby(['Pitcher ID', 'Pitcher Team']):
-            player_neutral_stats = calculate_neutral_pitching_stats(player_team_df, re_matrix)
-            player_n_ip = player_neutral_stats['nOuts'] / 3
-            player_n_runs = player_neutral_stats['nRuns']
-            player_n_era = (player_n_runs * 6) / player_n_ip if player_n_ip > 0 else 0
-            
-            if lg_n_era > 0:
-                era_minus = round(100 * (player_n_era / lg_n_era))
-            else:
-                era_minus = 100
-            neutral_pitching_stats.append({'Season': season, 'Pitcher ID': pitcher_id, 'Team': team, 'nIP': player_n_ip, 'ERA-': era_minus, 'nRuns': player_n_runs})
-
-        # Calculate season-total ERA- for all players who were traded
-        for pitcher_id, player_df in season_df.groupby('Pitcher ID'):
-            teams = player_df['Pitcher Team'].unique()
-            if len(teams) > 1:
-                player_neutral_stats = calculate_neutral_pitching_stats(player_df, re_matrix)
-                player_n_ip = player_neutral_stats['nOuts'] / 3
-                player_n_runs = player_neutral_stats['nRuns']
-                player_n_era = (player_n_runs * 6) / player_n_ip if player_n_ip > 0 else 0
-                
-                if lg_n_era > 0:
-                    era_minus = round(100 * (player_n_era / lg_n_era))
-                else:
-                    era_minus = 100
-                neutral_pitching_stats.append({'Season': season, 'Pitcher ID': pitcher_id, 'Team': f"{len(teams)}TM", 'nIP': player_n_ip, 'ERA-': era_minus, 'nRuns': player_n_runs})
+    # Calculate per-team ERA-
+    for (season, pitcher_id, team), player_segments in neutral_segments.groupby(['Season', 'Pitcher ID', 'Pitcher Team']):
+        neutral_pitching_stats.append(get_neutral_pitching_row(season, pitcher_id, team, player_segments))
+    # Calculate season-total ERA- for all players who were traded
+    for (season, pitcher_id), player_segments in neutral_segments.groupby(['Season', 'Pitcher ID']):
+        teams = player_segments['Pitcher Team'].dropna().unique()
+        if len(teams) > 1:
+            neutral_pitching_stats.append(get_neutral_pitching_row(season, pitcher_id, f"{len(teams)}TM", player_segments))
 
     neutral_stats_df = pd.DataFrame(neutral_pitching_stats) if neutral_pitching_stats else pd.DataFrame()
 
+    profiler.end(rows_out=len(neutral_segments))
+
+    profiler.begin('achievements', rows_in=len(combined_df))
     print("Calculating pitching achievements (GS, CG, SHO, GF)...")
-    games_started_df = calculate_games_started(combined_df)
-    game_achievements_df = calculate_game_achievements(decision_games_df)
+    games_started_df = calculate_games_started(combined_df, cache_dir, full_rebuild=args.full, workers=args.workers)
+    game_achievements_df = calculate_game_achievements(decision_games_df, cache_dir, full_rebuild=args.full, workers=args.workers)
     if not game_achievements_df.empty:
         game_achievements_df = pd.merge(games_started_df, game_achievements_df, on=['Season', 'Pitcher ID', 'Team'], how='outer')
     else:
         game_achievements_df = games_started_df
 
+    profiler.end(rows_out=len(game_achievements_df))
+
+    profiler.begin('season_stats', rows_in=len(leaderboard_df))
     print("Calculating league-wide stats for OPS+...")
     league_stats_by_season = {}
     for season in leaderboard_df['Season'].unique():
         season_df = leaderboard_df[leaderboard_df['Season'] == season]
         if not season_df.empty:
-            league_totals = calculate_hitting_stats(season_df, season=season)
+            league_totals = calculate_league_hitting_stats(season_df)
             league_stats_by_season[season] = {'lg_nOBP': league_totals['nOBP'], 'lg_nSLG': league_totals['nSLG']}
 
-    all_seasons_hitting_stats = []
-    all_seasons_pitching_stats = []
-    all_seasons_team_hitting_stats = []
-    all_seasons_team_pitching_stats = []
+    # A season's stats are rebuilt only when its plays, player types, league tables or the stat code change.
+    stats_source = get_source_digest('generate_web_data.py')
+    season_digests = get_group_digests(leaderboard_df, 'Season')
+    stats_by_season = {}
+    season_keys = {}
+    season_tasks = []
     for season in sorted_seasons:
-        force_recalc = (season == most_recent_season) or (season in seasons_to_recalc)
-        season_leaderboard_df = leaderboard_df[leaderboard_df['Season'] == season]
-
+        player_types_df = None
         if player_type_data and season in player_type_data:
             player_types_df = player_type_data[season][['Player ID', 'Batting Type', 'Pitching Type']]
-            
-            # Merge for hitters
-            hitter_types_df = player_types_df.rename(columns={'Player ID': 'Hitter ID', 'Batting Type': 'Hitter Batting Type', 'Pitching Type': 'Hitter Pitching Type'})
-            season_leaderboard_df = pd.merge(season_leaderboard_df, hitter_types_df, on='Hitter ID', how='left')
-            
-            # Merge for pitchers
-            pitcher_types_df = player_types_df.rename(columns={'Player ID': 'Pitcher ID', 'Batting Type': 'Pitcher Batting Type', 'Pitching Type': 'Pitcher Pitching Type'})
-            season_leaderboard_df = pd.merge(season_leaderboard_df, pitcher_types_df, on='Pitcher ID', how='left')
-
-        hitting_cache_path = os.path.join(cache_dir, f'hitting_stats_{season}.csv')
-        pitching_cache_path = os.path.join(cache_dir, f'pitching_stats_{season}.csv')
-        team_hitting_cache_path = os.path.join(cache_dir, f'team_hitting_stats_{season}.csv')
-        team_pitching_cache_path = os.path.join(cache_dir, f'team_pitching_stats_{season}.csv')
-
-        can_use_cache = False
-        if (os.path.exists(hitting_cache_path) and
-                os.path.exists(pitching_cache_path) and
-                os.path.exists(team_hitting_cache_path) and
-                os.path.exists(team_pitching_cache_path) and
-                not force_recalc):
-            try:
-                hitting_cols = pd.read_csv(hitting_cache_path, nrows=0).columns
-                pitching_cols = pd.read_csv(pitching_cache_path, nrows=0).columns
-                if 'WPA' in hitting_cols and 'BAA' in pitching_cols:
-                    can_use_cache = True
-            except Exception:
-                can_use_cache = False
-
-        if can_use_cache:
-            season_hitting_stats = pd.read_csv(hitting_cache_path)
-            season_pitching_stats = pd.read_csv(pitching_cache_path)
-            season_team_hitting_stats = pd.read_csv(team_hitting_cache_path)
-            season_team_pitching_stats = pd.read_csv(team_pitching_cache_path)
+        season_tables = {
+            'fip_constant': fip_constants_by_season.get(season, 3.10),
+            'league_hitting': league_stats_by_season.get(season),
+            'league_n_era': league_n_era_by_season.get(season, 0),
+            'team_n_era': team_n_era_by_season.get(season, {}),
+            'neutral_stats': neutral_stats_df[neutral_stats_df['Season'] == season] if not neutral_stats_df.empty else pd.DataFrame(),
+            'achievements': game_achievements_df[game_achievements_df['Season'] == season],
+            'decisions': regular_pitcher_stats_agg[regular_pitcher_stats_agg['Season'] == season],
+        }
+        season_keys[season] = get_key(
+            stats_source, season_digests[season], get_frame_digest(player_types_df),
+            {name: get_frame_digest(table) if isinstance(table, pd.DataFrame) else table for name, table in season_tables.items()}
+        )
+        cache_paths = [os.path.join(cache_dir, f'{stat_name}_{season}.csv') for stat_name in SEASON_STATS_NAMES]
+
+        if stage_cache.is_fresh(f'season_stats/{season}', season_keys[season], cache_paths):
+            stats_by_season[season] = tuple(pd.read_csv(path, float_precision='round_trip') for path in cache_paths)
         else:
-            # --- Hitting Stats Calculation ---
-            hitter_records = []
-            for (hitter_id), group_df in season_leaderboard_df.groupby('Hitter ID'):
-                teams = group_df['Batter Team'].unique()
-                
-                # Calculate combined stats for the season
-                stats_series = calculate_hitting_stats(group_df, season=season)
-                if stats_series is not None:
-                    stats_series['Season'] = season
-                    stats_series['Hitter ID'] = hitter_id
-                    stats_series['Team'] = f"{len(teams)}TM" if len(teams) > 1 else teams[0]
-                    stats_series['is_sub_row'] = False
-                    stats_series['Last Team'] = group_df.sort_values('Session').iloc[-1]['Batter Team']
-                    hitter_records.append(stats_series)
-
-                    # If traded, calculate stats for each team
-                    if len(teams) > 1:
-                        for team in teams:
-                            team_df = group_df[group_df['Batter Team'] == team]
-                            team_stats_series = calculate_hitting_stats(team_df, season=season)
-                            if team_stats_series is not None:
-                                team_stats_series['Season'] = season
-                                team_stats_series['Hitter ID'] = hitter_id
-                                team_stats_series['Team'] = team
-                                team_stats_series['is_sub_row'] = True
-                                team_stats_series['Last Team'] = team
-                                hitter_records.append(team_stats_series)
-
-            season_hitting_stats = pd.DataFrame(hitter_records)
-
-            # --- Pitching Stats Calculation ---
-            pitcher_records = []
-            for (pitcher_id), group_df in season_leaderboard_df.groupby('Pitcher ID'):
-                teams = group_df['Pitcher Team'].unique()
-
-                # Calculate combined stats for the season
-                stats_series = calculate_pitching_stats(group_df, season=season)
-                if stats_series is not None:
-                    stats_series['Season'] = season
-                    stats_series['Pitcher ID'] = pitcher_id
-                    stats_series['Team'] = f"{len(teams)}TM" if len(teams) > 1 else teams[0]
-                    stats_series['is_sub_row'] = False
-                    stats_series['Last Team'] = group_df.sort_values('Session').iloc[-1]['Pitcher Team']
-                    pitcher_records.append(stats_series)
-
-                    # If traded, calculate stats for each team
-                    if len(teams) > 1:
-                        for team in teams:
-                            team_df = group_df[group_df['Pitcher Team'] == team]
-                            team_stats_series = calculate_pitching_stats(team_df, season=season)
-                            if team_stats_series is not None:
-                                team_stats_series['Season'] = season
-                                team_stats_series['Pitcher ID'] = pitcher_id
-                                team_stats_series['Team'] = team
-                                team_stats_series['is_sub_row'] = True
-                                team_stats_series['Last Team'] = team
-                                pitcher_records.append(team_stats_series)
-            season_pitching_stats = pd.DataFrame(pitcher_records)
-
-            # --- Merge additional pitching stats ---
-            if not season_pitching_stats.empty:
-                fip_constant = fip_constants_by_season.get(season, 3.10)
-                season_pitching_stats['FIP'] = ((13 * season_pitching_stats['HR']) + (3 * season_pitching_stats['BB']) - (2 * season_pitching_stats['K'])) / season_pitching_stats['IP'] + fip_constant
-                season_neutral_stats = neutral_stats_df[neutral_stats_df['Season'] == season] if not neutral_stats_df.empty else pd.DataFrame()
-                season_achievements = game_achievements_df[game_achievements_df['Season'] == season]
-                season_decisions = regular_pitcher_stats_agg[regular_pitcher_stats_agg['Season'] == season]
-
-                if not season_neutral_stats.empty:
-                    season_pitching_stats = season_pitching_stats.merge(season_neutral_stats, on=['Season', 'Pitcher ID', 'Team'], how='left')
-                if not season_achievements.empty:
-                    season_pitching_stats = season_pitching_stats.merge(season_achievements, on=['Season', 'Pitcher ID', 'Team'], how='left')
-                if not season_decisions.empty: 
-                    season_pitching_stats = season_pitching_stats.merge(season_decisions, on=['Season', 'Pitcher ID', 'Team'], how='left')
-
-                stats_to_sum = ['W', 'L', 'SV', 'HLD', 'GS', 'GF', 'CG', 'SHO']
-                for col in stats_to_sum:
-                    if col not in season_pitching_stats.columns:
-                        season_pitching_stats[col] = 0
-                season_pitching_stats[stats_to_sum] = season_pitching_stats[stats_to_sum].fillna(0)
-
-                traded_player_ids = season_pitching_stats[season_pitching_stats['is_sub_row'] == True]['Pitcher ID'].unique()
-                for pid in traded_player_ids:
-                    player_mask = season_pitching_stats['Pitcher ID'] == pid
-                    total_row_idx = season_pitching_stats.index[player_mask & (season_pitching_stats['is_sub_row'] == False)]
-                    if len(total_row_idx) > 0:
-                        team_rows = season_pitching_stats[player_mask & (season_pitching_stats['is_sub_row'] == True)]
-                        season_pitching_stats.loc[total_row_idx, stats_to_sum] = team_rows[stats_to_sum].sum().values
-
-                if 'W' in season_pitching_stats.columns and 'L' in season_pitching_stats.columns:
-                    season_pitching_stats['W-L%'] = (season_pitching_stats['W'] / (season_pitching_stats['W'] + season_pitching_stats['L'])).fillna(0)
-
-            # --- WAR Calculation ---
-            if not season_hitting_stats.empty and not season_pitching_stats.empty:
-                # WAR is based on the total number of games played in a season.
-                num_total_games = season_leaderboard_df['Game ID'].nunique()
-
-                if num_total_games > 0:
-                    # The league generates 0.41 WAR per game, so we use that as our constant.
-                    total_war_season = num_total_games * 0.41
-                    runs_per_win = 10
-                    total_rar_season = total_war_season * runs_per_win
-
-                    # Hitting WAR
-                    total_pa_season = season_hitting_stats['PA'].sum()
-                    if total_pa_season > 0:
-                        total_rar_h = total_rar_season / 2
-                        runs_per_pa_replacement_h = total_rar_h / total_pa_season
-                        season_hitting_stats['WAR'] = (season_hitting_stats['RE24'] + runs_per_pa_replacement_h * season_hitting_stats['PA']) / runs_per_win
-                    else:
-                        season_hitting_stats['WAR'] = 0
-
-                    # Pitching WAR
-                    total_bf_season = season_pitching_stats['BF'].sum()
-                    if total_bf_season > 0:
-                        total_rar_p = total_rar_season / 2
-                        runs_per_bf_replacement_p = total_rar_p / total_bf_season
-                        season_pitching_stats['WAR'] = (-season_pitching_stats['RE24'] + runs_per_bf_replacement_p * season_pitching_stats['BF']) / runs_per_win
-                    else:
-                        season_pitching_stats['WAR'] = 0
-                else:
-                    season_hitting_stats['WAR'] = 0
-                    season_pitching_stats['WAR'] = 0
-            
-            # --- Cache Results ---
-            if not season_hitting_stats.empty:
-                season_hitting_stats.to_csv(hitting_cache_path, index=False)
-            if not season_pitching_stats.empty:
-                season_pitching_stats.to_csv(pitching_cache_path, index=False)
-
-            # --- Team Hitting Stats Calculation ---
-            team_hitting_records = []
-            if not season_hitting_stats.empty:
-                source_hitting_df = season_hitting_stats[~season_hitting_stats['Team'].str.contains("TM")].copy()
-                league_stats_for_season = league_stats_by_season.get(season)
-                for team, team_df in source_hitting_df.groupby('Team'):
-                    team_stats_series = calculate_team_hitting_stats(team_df, league_stats_for_season)
-                    team_stats_series['Season'] = season
-                    team_stats_series['Team'] = team
-                    team_hitting_records.append(team_stats_series)
-            season_team_hitting_stats = pd.DataFrame(team_hitting_records)
-            if not season_team_hitting_stats.empty:
-                team_games = season_leaderboard_df.groupby('Batter Team')['Session'].nunique()
-                season_team_hitting_stats['G'] = season_team_hitting_stats['Team'].map(team_games)
-
-            # --- Team Pitching Stats Calculation ---
-            team_pitching_records = []
-            if not season_pitching_stats.empty:
-                source_pitching_df = season_pitching_stats[~season_pitching_stats['Team'].str.contains("TM")].copy()
-                league_n_era_for_season = league_n_era_by_season.get(season, 0)
-                fip_constant_for_season = fip_constants_by_season.get(season, 3.10)
-
-                season_team_neutral_pitching_stats = {}
-                re_matrix = run_expectancy_by_season.get(season, {})
-                if re_matrix:
-                    for team, team_df in season_leaderboard_df.groupby('Pitcher Team'):
-                        neutral_stats = calculate_neutral_pitching_stats(team_df, re_matrix)
-                        n_ip = neutral_stats['nOuts'] / 3
-                        n_era = (neutral_stats['nRuns'] * 6) / n_ip if n_ip > 0 else 0
-                        season_team_neutral_pitching_stats[team] = n_era
-                
-                for team, team_df in source_pitching_df.groupby('Team'):
-                    team_n_era = season_team_neutral_pitching_stats.get(team, 0)
-                    team_stats_series = calculate_team_pitching_stats(team_df, league_n_era_for_season, team_n_era, fip_constant_for_season)
-                    team_stats_series['Season'] = season
-                    team_stats_series['Team'] = team
-                    team_pitching_records.append(team_stats_series)
-            season_team_pitching_stats = pd.DataFrame(team_pitching_records)
-
-            # --- Cache Team Stats ---
-            if not season_team_hitting_stats.empty:
-                season_team_hitting_stats.to_csv(team_hitting_cache_path, index=False)
-            if not season_team_pitching_stats.empty:
-                season_team_pitching_stats.to_csv(team_pitching_cache_path, index=False)
-
-        all_seasons_hitting_stats.append(season_hitting_stats)
-        all_seasons_pitching_stats.append(season_pitching_stats)
-        all_seasons_team_hitting_stats.append(season_team_hitting_stats)
-        all_seasons_team_pitching_stats.append(season_team_pitching_stats)
+            season_leaderboard_df = leaderboard_df[leaderboard_df['Season'] == season]
+            season_tasks.append((season, season_leaderboard_df, player_types_df, season_tables))
+
+    if season_tasks:
+        print(f"Building stats for {len(season_tasks)} season(s)...")
+    for (season, _, _, _), season_stats in zip(season_tasks, run_partitions(build_season_stats, season_tasks, args.workers)):
+        stats_by_season[season] = season_stats
+
+        # --- Cache Results ---
+        for stats_df, stat_name in zip(season_stats, SEASON_STATS_NAMES):
+            if not stats_df.empty:
+                stats_df.to_csv(os.path.join(cache_dir, f'{stat_name}_{season}.csv'), index=False)
+        if not any(stats_df.empty for stats_df in season_stats):
+            stage_cache.record(f'season_stats/{season}', season_keys[season])
+    stage_cache.save()
+
+    all_seasons_hitting_stats = [stats_by_season[season][0] for season in sorted_seasons]
+    all_seasons_pitching_stats = [stats_by_season[season][1] for season in sorted_seasons]
+    all_seasons_team_hitting_stats = [stats_by_season[season][2] for season in sorted_seasons]
+    all_seasons_team_pitching_stats = [stats_by_season[season][3] for season in sorted_seasons]
+    profiler.end(rows_out=sum(len(stats_df) for season_stats in stats_by_season.values() for stats_df in season_stats))
 
     # --- Final Assembly ---
+    profiler.begin('postprocessing')
     all_hitting_stats = pd.concat(all_seasons_hitting_stats, ignore_index=True)
     all_pitching_stats = pd.concat(all_seasons_pitching_stats, ignore_index=True)
 
@@ -2614,18 +2789,8 @@ def main():
         league_n_era_for_season = league_n_era_by_season.get(season, 0)
         fip_constant_for_season = fip_constants_by_season.get(season, 3.10)
         
-        # Recalculate team neutral ERA for the season
-        season_leaderboard_df = leaderboard_df[leaderboard_df['Season'] == season]
-        season_team_neutral_pitching_stats = {}
-        re_matrix = run_expectancy_by_season.get(season, {})
-        if re_matrix:
-            # Check if 'Pitcher Team' exists and is not empty to avoid errors on empty df
-            if 'Pitcher Team' in season_leaderboard_df.columns and not season_leaderboard_df['Pitcher Team'].dropna().empty:
-                for team, team_df in season_leaderboard_df.groupby('Pitcher Team'):
-                    neutral_stats = calculate_neutral_pitching_stats(team_df, re_matrix)
-                    n_ip = neutral_stats['nOuts'] / 3
-                    n_era = (neutral_stats['nRuns'] * 6) / n_ip if n_ip > 0 else 0
-                    season_team_neutral_pitching_stats[team] = n_era
+        # Team neutral ERA for the season, summed from the neutral inning segments
+        season_team_neutral_pitching_stats = team_n_era_by_season.get(season, {})
         
         # Get the source data for team aggregation
         source_pitching_df = season_pitching_stats[~season_pitching_stats['Team'].str.contains("TM")].copy()
@@ -2648,6 +2813,7 @@ def main():
         all_hitting_stats['OPS+'] = all_hitting_stats.apply(calculate_ops_plus_for_row, axis=1, league_stats_by_season=league_stats_by_season)
 
     # --- Career Stats Calculation ---
+    profiler.begin('career_stats', rows_in=len(all_hitting_stats) + len(all_pitching_stats))
     print("Calculating career stats...")
     # Hitting
     career_hitting_stats = all_hitting_stats[all_hitting_stats['is_sub_row'] == False].groupby('Hitter ID').apply(lambda df: calculate_career_hitting_stats(df, league_stats_by_season), include_groups=False).reset_index()
@@ -2659,8 +2825,10 @@ def main():
     career_pitching_stats['Season'] = 'Career'
     all_pitching_stats = pd.concat([all_pitching_stats, career_pitching_stats], ignore_index=True)
     print("Career stats calculated.")
+    profiler.end(rows_out=len(all_hitting_stats) + len(all_pitching_stats))
 
     # --- Franchise Totals Calculation ---
+    profiler.begin('franchise_totals')
     print("Calculating franchise totals...")
     output_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'docs', 'data')
     team_history_path = os.path.join(output_dir, 'team_history.json')
@@ -2722,8 +2890,10 @@ def main():
             all_pitching_stats = pd.concat([all_pitching_stats, franchise_pitching_stats], ignore_index=True)
     
     print("Franchise totals calculated.")
+    profiler.end()
 
     # --- Type Totals Calculation ---
+    profiler.begin('type_totals')
     print("Calculating type totals...")
     # Hitting
     if not all_hitting_stats.empty:
@@ -2762,9 +2932,11 @@ def main():
             all_pitching_stats = pd.concat([all_pitching_stats, type_pitching_stats], ignore_index=True)
     
     print("Type totals calculated.")
+    profiler.end()
 
 
     # --- Update Glossary with RE Matrix ---
+    profiler.begin('glossary')
     print("Updating glossary with RE Matrix...")
     output_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'docs', 'data')
     glossary_path = os.path.join(output_dir, 'glossary.json')
@@ -2782,18 +2954,21 @@ def main():
                 # Add the new one
                 glossary_data['RE24']['sections'].append(re_matrix_section)
                 
-                with open(glossary_path, 'w') as f:
-                    json.dump(glossary_data, f, indent=4)
-                print("Glossary updated successfully.")
+                if exporter.write_json('glossary.json', glossary_data, indent=4):
+                    print("Glossary updated successfully.")
+                else:
+                    print("Glossary is unchanged.")
 
     except (FileNotFoundError, json.JSONDecodeError) as e:
         print(f"Warning: Could not update glossary.json. Error: {e}")
 
 
     _write_cache_manifest(cache_dir, most_recent_season)
+    profiler.end()
     print("Calculations complete.")
 
     # --- EXPORTING DATA ---
+    profiler.begin('export')
     print("Exporting data for web app...")
     output_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'docs', 'data')
     if not os.path.exists(output_dir): os.makedirs(output_dir)
@@ -2808,31 +2983,34 @@ def main():
         'season': most_recent_season if most_recent_season else None,
         'session': int(max_session) if max_session > 0 else 1
     }
-    with open(os.path.join(output_dir, 'current_season_info.json'), 'w') as f:
-        json.dump(current_season_info, f, indent=2)
+    exporter.write_json('current_season_info.json', current_season_info, indent=2)
 
     # Save player ID map
-    with open(os.path.join(output_dir, 'player_id_map.json'), 'w') as f:
-        json.dump(player_id_map, f, indent=4)
+    exporter.write_json('player_id_map.json', player_id_map, indent=4)
 
     # Save main stats
-    all_hitting_stats.replace([float('inf'), float('-inf')], None, inplace=True)
-    all_hitting_stats = all_hitting_stats.astype(object).where(pd.notna(all_hitting_stats), None)
-    hitting_data = {
-        "columns": all_hitting_stats.columns.tolist(),
-        "data": all_hitting_stats.values.tolist()
-    }
-    with open(os.path.join(output_dir, 'hitting_stats.json'), 'w') as f:
-        json.dump(hitting_data, f, indent=2)
-
-    all_pitching_stats.to_json(os.path.join(output_dir, 'pitching_stats.json'), orient='split', index=False)
+    if args.sharded:
+        # Leaderboards and team pages read the indexes; a player page fetches only that player's file.
+        compact_stats = {'hitting': to_compact_data(all_hitting_stats), 'pitching': to_compact_data(all_pitching_stats)}
+        for name, compact in compact_stats.items():
+            write_stats_index(exporter, name, compact)
+        num_shards = write_player_shards(exporter, all_hitting_stats, all_pitching_stats, compact_stats)
+        print(f"  Wrote the stats indexes and {num_shards} player files.")
+    else:
+        for name, stats_df in [('hitting', all_hitting_stats), ('pitching', all_pitching_stats)]:
+            exporter.write_json(f'{name}_stats.json', to_compact_data(stats_df), separators=(',', ':'))
+        write_shards(exporter, 'players', {})
+    # The other mode's files would be stale (and the app prefers the indexes when they exist)
+    stale_files = ['hitting_stats.json', 'pitching_stats.json'] if args.sharded else ['hitting_index.json', 'pitching_index.json', 'hitting_totals.json', 'pitching_totals.json']
+    for file_name in stale_files:
+        exporter.remove(file_name)
 
     if not all_team_hitting_stats.empty:
         all_team_hitting_stats_for_json = all_team_hitting_stats.copy()
         for col in all_team_hitting_stats_for_json.columns:
             if all_team_hitting_stats_for_json[col].dtype == 'float64':
                 all_team_hitting_stats_for_json[col] = all_team_hitting_stats_for_json[col].round(3)
-        all_team_hitting_stats_for_json.to_json(os.path.join(output_dir, 'team_hitting_stats.json'), orient='split', index=False)
+        exporter.write_text('team_hitting_stats.json', all_team_hitting_stats_for_json.to_json(orient='split', index=False))
 
     if not all_team_pitching_stats.empty:
         all_team_pitching_stats_for_json = all_team_pitching_stats.copy()
@@ -2841,23 +3019,59 @@ def main():
         for col in all_team_pitching_stats_for_json.columns:
             if all_team_pitching_stats_for_json[col].dtype == 'float64':
                 all_team_pitching_stats_for_json[col] = all_team_pitching_stats_for_json[col].round(3)
-        all_team_pitching_stats_for_json.to_json(os.path.join(output_dir, 'team_pitching_stats.json'), orient='split', index=False)
+        exporter.write_text('team_pitching_stats.json', all_team_pitching_stats_for_json.to_json(orient='split', index=False))
 
     # --- Scouting Reports ---
+    profiler.begin('scouting_reports', rows_in=len(combined_df))
     print("Generating scouting reports...")
     scouting_reports = {}
+    # Reports are cached per pitcher and only rebuilt for pitchers with new (or changed) plays. The stage
+    # cache keeps only the keys; an unchanged report is read back from its exported file.
+    scouting_source = get_source_digest('generate_web_data.py')
+    pitcher_digests = get_group_digests(combined_df, 'Pitcher ID', SCOUTING_REPORT_COLUMNS)
+    cached_keys = stage_cache.load_item_keys('scouting_reports')
+    report_keys = {}
+    num_reused = 0
     all_pitcher_ids = combined_df['Pitcher ID'].unique()
     for pitcher_id in all_pitcher_ids:
         if pitcher_id <= 0: continue
-        pitcher_df = combined_df[combined_df['Pitcher ID'] == pitcher_id]
-        report = get_scouting_report_data(pitcher_id, pitcher_df)
+        pitcher_id = int(pitcher_id)
+        key = get_key(scouting_source, pitcher_digests[pitcher_id])
+        report_file = f'scouting/{pitcher_id}.json'
+        report = None
+        if cached_keys.get(str(pitcher_id)) == key and exporter.exists(report_file):
+            try:
+                with open(exporter.path(report_file), 'r') as f:
+                    report = json.load(f)
+                num_reused += 1
+            except (json.JSONDecodeError, IOError):
+                report = None
+        if report is None:
+            pitcher_df = combined_df[combined_df['Pitcher ID'] == pitcher_id]
+            report = get_scouting_report_data(pitcher_id, pitcher_df)
         if report:
-            scouting_reports[int(pitcher_id)] = report
-    
-    output_path = os.path.join(output_dir, 'scouting_reports.json')
-    with open(output_path, 'w') as f:
-        json.dump(scouting_reports, f)
+            scouting_reports[pitcher_id] = report
+            report_keys[pitcher_id] = key
+    stage_cache.save_item_keys('scouting_reports', report_keys)
+    print(f"  Reused {num_reused} unchanged scouting reports, rebuilt {len(scouting_reports) - num_reused}.")
+
+    # One file per pitcher, fetched when their report is opened, plus the list of pitchers that have one
+    write_shards(exporter, 'scouting', scouting_reports)
+    exporter.write_json('scouting_manifest.json', sorted(scouting_reports))
+
+    profiler.end(rows_out=len(scouting_reports))
+
+    profiler.begin('build_manifest')
+    manifest = write_build_manifest(exporter)
+    print(f"Wrote the build manifest for {len(manifest)} datasets.")
+    profiler.end(rows_out=len(manifest))
+
+    exporter.save()
+    exporter.print_summary()
 
+    _write_cache_manifest(cache_dir, last_build_inputs=input_fingerprint)
+    profiler.print_summary()
+    profiler.write(os.path.join(output_dir, 'build_profile.json'), arguments=vars(args), seasons=sorted_seasons, plays=len(combined_df))
     print("Done!")
 
 if __name__ == "__main__":
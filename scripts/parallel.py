@@ -0,0 +1,30 @@
+"""
+Runs independent partitions of the build (games, seasons) in a pool of worker processes.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+def get_default_workers():
+    """One worker per core."""
+    return os.cpu_count() or 1
+
+def get_partition_columns(df, positions, columns):
+    """
+    The given columns of df's rows at `positions`, as {column: array}.
+
+    Workers get these arrays instead of a pickled DataFrame, so only the columns a stage reads are sent.
+    """
+    return {col: df[col].array.take(positions) for col in columns}
+
+def run_partitions(func, tasks, workers=1):
+    """
+    Returns [func(*task) for task in tasks], running the tasks in up to `workers` processes.
+
+    Results come back in task order whatever order the workers finish in, so merging them is deterministic.
+    With one worker, or a single task, everything runs in this process. func must be a module-level function.
+    """
+    tasks = list(tasks)
+    if workers <= 1 or len(tasks) <= 1:
+        return [func(*task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as executor:
+        return list(executor.map(func, *zip(*tasks)))
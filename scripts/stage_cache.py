@@ -0,0 +1,108 @@
+"""
+Keys for the build's cached artifacts (RE matrices, per-game results, season stats, scouting reports).
+
+An artifact's key is a digest of the slice of data it is computed from plus the source of the modules
+that compute it. It is reused only while that key is unchanged, so editing the rulebook, a correction
+table or a stat formula rebuilds exactly the artifacts that were built with the old code or data.
+"""
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+
+def get_source_digest(*file_names):
+    """Digest of the given files in scripts/ (e.g. 'game_processing.py')."""
+    digest = hashlib.sha256()
+    for file_name in file_names:
+        with open(os.path.join(script_dir, file_name), 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+def get_row_hashes(df, columns=None):
+    """One 64-bit hash per row of df over `columns` (default: all of them; missing ones are skipped)."""
+    if columns is not None:
+        df = df[[col for col in columns if col in df.columns]]
+    return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+def get_frame_digest(df, columns=None):
+    """Digest of df's values, in row order, over `columns` (default: all of them)."""
+    if df is None:
+        return None
+    digest = hashlib.sha256(json.dumps([str(col) for col in (columns or df.columns)]).encode('utf-8'))
+    digest.update(get_row_hashes(df, columns).tobytes())
+    return digest.hexdigest()
+
+def get_group_digests(df, keys, columns=None):
+    """{group: digest} over the rows of each group of df.groupby(keys), in row order."""
+    row_hashes = get_row_hashes(df, columns)
+    return {
+        group: hashlib.sha256(row_hashes[positions].tobytes()).hexdigest()
+        for group, positions in df.groupby(keys).indices.items()
+    }
+
+def get_key(*parts):
+    """Combines digests and plain values (numbers, strings, lists and dicts of them) into one key."""
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+class StageCache:
+    """
+    The key each cached artifact was last built with, kept in data/cache/stage_cache.json.
+
+    An artifact is fresh while its files exist and its recorded key matches the key of the current
+    inputs. A disabled cache never reports anything as fresh, but still records the new keys, so the
+    next run can reuse what this one built.
+    """
+    def __init__(self, cache_dir, enabled=True):
+        self.path = os.path.join(cache_dir, 'stage_cache.json')
+        self.enabled = enabled
+        self.keys = {}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r') as f:
+                    self.keys = json.load(f)
+            except (json.JSONDecodeError, IOError):
+                self.keys = {}
+
+    def is_fresh(self, artifact, key, paths=()):
+        return self.enabled and self.keys.get(artifact) == key and all(os.path.exists(path) for path in paths)
+
+    def record(self, artifact, key):
+        self.keys[artifact] = key
+
+    def _items_path(self, artifact):
+        return os.path.join(os.path.dirname(self.path), 'stage_items', f'{artifact}.json')
+
+    def load_item_keys(self, artifact):
+        """
+        For artifacts cached item by item (one scouting report per pitcher...): {item: key} as last saved,
+        or {} for a disabled cache. Only the keys are kept here; the results are the items' exported files.
+        Items are JSON object keys, so always strings.
+        """
+        path = self._items_path(artifact)
+        if not self.enabled or not os.path.exists(path):
+            return {}
+        try:
+            with open(path, 'r') as f:
+                return {item: key for item, key in json.load(f).items() if isinstance(key, str)}
+        except (json.JSONDecodeError, IOError, AttributeError):
+            return {}
+
+    def save_item_keys(self, artifact, item_keys):
+        """Saves {item: key}, replacing everything saved for the artifact before."""
+        path = self._items_path(artifact)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            with open(path, 'w') as f:
+                json.dump({str(item): key for item, key in item_keys.items()}, f, indent=1, sort_keys=True)
+        except IOError:
+            print(f"Warning: Could not write the stage cache for {artifact}.")
+
+    def save(self):
+        try:
+            with open(self.path, 'w') as f:
+                json.dump(self.keys, f, indent=1, sort_keys=True)
+        except IOError:
+            print("Warning: Could not write the stage cache keys.")
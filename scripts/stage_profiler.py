@@ -0,0 +1,103 @@
+"""
+Times the stages of a build (wall and CPU time, peak memory, rows in and out) and writes them to build_profile.json.
+"""
+import cProfile
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+try:
+    import resource
+except ImportError: # Not available on Windows; peak memory is left out there
+    resource = None
+
+def _peak_rss_mb():
+    """Peak resident memory of this process so far, in MB."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def _cpu_seconds():
+    """CPU time of this process and of the worker processes it has finished waiting for."""
+    times = os.times()
+    return times.user + times.system + times.children_user + times.children_system
+
+class StageProfiler:
+    """
+    Records named stages of a build. Call begin() as a stage starts and end() once it is done; begin()
+    also ends the stage before it. A disabled profiler records nothing, so the calls can stay in place.
+
+    With cprofile_dir set, each stage also runs under cProfile and is dumped to <cprofile_dir>/<NN>_<stage>.prof.
+    """
+    def __init__(self, enabled=False, cprofile_dir=None):
+        self.enabled = enabled
+        self.cprofile_dir = cprofile_dir if enabled else None
+        self.stages = []
+        self.started_at = datetime.now(timezone.utc)
+        self.start_time = time.perf_counter()
+        self._current = None
+
+    def begin(self, name, rows_in=None):
+        if not self.enabled:
+            return
+        self.end()
+        self._current = {
+            'name': name,
+            'rows_in': rows_in,
+            'wall_start': time.perf_counter(),
+            'cpu_start': _cpu_seconds(),
+            'peak_rss_start': _peak_rss_mb(),
+            'profile': None,
+        }
+        if self.cprofile_dir:
+            self._current['profile'] = cProfile.Profile()
+            self._current['profile'].enable()
+
+    def end(self, rows_out=None):
+        if not self.enabled or self._current is None:
+            return
+        current, self._current = self._current, None
+        if current['profile']:
+            current['profile'].disable()
+            os.makedirs(self.cprofile_dir, exist_ok=True)
+            current['profile'].dump_stats(os.path.join(self.cprofile_dir, f"{len(self.stages) + 1:02d}_{current['name']}.prof"))
+
+        peak_rss = _peak_rss_mb()
+        self.stages.append({
+            'name': current['name'],
+            'wall_seconds': round(time.perf_counter() - current['wall_start'], 3),
+            'cpu_seconds': round(_cpu_seconds() - current['cpu_start'], 3),
+            'peak_rss_mb': round(peak_rss, 1) if peak_rss is not None else None,
+            'peak_rss_delta_mb': round(peak_rss - current['peak_rss_start'], 1) if peak_rss is not None else None,
+            'rows_in': current['rows_in'],
+            'rows_out': rows_out,
+        })
+
+    def print_summary(self):
+        if not self.enabled:
+            return
+        self.end()
+        print(f"{'Stage':<24} {'Wall (s)':>9} {'CPU (s)':>9} {'Peak MB':>9} {'+MB':>7} {'Rows in':>9} {'Rows out':>9}")
+        for stage in self.stages:
+            values = [stage['wall_seconds'], stage['cpu_seconds'], stage['peak_rss_mb'], stage['peak_rss_delta_mb'], stage['rows_in'], stage['rows_out']]
+            widths = [9, 9, 9, 7, 9, 9]
+            print(f"{stage['name']:<24} " + ' '.join(f"{'' if value is None else value:>{width}}" for value, width in zip(values, widths)))
+        print(f"{'total':<24} {round(time.perf_counter() - self.start_time, 3):>9}")
+
+    def write(self, path, **build_info):
+        """Writes the recorded stages, plus any build_info (arguments, seasons...), as JSON."""
+        if not self.enabled:
+            return
+        self.end()
+        report = {
+            'started_at': self.started_at.isoformat(timespec='seconds'),
+            'total_wall_seconds': round(time.perf_counter() - self.start_time, 3),
+            **build_info,
+            'stages': self.stages,
+        }
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=2)
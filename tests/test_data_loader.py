@@ -0,0 +1,157 @@
+"""
+Tests the gamelog download stage (data_loader._fetch_export / fetch_exports) against a local HTTP server
+serving CSV fixtures, including conditional requests, retries on 503/429, timeouts and 404s, and the
+typing of loaded gamelogs (apply_gamelog_schema).
+
+Run with: python -m pytest tests (or python -m unittest discover tests)
+"""
+import os
+import sys
+import threading
+import time
+import unittest
+import urllib.error
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+tests_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(tests_dir, '..', 'scripts'))
+
+import pandas as pd
+
+from data_loader import UnknownResultError, _fetch_export, apply_gamelog_schema, fetch_exports
+
+with open(os.path.join(tests_dir, 'fixtures', 'gamelog_S1.csv'), 'rb') as f:
+    FIXTURE_CSV = f.read()
+FIXTURE_ETAG = '"gamelog-s1-v1"'
+SLOW_SECONDS = 1.0
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """
+    /S1.csv: the fixture, with an ETag (304 when it matches If-None-Match)
+    /flaky.csv: 503 on the first two requests, then the fixture
+    /limited.csv: 429 on the first request, then the fixture
+    /down.csv: always 503
+    /missing.csv: 404
+    /slow.csv: answers after SLOW_SECONDS
+    """
+    requests = Counter()
+
+    def do_GET(self):
+        path = self.path
+        FixtureHandler.requests[path] += 1
+        count = FixtureHandler.requests[path]
+        if path == '/S1.csv':
+            if self.headers.get('If-None-Match') == FIXTURE_ETAG:
+                self.send_response(304)
+                self.end_headers()
+                return
+            self._send_fixture()
+        elif path == '/flaky.csv':
+            self._send_fixture() if count > 2 else self.send_error(503)
+        elif path == '/limited.csv':
+            self._send_fixture() if count > 1 else self.send_error(429)
+        elif path == '/down.csv':
+            self.send_error(503)
+        elif path == '/slow.csv':
+            time.sleep(SLOW_SECONDS)
+            self._send_fixture()
+        else:
+            self.send_error(404)
+
+    def _send_fixture(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/csv')
+        self.send_header('Content-Length', str(len(FIXTURE_CSV)))
+        self.send_header('ETag', FIXTURE_ETAG)
+        self.end_headers()
+        self.wfile.write(FIXTURE_CSV)
+
+    def log_message(self, format, *args):
+        pass
+
+class FetchExportTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), FixtureHandler)
+        cls.server.daemon_threads = True
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = f'http://127.0.0.1:{cls.server.server_address[1]}'
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        FixtureHandler.requests.clear()
+
+    def fetch(self, path, **kwargs):
+        kwargs.setdefault('backoff', 0.01)
+        return _fetch_export(self.base_url + path, **kwargs)
+
+    def test_download_returns_content_and_validators(self):
+        content, validators = self.fetch('/S1.csv')
+        self.assertEqual(content, FIXTURE_CSV)
+        self.assertEqual(validators['etag'], FIXTURE_ETAG)
+        self.assertEqual(FixtureHandler.requests['/S1.csv'], 1)
+
+    def test_not_modified_returns_no_content(self):
+        content, validators = self.fetch('/S1.csv', validators={'etag': FIXTURE_ETAG, 'last_modified': None})
+        self.assertIsNone(content)
+        self.assertEqual(validators['etag'], FIXTURE_ETAG)
+
+    def test_retries_server_errors(self):
+        content, _ = self.fetch('/flaky.csv', retries=3)
+        self.assertEqual(content, FIXTURE_CSV)
+        self.assertEqual(FixtureHandler.requests['/flaky.csv'], 3)
+
+    def test_retries_rate_limiting(self):
+        content, _ = self.fetch('/limited.csv', retries=3)
+        self.assertEqual(content, FIXTURE_CSV)
+        self.assertEqual(FixtureHandler.requests['/limited.csv'], 2)
+
+    def test_gives_up_after_the_last_retry(self):
+        with self.assertRaises(urllib.error.HTTPError) as raised:
+            self.fetch('/down.csv', retries=2)
+        self.assertEqual(raised.exception.code, 503)
+        self.assertEqual(FixtureHandler.requests['/down.csv'], 3)
+
+    def test_does_not_retry_client_errors(self):
+        with self.assertRaises(urllib.error.HTTPError) as raised:
+            self.fetch('/missing.csv', retries=3)
+        self.assertEqual(raised.exception.code, 404)
+        self.assertEqual(FixtureHandler.requests['/missing.csv'], 1)
+
+    def test_retries_timeouts(self):
+        with self.assertRaises((urllib.error.URLError, TimeoutError)):
+            self.fetch('/slow.csv', timeout=SLOW_SECONDS / 5, retries=1)
+        self.assertEqual(FixtureHandler.requests['/slow.csv'], 2)
+
+    def test_fetch_exports_separates_results_and_errors(self):
+        urls = {
+            'S1': self.base_url + '/S1.csv',
+            'S2': self.base_url + '/flaky.csv',
+            'S3': self.base_url + '/missing.csv',
+        }
+        contents, errors = fetch_exports(urls, retries=3, backoff=0.01, validators={'S1': {'etag': FIXTURE_ETAG}})
+        self.assertEqual(sorted(contents), ['S1', 'S2'])
+        self.assertIsNone(contents['S1'][0])
+        self.assertEqual(contents['S2'][0], FIXTURE_CSV)
+        self.assertEqual(list(errors), ['S3'])
+        self.assertEqual(errors['S3'].code, 404)
+
+class GamelogSchemaTests(unittest.TestCase):
+    def test_results_become_categoricals(self):
+        df = apply_gamelog_schema(pd.DataFrame({'Exact Result': ['K', None, 'HR'], 'Old Result': ['K', 'BB', None]}))
+        self.assertEqual(df['Exact Result'].tolist()[::2], ['K', 'HR'])
+        self.assertTrue(pd.isna(df['Exact Result'].iloc[1]))
+        self.assertEqual(df['Old Result'].cat.categories.tolist()[:2], ['', 'HR'])
+
+    def test_unknown_results_fail_the_load(self):
+        with self.assertRaises(UnknownResultError) as raised:
+            apply_gamelog_schema(pd.DataFrame({'Exact Result': ['K', 'Infield Fly'], 'Old Result': ['K', 'PO']}))
+        self.assertIn('Infield Fly', str(raised.exception))
+
+if __name__ == '__main__':
+    unittest.main()
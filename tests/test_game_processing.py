@@ -0,0 +1,163 @@
+"""
+Tests the play engines of game_processing on small hand-written games: the base/out state replay
+(simulate_plate_appearances) and the pitching decisions for all games at once
+(get_pitching_decisions_for_games) against the per-game rules (get_pitching_decisions).
+
+Run with: python -m pytest tests (or python -m unittest discover tests)
+"""
+import os
+import sys
+import unittest
+
+tests_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(tests_dir, '..', 'scripts'))
+
+import pandas as pd
+
+from game_processing import get_pitching_decisions, get_pitching_decisions_for_games, simulate_plate_appearances
+
+HOME, AWAY = 'HOM', 'AWY'
+
+def make_game(game_id, halves, season='S8', session=1):
+    """
+    Plays of one game, from a list of half-innings in order (T1, B1, T2...). Each half-inning lists
+    (pitcher ID, runs, outs) for the pitchers who worked in it: every run is a solo home run, every out
+    a flyout, so the bases are always empty.
+    """
+    rows = []
+    for half_index, pitchers in enumerate(halves):
+        is_top = half_index % 2 == 0
+        inning = f"{'T' if is_top else 'B'}{half_index // 2 + 1}"
+        outs = 0
+        for pitcher_id, runs, num_outs in pitchers:
+            for result in ['HR'] * runs + ['FO'] * num_outs:
+                rows.append({
+                    'Season': season, 'Session': session, 'Game ID': game_id,
+                    'Inning': inning, 'Inning ID': game_id * 100 + half_index, 'Outs': outs, 'OBC': 0,
+                    'Batter Team': AWAY if is_top else HOME, 'Pitcher Team': HOME if is_top else AWAY,
+                    'Hitter ID': 900 + len(rows) % 9, 'Pitcher ID': pitcher_id,
+                    'Exact Result': result, 'Old Result': result, 'Diff': 0, 'PA Type': 0,
+                })
+                outs += result == 'FO'
+    return pd.DataFrame(rows)
+
+# Expected decisions, with the games that produce them
+GAMES = {
+    # The away team scores first, the home team goes ahead in B2 and its starter goes 4 innings.
+    # 103 holds the one-run lead in T5 and 104 saves it in T6.
+    'lead change, hold and save': (make_game(1, [
+        [(101, 1, 3)], [(201, 0, 3)],
+        [(101, 0, 3)], [(201, 2, 3)],
+        [(101, 0, 3)], [(202, 0, 3)],
+        [(101, 0, 3)], [(202, 0, 3)],
+        [(103, 0, 3)], [(202, 0, 3)],
+        [(104, 0, 3)],
+    ]), {'win': 101, 'loss': 201, 'save': 104, 'holds': [103]}),
+    'tie': (make_game(2, [
+        [(101, 1, 3)], [(201, 1, 3)],
+        [(101, 0, 3)], [(201, 0, 3)],
+    ]), {}),
+    # The away starter leads from the first play but gets only 4 outs, so the win goes to the first
+    # reliever with an out; 403 enters with a two-run lead and pitches an inning.
+    'starter short of 10 outs': (make_game(3, [
+        [(301, 2, 3)], [(401, 0, 3)],
+        [(301, 0, 3)], [(401, 0, 1), (402, 0, 2)],
+        [(301, 0, 3)], [(402, 0, 3)],
+        [(301, 0, 3)], [(403, 0, 3)],
+    ]), {'win': 402, 'loss': 301, 'save': 403, 'holds': []}),
+    # A six-run lead is too big for a save unless the finisher pitches 3 innings.
+    'save by 3+ innings': (make_game(4, [
+        [(501, 0, 3)], [(601, 6, 3)],
+        [(501, 0, 3)], [(601, 0, 3)],
+        [(501, 0, 3)], [(601, 0, 3)],
+        [(501, 0, 3)], [(601, 0, 3)],
+        [(502, 0, 3)], [(601, 0, 3)],
+        [(502, 0, 3)], [(601, 0, 3)],
+        [(502, 0, 3)],
+    ]), {'win': 501, 'loss': 601, 'save': 502, 'holds': []}),
+    # ... and too big for a hold
+    'no save or hold for a big lead': (make_game(5, [
+        [(501, 0, 3)], [(601, 6, 3)],
+        [(501, 0, 3)], [(601, 0, 3)],
+        [(501, 0, 3)], [(601, 0, 3)],
+        [(501, 0, 3)], [(601, 0, 3)],
+        [(504, 0, 3)], [(601, 0, 3)],
+        [(503, 0, 3)],
+    ]), {'win': 501, 'loss': 601, 'save': None, 'holds': []}),
+}
+
+def make_plays(season, inning_id, plays):
+    """One half-inning from (hitter ID, pitcher ID, result, OBC before, outs before) per play."""
+    return pd.DataFrame([{
+        'Season': season, 'Inning ID': inning_id, 'Hitter ID': hitter_id, 'Pitcher ID': pitcher_id,
+        'Exact Result': result, 'Old Result': result, 'OBC': obc, 'Outs': outs, 'Diff': 0, 'PA Type': 0,
+    } for hitter_id, pitcher_id, result, obc, outs in plays])
+
+class PlateAppearanceReplayTests(unittest.TestCase):
+    def replay(self, plays_df):
+        states = simulate_plate_appearances(plays_df)
+        self.assertTrue(states.index.equals(plays_df.index))
+        return states
+
+    def test_runners_are_carried_through_an_inning(self):
+        # Pitcher 51 puts 11 and 12 on, they double steal, and 52 takes over before either scores.
+        states = self.replay(make_plays('S8', 1, [
+            (11, 51, '1B', 0, 0),
+            (12, 51, '1B', 1, 0),
+            (11, 51, 'MSTEAL 3B', 4, 0),
+            (13, 52, 'FO', 6, 0),
+            (14, 52, '2B', 2, 1),
+            (15, 52, 'K', 2, 1),
+            (16, 52, 'HR', 2, 2),
+            (17, 52, 'PO', 0, 2),
+        ]))
+        self.assertEqual(states['OBC After'].tolist(), [1, 4, 6, 2, 2, 2, 0, 0])
+        self.assertEqual(states['Outs After'].tolist(), [0, 0, 0, 1, 1, 2, 2, 3])
+        self.assertEqual(states['Runs Scored'].tolist(), [0, 0, 0, 1, 1, 0, 2, 0])
+        self.assertEqual(states['Last Play of Inning'].tolist(), [False] * 7 + [True])
+        self.assertEqual(states['Runners Before'].tolist()[2], (12, 11, None))
+        self.assertEqual(states['Scoring Runners'].tolist(), [(), (), (), (11,), (12,), (), (14, 16), ()])
+        self.assertEqual(states['Scoring Pitchers'].tolist(), [(), (), (), (51,), (51,), (), (52, 52), ()])
+
+    def test_pre_s7_groundouts_follow_the_gamelog(self):
+        # With a runner on 3rd, a pre-S7 groundout is "infield in" (the runner holds) when the gamelog's
+        # next OBC still has the runner on 3rd, and "infield back" (the runner scores) otherwise.
+        states = self.replay(make_plays('S5', 1, [
+            (21, 61, '3B', 0, 0),
+            (22, 61, 'RGO', 3, 0),
+            (23, 61, 'RGO', 3, 1),
+            (24, 61, 'K', 0, 2),
+        ]))
+        self.assertEqual(states['OBC After'].tolist(), [3, 3, 0, 0])
+        self.assertEqual(states['Outs After'].tolist(), [0, 1, 2, 3])
+        self.assertEqual(states['Runs Scored'].tolist(), [0, 0, 1, 0])
+        self.assertEqual(states['Scoring Runners'].tolist(), [(), (), (21,), ()])
+
+    def test_innings_are_replayed_separately(self):
+        # Two half-innings given out of order: the runner left on in the first doesn't carry over.
+        plays_df = pd.concat([
+            make_plays('S8', 2, [(31, 71, 'HR', 0, 0)]),
+            make_plays('S8', 1, [(32, 72, '1B', 0, 2), (33, 72, 'K', 1, 2)]),
+        ], ignore_index=True)
+        states = self.replay(plays_df)
+        self.assertEqual(states['Runs Scored'].tolist(), [1, 0, 0])
+        self.assertEqual(states['Scoring Runners'].tolist(), [(31,), (), ()])
+        self.assertEqual(states['Last Play of Inning'].tolist(), [True, False, True])
+
+class PitchingDecisionsTests(unittest.TestCase):
+    def test_per_game_decisions(self):
+        for name, (game_df, expected) in GAMES.items():
+            with self.subTest(name):
+                self.assertEqual(get_pitching_decisions(game_df, 'S8'), expected)
+
+    def test_batch_matches_per_game(self):
+        all_games = pd.concat([game_df for game_df, _ in GAMES.values()], ignore_index=True)
+        decisions = get_pitching_decisions_for_games(all_games)
+        self.assertEqual(len(decisions), len(GAMES))
+        for name, (game_df, _) in GAMES.items():
+            with self.subTest(name):
+                key = ('S8', 1, int(game_df['Game ID'].iloc[0]))
+                self.assertEqual(decisions[key], get_pitching_decisions(game_df, 'S8'))
+
+if __name__ == '__main__':
+    unittest.main()
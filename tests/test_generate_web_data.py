@@ -0,0 +1,136 @@
+"""
+Tests helpers of generate_web_data on small synthetic data: the Markov run expectancy
+(solve_run_expectancy_array) against the inning averages (build_run_expectancy_array), and the compact
+JSON encoding of the stat tables (to_compact_data, slice_compact_data).
+
+Run with: python -m pytest tests (or python -m unittest discover tests)
+"""
+import contextlib
+import io
+import os
+import sys
+import unittest
+from unittest import mock
+
+tests_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(tests_dir, '..', 'scripts'))
+
+import numpy as np
+import pandas as pd
+
+from generate_web_data import (
+    build_run_expectancy_array, get_run_expectancy_matrix, slice_compact_data, solve_run_expectancy_array, to_compact_data,
+)
+
+def make_season(innings):
+    """
+    Plays with the play-state columns already filled in, from a list of half-innings, each a list of
+    (OBC, outs, OBC after, outs after, runs scored) per play. The last play of each list ends the inning.
+    """
+    rows = []
+    for inning_id, plays in enumerate(innings):
+        for i, (obc, outs, obc_after, outs_after, runs) in enumerate(plays):
+            rows.append({
+                'Inning ID': inning_id, 'OBC': obc, 'Outs': outs, 'OBC After': obc_after, 'Outs After': outs_after,
+                'Runs Scored': runs, 'Last Play of Inning': i == len(plays) - 1,
+            })
+    return pd.DataFrame(rows)
+
+# Every inning is logged from its first play to its third out, and each state leads on to the same
+# states whichever inning it is in, so the chain and the inning averages see the same runs.
+FULL_INNINGS = [
+    # Single, strikeout, two-run homer, two strikeouts
+    [(0, 0, 1, 0, 0), (1, 0, 1, 1, 0), (1, 1, 0, 1, 2), (0, 1, 0, 2, 0), (0, 2, 0, 3, 0)],
+    # Three up, three down
+    [(0, 0, 0, 1, 0), (0, 1, 0, 2, 0), (0, 2, 0, 3, 0)],
+    # Double, a groundout moves the runner to 3rd and a sac fly scores them
+    [(0, 0, 2, 0, 0), (2, 0, 3, 1, 0), (3, 1, 0, 2, 1), (0, 2, 0, 3, 0)],
+]
+
+class RunExpectancyTests(unittest.TestCase):
+    def test_markov_matches_inning_averages_on_full_innings(self):
+        season_df = make_season(FULL_INNINGS)
+        solved = solve_run_expectancy_array(season_df)
+        averaged = build_run_expectancy_array(season_df)
+        np.testing.assert_allclose(solved, averaged, equal_nan=True)
+        self.assertAlmostEqual(solved[0, 0], 1.0)
+
+    def test_unseen_states_are_nan(self):
+        solved = solve_run_expectancy_array(make_season(FULL_INNINGS))
+        seen = {(0, 0), (1, 0), (1, 1), (0, 1), (0, 2), (2, 0), (3, 1)}
+        for obc in range(8):
+            for outs in range(3):
+                self.assertEqual(np.isnan(solved[obc, outs]), (obc, outs) not in seen, (obc, outs))
+
+    def test_unsolvable_chain_falls_back_to_inning_averages(self):
+        # An inning cut off mid-way: its last play is not marked, so the bases-loaded state only ever
+        # leads back to itself and I - P is singular.
+        season_df = make_season(FULL_INNINGS)
+        season_df = pd.concat([season_df, pd.DataFrame([{
+            'Inning ID': len(FULL_INNINGS), 'OBC': 7, 'Outs': 2, 'OBC After': 7, 'Outs After': 2,
+            'Runs Scored': 0, 'Last Play of Inning': False,
+        }])], ignore_index=True)
+        with self.assertRaises(np.linalg.LinAlgError):
+            solve_run_expectancy_array(season_df)
+
+        output = io.StringIO()
+        # Keep the matrix out of data/cache
+        with mock.patch.object(pd.DataFrame, 'to_csv'), contextlib.redirect_stdout(output):
+            re_matrix = get_run_expectancy_matrix('S0', season_df, method='markov')
+        self.assertIn('using the inning averages instead', output.getvalue())
+        averaged = build_run_expectancy_array(season_df)
+        expected = {(obc, outs): averaged[obc, outs] for obc in range(8) for outs in range(3) if not np.isnan(averaged[obc, outs])}
+        self.assertEqual(re_matrix, expected)
+
+def decode_compact_data(compact):
+    """Rows of compact data as dicts, the way parseCompactData in docs/app.js reads them."""
+    rows = []
+    for values in compact['data']:
+        row = {}
+        for col, value in zip(compact['columns'], values):
+            if col in compact['dictionaries'] and value is not None:
+                value = compact['dictionaries'][col][value]
+            row[col] = value
+        rows.append(row)
+    return rows
+
+# Numbers already at the precision they are stored with, so encoding doesn't change them
+STATS_DF = pd.DataFrame({
+    'Name': ['Ace', 'Bat', None, 'Ace', 'Cap'],
+    'Team': ['AAA', 'BBB', 'AAA', None, 'CCC'],
+    'is_sub_row': [False, True, True, False, False],
+    'G': [10, 12, 3, 7, 1],
+    'AVG': [0.25, 0.33333, np.nan, 0.3, 0.0],
+    'OPS': [0.75, None, 1.25, None, 0.5],
+    'ERA': [3.5, np.inf, 0.0, 12.0, 4.125],
+})
+
+class CompactDataTests(unittest.TestCase):
+    def expected_rows(self, positions, columns):
+        expected = STATS_DF.iloc[positions][columns].replace([np.inf, -np.inf], np.nan).astype(object)
+        return expected.where(expected.notna(), None).to_dict('records')
+
+    def test_round_trip(self):
+        compact = to_compact_data(STATS_DF)
+        self.assertEqual(set(compact['dictionaries']), {'Name', 'Team', 'is_sub_row'})
+        self.assertEqual(decode_compact_data(compact), self.expected_rows(list(range(len(STATS_DF))), list(STATS_DF.columns)))
+
+    def test_slice_round_trip(self):
+        compact = to_compact_data(STATS_DF)
+        for positions, columns in [
+            ([3, 1, 2], ['Team', 'Name', 'OPS', 'AVG']),
+            ([4], ['Name', 'is_sub_row', 'ERA']),
+            ([2, 3], ['G', 'OPS']),
+            ([], ['Name']),
+        ]:
+            with self.subTest(positions=positions, columns=columns):
+                sliced = slice_compact_data(compact, positions, columns)
+                self.assertEqual(sliced['columns'], columns)
+                self.assertEqual(decode_compact_data(sliced), self.expected_rows(positions, columns))
+                # Each dictionary keeps only the values its rows use
+                for col, values in sliced['dictionaries'].items():
+                    used = STATS_DF[col].iloc[positions].dropna().tolist()
+                    self.assertEqual(values, list(dict.fromkeys(used)))
+
+if __name__ == '__main__':
+    unittest.main()